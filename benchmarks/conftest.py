@@ -0,0 +1,33 @@
+"""
+벤치마크 공통 픽스처
+
+GitHubClient 를 만들려면 토큰 환경변수가 필요하므로 먼저 채워둡니다.
+실행/비교 방법은 README 의 "벤치마크" 항목을 참고하세요.
+"""
+
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault("GITHUB_TOKEN", "benchmark-token")
+os.environ.setdefault("RECEIPT_IMAGES_DIR", os.path.join(tempfile.gettempdir(), "github-to-receipt-bench"))
+
+from benchmarks.synthetic import ACCOUNT_YEARS, SyntheticAccount, SyntheticGitHub  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def synthetic_github() -> SyntheticGitHub:
+    accounts = [SyntheticAccount(login=f"bench-{years}y", years=years) for years in ACCOUNT_YEARS]
+    # 가입 후 오래 쉬었던 계정 (기여가 없는 연도는 캘린더를 받지 않아야 함)
+    accounts.append(SyntheticAccount(login="bench-dormant", years=20, dormant_years=17))
+    return SyntheticGitHub(accounts)
+
+
+@pytest.fixture
+def event_loop_runner():
+    """동기 benchmark 함수 안에서 코루틴을 실행하기 위한 이벤트 루프"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
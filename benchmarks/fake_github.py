@@ -0,0 +1,146 @@
+"""
+용량 테스트용 로컬 GitHub GraphQL 대역 서버
+
+GitHubClient 가 쓰는 user / contributionsCollection / repositories 응답을 흉내냅니다.
+처음 보는 아이디는 1~20년 된 합성 계정으로 응답하므로 아무 아이디로나 부하를 줄 수 있습니다.
+
+    python -m benchmarks.fake_github --port 9000 --latency lognormal:120,0.6 --error-rate 0.01 --rate-limit 5000/3600
+
+서버 쪽은 GITHUB_GRAPHQL_URL=http://localhost:9000/graphql 로 이 서버를 가리키면 됩니다.
+"""
+
+import argparse
+import asyncio
+import math
+import random
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from benchmarks.synthetic import SyntheticGitHub
+
+
+@dataclass
+class LatencyModel:
+    """응답 지연 분포 (단위: ms)
+
+    - fixed:100            항상 100ms
+    - uniform:50,300       50~300ms 균등 분포
+    - lognormal:120,0.6    중앙값 120ms, sigma 0.6 인 로그정규 분포 (긴 꼬리)
+    """
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, _, params = spec.partition(":")
+        values = [float(value) for value in params.split(",") if value] or [0.0]
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"알 수 없는 지연 분포: {kind}")
+        return cls(kind, values[0], values[1] if len(values) > 1 else 0.0)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(max(self.a, 0.001)), self.b)
+        return self.a
+
+
+class RateLimiter:
+    """GitHub 처럼 고정 윈도우마다 요청 수를 제한합니다."""
+
+    def __init__(self, limit: int, window_seconds: float):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self.window_start = time.time()
+        self.used = 0
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> Optional["RateLimiter"]:
+        if not spec:
+            return None
+        limit, _, window = spec.partition("/")
+        return cls(int(limit), float(window or 3600))
+
+    def acquire(self) -> bool:
+        now = time.time()
+        if now - self.window_start >= self.window_seconds:
+            self.window_start = now
+            self.used = 0
+        if self.used >= self.limit:
+            return False
+        self.used += 1
+        return True
+
+    def headers(self) -> dict:
+        return {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(self.limit - self.used, 0)),
+            "X-RateLimit-Reset": str(int(self.window_start + self.window_seconds)),
+        }
+
+
+def create_app(
+    latency: LatencyModel,
+    error_rate: float = 0.0,
+    rate_limiter: Optional[RateLimiter] = None,
+    seed: Optional[int] = None,
+) -> FastAPI:
+    github = SyntheticGitHub([], auto_accounts=True)
+    rng = random.Random(seed)
+    app = FastAPI(title="Fake GitHub GraphQL")
+
+    @app.post("/graphql")
+    async def graphql(request: Request):
+        payload = await request.json()
+        await asyncio.sleep(latency.sample(rng) / 1000)
+
+        if rate_limiter is not None and not rate_limiter.acquire():
+            # GitHub GraphQL 은 한도 초과 시에도 200 + RATE_LIMITED 오류를 돌려줍니다
+            body = {"errors": [{"type": "RATE_LIMITED", "message": "API rate limit exceeded"}]}
+            return JSONResponse(body, headers=rate_limiter.headers())
+
+        headers = rate_limiter.headers() if rate_limiter else {}
+        if rng.random() < error_rate:
+            return JSONResponse({"message": "Server Error"}, status_code=502, headers=headers)
+
+        github.request_count += 1
+        body = github.resolve(payload["query"], payload.get("variables", {}))
+        return JSONResponse(body, headers=headers)
+
+    @app.get("/stats")
+    async def stats():
+        return {"requests": github.request_count, "accounts": len(github.accounts)}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="로컬 GitHub GraphQL 대역 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", default="lognormal:120,0.5", help="fixed:MS | uniform:MIN,MAX | lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="502 를 돌려줄 확률 (0~1)")
+    parser.add_argument("--rate-limit", default=None, help="요청수/초 윈도우, 예: 5000/3600")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    app = create_app(
+        LatencyModel.parse(args.latency),
+        error_rate=args.error_rate,
+        rate_limiter=RateLimiter.parse(args.rate_limit),
+        seed=args.seed,
+    )
+    print(f"가짜 GitHub GraphQL 서버: http://{args.host}:{args.port}/graphql")
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
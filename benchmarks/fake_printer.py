@@ -0,0 +1,97 @@
+"""
+네트워크(TCP 9100) 영수증 프린터 대역
+
+받은 바이트를 세기만 하는 TCP 서버입니다. baud 를 주면 시리얼 전송 속도만큼 천천히 읽어서
+실제 프린터처럼 출력 시간이 바이트 수에 비례하게 만듭니다. 연결 하나가 출력 작업 하나입니다.
+
+    python -m benchmarks.fake_printer --port 9100 --baud 115200
+
+서버 쪽은 PRINTERS=network:127.0.0.1:9100 으로 이 프린터를 가리키면 됩니다.
+"""
+
+import argparse
+import socket
+import threading
+import time
+from typing import List, Optional
+
+
+class FakeNetworkPrinter:
+    """스레드에서 동작하는 가짜 네트워크 프린터"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, baud: Optional[int] = None):
+        self.host = host
+        self.baud = baud
+        self.jobs: List[int] = []  # 연결(작업)별 받은 바이트 수
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._socket.bind((host, port))
+        self.port = self._socket.getsockname()[1]
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    @property
+    def address(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    @property
+    def bytes_received(self) -> int:
+        return sum(self.jobs)
+
+    def start(self) -> "FakeNetworkPrinter":
+        self._socket.listen(8)
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._socket.close()
+
+    def _serve(self):
+        while self._running:
+            try:
+                connection, _ = self._socket.accept()
+            except OSError:
+                return
+            # 실제 프린터처럼 한 번에 한 작업만 처리합니다
+            self._receive(connection)
+
+    def _receive(self, connection: socket.socket):
+        received = 0
+        # 10비트(시작/정지 비트 포함)당 1바이트
+        bytes_per_second = self.baud / 10 if self.baud else None
+        started = time.perf_counter()
+        with connection:
+            while True:
+                chunk = connection.recv(4096)
+                if not chunk:
+                    break
+                received += len(chunk)
+                if bytes_per_second:
+                    delay = received / bytes_per_second - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+        self.jobs.append(received)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="네트워크 영수증 프린터 대역 (TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--baud", type=int, default=None, help="시리얼 전송 속도 흉내 (예: 115200)")
+    args = parser.parse_args()
+
+    printer = FakeNetworkPrinter(args.host, args.port, args.baud).start()
+    print(f"가짜 네트워크 프린터: {printer.address}")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"작업 {len(printer.jobs)}개, {printer.bytes_received} bytes")
+    except KeyboardInterrupt:
+        printer.stop()
+
+
+if __name__ == "__main__":
+    main()
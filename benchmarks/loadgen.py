@@ -0,0 +1,155 @@
+"""
+가상 키오스크 N 대로 서버에 부하를 주는 부하 생성기
+
+각 키오스크는 시나리오를 반복하며 요청 지연 시간을 기록하고,
+끝나면 시나리오별 처리량과 p50/p95/p99 지연 시간을 출력합니다.
+
+    python -m benchmarks.loadgen --target http://localhost:8000 --kiosks 20 --duration 60 --scenario mix
+
+시나리오
+- stats : POST /api/github/stats
+- async : SSE 스트림 연결 후 POST /api/github/stats/async, data 이벤트까지의 시간
+- print : POST /api/receipt/print
+- mix   : 키오스크 한 세션처럼 async -> print 를 반복
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.synthetic import make_receipt_png
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class LoadReport:
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.started_at = time.perf_counter()
+        self.finished_at: Optional[float] = None
+
+    def record(self, scenario: str, seconds: float, ok: bool):
+        if ok:
+            self.latencies[scenario].append(seconds)
+        else:
+            self.errors[scenario] += 1
+
+    def print(self):
+        elapsed = (self.finished_at or time.perf_counter()) - self.started_at
+        print(f"\n총 {elapsed:.1f}초 동안 측정")
+        print(f"{'scenario':<10}{'ok':>8}{'errors':>8}{'req/s':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}")
+        for scenario in sorted(set(self.latencies) | set(self.errors)):
+            values = sorted(self.latencies[scenario])
+            print(
+                f"{scenario:<10}{len(values):>8}{self.errors[scenario]:>8}"
+                f"{len(values) / elapsed:>10.2f}"
+                f"{percentile(values, 50) * 1000:>10.0f}"
+                f"{percentile(values, 95) * 1000:>10.0f}"
+                f"{percentile(values, 99) * 1000:>10.0f}"
+            )
+
+
+class VirtualKiosk:
+    def __init__(self, kiosk_id: int, client: httpx.AsyncClient, report: LoadReport, usernames: List[str], receipt_png: str):
+        self.kiosk_id = kiosk_id
+        self.client = client
+        self.report = report
+        self.usernames = usernames
+        self.receipt_png = receipt_png
+        self.iteration = 0
+
+    def next_username(self) -> str:
+        username = self.usernames[(self.kiosk_id + self.iteration) % len(self.usernames)]
+        self.iteration += 1
+        return username
+
+    async def timed(self, scenario: str, coro) -> bool:
+        started = time.perf_counter()
+        try:
+            ok = await coro
+        except (httpx.HTTPError, asyncio.TimeoutError):
+            ok = False
+        self.report.record(scenario, time.perf_counter() - started, ok)
+        return ok
+
+    async def run_stats(self) -> bool:
+        response = await self.client.post("/api/github/stats", json={"username": self.next_username()})
+        return response.status_code == 200
+
+    async def run_async(self) -> bool:
+        username = self.next_username()
+        # 이벤트를 놓치지 않도록 스트림을 먼저 연결하고 작업을 시작합니다
+        async with self.client.stream("GET", f"/api/github/stats/stream/{username}") as stream:
+            start = await self.client.post("/api/github/stats/async", json={"username": username})
+            if start.status_code != 200:
+                return False
+            async for line in stream.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                event = json.loads(line[len("data: "):])
+                if event["type"] == "data":
+                    return True
+                if event["type"] == "error":
+                    return False
+        return False
+
+    async def run_print(self) -> bool:
+        response = await self.client.post(
+            "/api/receipt/print",
+            json={"image_data": self.receipt_png, "filename": f"loadgen-{self.kiosk_id}.png"},
+        )
+        return response.status_code == 200 and response.json().get("success", False)
+
+    async def run(self, scenario: str, deadline: float):
+        while time.perf_counter() < deadline:
+            if scenario in ("stats", "async", "print"):
+                await self.timed(scenario, getattr(self, f"run_{scenario}")())
+            else:
+                if await self.timed("async", self.run_async()):
+                    await self.timed("print", self.run_print())
+
+
+async def run_load(target: str, kiosks: int, duration: float, scenario: str, usernames: List[str], timeout: float) -> LoadReport:
+    report = LoadReport()
+    receipt_png = make_receipt_png(768, 2400)
+    limits = httpx.Limits(max_connections=kiosks * 2, max_keepalive_connections=kiosks * 2)
+    async with httpx.AsyncClient(base_url=target, timeout=timeout, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+        workers = [
+            VirtualKiosk(kiosk_id, client, report, usernames, receipt_png).run(scenario, deadline)
+            for kiosk_id in range(kiosks)
+        ]
+        await asyncio.gather(*workers)
+    report.finished_at = time.perf_counter()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가상 키오스크 부하 생성기")
+    parser.add_argument("--target", default="http://localhost:8000")
+    parser.add_argument("--kiosks", type=int, default=10, help="동시에 돌릴 가상 키오스크 수")
+    parser.add_argument("--duration", type=float, default=30.0, help="측정 시간 (초)")
+    parser.add_argument("--scenario", choices=["stats", "async", "print", "mix"], default="mix")
+    parser.add_argument("--users", type=int, default=200, help="돌려가며 조회할 합성 아이디 수")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    usernames = [f"load-user-{index}" for index in range(args.users)]
+    print(f"{args.target} 에 키오스크 {args.kiosks}대로 {args.duration:.0f}초 동안 '{args.scenario}' 부하를 줍니다...")
+    report = asyncio.run(run_load(args.target, args.kiosks, args.duration, args.scenario, usernames, args.timeout))
+    report.print()
+
+
+if __name__ == "__main__":
+    main()
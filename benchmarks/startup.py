@@ -0,0 +1,106 @@
+"""
+서버 시작 시간 리포트
+
+새 프로세스에서 `python -X importtime` 으로 server.main 을 불러와 가장 비싼 import 를 보여주고,
+lifespan 시작까지 끝난 "준비 완료" 시간을 측정합니다. 프린터/이미지 스택이 시작 시점에
+로드되면 실패로 처리합니다. CI 에서는 --budget-ms 로 회귀를 잡을 수 있습니다.
+
+    python -m benchmarks.startup --top 15 --budget-ms 800
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# 첫 출력 전까지 불러오면 안 되는 무거운 모듈
+LAZY_MODULES = ["PIL", "escpos", "usb", "serial", "barcode", "qrcode"]
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+_READY_SCRIPT = """
+import asyncio, sys, time
+LAZY_MODULES = %r
+started = time.perf_counter()
+from server.main import app
+
+async def main():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    print(f"{(ready - started) * 1000:.1f}")
+    print(",".join(name for name in LAZY_MODULES if name in sys.modules))
+
+asyncio.run(main())
+"""
+
+
+def _child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("GITHUB_TOKEN", "startup-report-token")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.getcwd(), env.get("PYTHONPATH")]))
+    return env
+
+
+def import_times() -> List[Tuple[str, int, int]]:
+    """server.main 이 직접 불러온 모듈의 (모듈, self us, cumulative us) 목록"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import server.main"],
+        capture_output=True, text=True, env=_child_env(), check=True,
+    )
+    lines = []
+    for line in result.stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            lines.append((len(match.group(3)), match.group(4), int(match.group(1)), int(match.group(2))))
+
+    # importtime 은 자식 모듈을 부모보다 먼저 출력하므로, server.main 줄 바로 앞에서
+    # 한 단계 깊은 들여쓰기를 가진 줄이 직접 import 한 모듈입니다
+    main_index = next(index for index, line in enumerate(lines) if line[1] == "server.main")
+    main_depth = lines[main_index][0]
+    entries = [lines[main_index][1:]]
+    for depth, name, self_us, cumulative_us in reversed(lines[:main_index]):
+        if depth <= main_depth:
+            break
+        if depth == main_depth + 2:
+            entries.append((name, self_us, cumulative_us))
+    return entries
+
+
+def time_to_ready() -> Tuple[float, List[str]]:
+    """(import 부터 lifespan 시작 완료까지 ms, 시작 시점에 로드된 무거운 모듈)"""
+    result = subprocess.run(
+        [sys.executable, "-c", _READY_SCRIPT % (LAZY_MODULES,)],
+        capture_output=True, text=True, env=_child_env(), check=True,
+    )
+    ready_ms, loaded = result.stdout.splitlines()[-2:]
+    return float(ready_ms), [name for name in loaded.split(",") if name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="서버 시작 시간 리포트")
+    parser.add_argument("--top", type=int, default=10, help="출력할 비싼 import 수")
+    parser.add_argument("--budget-ms", type=float, default=None, help="준비 완료 시간이 이 값을 넘으면 실패")
+    args = parser.parse_args()
+
+    entries = sorted(import_times(), key=lambda entry: entry[2], reverse=True)
+    print(f"{'module':<40}{'cumulative(ms)':>16}")
+    for name, _, cumulative in entries[: args.top]:
+        print(f"{name:<40}{cumulative / 1000:>16.1f}")
+
+    ready_ms, loaded = time_to_ready()
+    print(f"\nimport -> 준비 완료: {ready_ms:.0f}ms")
+
+    failed = False
+    if loaded:
+        print(f"✗ 시작 시점에 로드되면 안 되는 모듈: {', '.join(loaded)}")
+        failed = True
+    if args.budget_ms is not None and ready_ms > args.budget_ms:
+        print(f"✗ 예산 {args.budget_ms:.0f}ms 초과")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
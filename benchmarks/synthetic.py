@@ -0,0 +1,245 @@
+"""
+오프라인 벤치마크용 가짜 GitHub GraphQL 응답 생성기
+
+GitHubClient 가 보내는 쿼리(기본 정보 / 기간별 합계 / 일별 캘린더 / 상위 레포지토리)와
+배치 조회의 별칭 쿼리를 쿼리 본문으로 구분해서, 계정마다 항상 같은 결과가 나오도록 합성 데이터를 만들어 돌려줍니다.
+"""
+
+import base64
+import io
+import json
+import random
+import re
+import zlib
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+# 벤치마크에서 사용하는 계정 나이 (년)
+ACCOUNT_YEARS = [1, 5, 10, 20]
+
+
+@dataclass
+class SyntheticAccount:
+    login: str
+    years: int
+    # 하루에 커밋이 있을 확률
+    activity: float = 0.45
+    repo_count: int = 30
+    # 가입 후 처음 몇 년은 기여가 없는 계정
+    dormant_years: int = 0
+
+    @property
+    def seed(self) -> int:
+        return zlib.crc32(self.login.encode())
+
+    def created_at(self, now: datetime) -> datetime:
+        return now - timedelta(days=365 * self.years)
+
+    def active_from(self, now: datetime) -> date:
+        return (self.created_at(now) + timedelta(days=365 * self.dormant_years)).date()
+
+    def contribution_years(self, now: datetime) -> List[int]:
+        """기여가 있는 연도 (최근 연도부터)"""
+        return list(range(now.year, self.active_from(now).year - 1, -1))
+
+    def count_for(self, day: date, now: Optional[datetime] = None) -> int:
+        """날짜별 커밋 수 (같은 계정/날짜면 항상 같은 값)"""
+        if self.dormant_years and now is not None and day < self.active_from(now):
+            return 0
+        rng = random.Random(self.seed ^ day.toordinal())
+        if rng.random() >= self.activity:
+            return 0
+        return rng.randint(1, 25)
+
+
+# [별칭:] user(login: $변수)
+_USER_SELECTION = re.compile(r"(?:(\w+)\s*:\s*)?user\(login:\s*\$(\w+)\)")
+# [별칭:] repositories(first: $변수 ...)
+_REPOSITORIES_SELECTION = re.compile(r"(?:(\w+)\s*:\s*)?repositories\(\s*first:\s*\$(\w+)")
+# [별칭:] contributionsCollection[(from: $변수, to: $변수)]
+_COLLECTION_SELECTION = re.compile(r"(?:(\w+)\s*:\s*)?contributionsCollection(?:\(from:\s*\$(\w+),\s*to:\s*\$(\w+)\))?")
+
+
+def _parse_datetime(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
+def build_calendar_weeks(account: SyntheticAccount, from_date: date, to_date: date, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """from_date ~ to_date 구간의 contributionCalendar.weeks 를 만듭니다. (일요일 시작 주 단위)"""
+    weeks: List[Dict[str, Any]] = []
+    current_week: List[Dict[str, Any]] = []
+    day = from_date
+    while day <= to_date:
+        # date.weekday(): 월=0 ... 일=6
+        if day.weekday() == 6 and current_week:
+            weeks.append({"contributionDays": current_week})
+            current_week = []
+        current_week.append({"date": day.isoformat(), "contributionCount": account.count_for(day, now)})
+        day += timedelta(days=1)
+    if current_week:
+        weeks.append({"contributionDays": current_week})
+    return weeks
+
+
+class SyntheticGitHub:
+    """GraphQL 요청을 받아 합성 응답을 만드는 핸들러"""
+
+    def __init__(self, accounts: List[SyntheticAccount], now: Optional[datetime] = None, auto_accounts: bool = False):
+        self.accounts = {account.login.lower(): account for account in accounts}
+        self.now = now or datetime.now()
+        # True 면 처음 보는 아이디도 1~20년 된 계정으로 만들어서 응답
+        self.auto_accounts = auto_accounts
+        self.request_count = 0
+
+    def add_account(self, account: SyntheticAccount):
+        self.accounts[account.login.lower()] = account
+
+    def get_account(self, login: str) -> Optional[SyntheticAccount]:
+        account = self.accounts.get(login.lower())
+        if account is None and self.auto_accounts and login:
+            account = SyntheticAccount(login=login, years=1 + zlib.crc32(login.encode()) % 20)
+            self.add_account(account)
+        return account
+
+    def resolve(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """쿼리 본문과 변수로 GraphQL 응답 JSON 을 만듭니다.
+
+        배치 조회처럼 별칭(u0: user(login: $l0) ...)으로 여러 user 를 한 번에 선택한 쿼리도 처리합니다.
+        """
+        selections = list(_USER_SELECTION.finditer(query))
+        data: Dict[str, Any] = {}
+        errors: List[Dict[str, Any]] = []
+        for index, match in enumerate(selections):
+            alias = match.group(1) or "user"
+            login = str(variables.get(match.group(2), ""))
+            end = selections[index + 1].start() if index + 1 < len(selections) else len(query)
+            account = self.get_account(login)
+            if account is None:
+                data[alias] = None
+                errors.append({
+                    "type": "NOT_FOUND",
+                    "path": [alias],
+                    "message": f"Could not resolve to a User with the login of '{login}'.",
+                })
+                continue
+            data[alias] = self._resolve_user(account, query[match.end():end], variables)
+
+        body: Dict[str, Any] = {"data": data}
+        if errors:
+            body["errors"] = errors
+        return body
+
+    def _resolve_user(self, account: SyntheticAccount, selection: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        user: Dict[str, Any] = {}
+
+        if "avatarUrl" in selection:
+            user.update({
+                "name": account.login.title(),
+                "login": account.login,
+                "avatarUrl": f"https://avatars.githubusercontent.com/u/{account.seed}",
+                "createdAt": account.created_at(self.now).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "followers": {"totalCount": account.seed % 500},
+                "following": {"totalCount": account.seed % 80},
+                "repositories": {"totalCount": account.repo_count},
+            })
+
+        repos = _REPOSITORIES_SELECTION.search(selection)
+        if repos is not None:
+            rng = random.Random(account.seed)
+            nodes = []
+            for index in range(min(variables.get(repos.group(2), 10), account.repo_count)):
+                nodes.append({
+                    "name": f"{account.login}-repo-{index}",
+                    "stargazerCount": rng.randint(0, 5000),
+                    "primaryLanguage": {"name": rng.choice(["Python", "TypeScript", "Go", "Rust"])} if index % 4 else None,
+                    "updatedAt": (self.now - timedelta(days=rng.randint(0, 900))).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                })
+            user[repos.group(1) or "repositories"] = {"nodes": nodes}
+
+        collections = list(_COLLECTION_SELECTION.finditer(selection))
+        for index, collection in enumerate(collections):
+            body = selection[collection.end():collections[index + 1].start() if index + 1 < len(collections) else len(selection)]
+            key = collection.group(1) or "contributionsCollection"
+            if collection.group(2) is None:
+                user[key] = {"contributionYears": account.contribution_years(self.now)}
+                continue
+
+            from_date = _parse_datetime(variables[collection.group(2)]).date()
+            to_date = _parse_datetime(variables[collection.group(3)]).date()
+            weeks = build_calendar_weeks(account, from_date, to_date, self.now)
+
+            if "weeks" in body:
+                calendar: Dict[str, Any] = {"weeks": weeks}
+            else:
+                total = sum(day["contributionCount"] for week in weeks for day in week["contributionDays"])
+                calendar = {"totalContributions": total}
+            user[key] = {"contributionCalendar": calendar}
+
+        return user
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """httpx.MockTransport 용 핸들러 (GET 은 아바타 이미지 요청으로 봅니다)"""
+        if request.method == "GET":
+            size = int(request.url.params.get("s", "460"))
+            return httpx.Response(200, content=make_avatar_png(zlib.crc32(request.url.path.encode()), size), headers={"Content-Type": "image/png"})
+
+        self.request_count += 1
+        payload = json.loads(request.content)
+        body = self.resolve(payload["query"], payload.get("variables", {}))
+        return httpx.Response(200, json=body, headers=self.rate_limit_headers())
+
+    def rate_limit_headers(self) -> Dict[str, str]:
+        """GitHub 처럼 시간당 5000 포인트 한도 헤더 (요청 하나에 1 포인트)"""
+        reset = self.now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        return {
+            "X-RateLimit-Limit": "5000",
+            "X-RateLimit-Remaining": str(max(5000 - self.request_count, 0)),
+            "X-RateLimit-Reset": str(int(reset.timestamp())),
+        }
+
+    def transport(self) -> httpx.MockTransport:
+        return httpx.MockTransport(self.handle_request)
+
+
+def make_avatar_png(seed: int, size: int) -> bytes:
+    """GitHub 기본 아바타(identicon)처럼 5x5 대칭 무늬의 컬러 PNG 를 만듭니다."""
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    color = (rng.randint(0, 200), rng.randint(0, 200), rng.randint(0, 200))
+    image = Image.new("RGB", (size, size), (240, 240, 240))
+    draw = ImageDraw.Draw(image)
+    cell = size / 5
+    for row in range(5):
+        for column in range(3):
+            if rng.random() < 0.5:
+                for x in {column, 4 - column}:
+                    draw.rectangle((x * cell, row * cell, (x + 1) * cell, (row + 1) * cell), fill=color)
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def make_receipt_png(width: int, height: int) -> str:
+    """영수증과 비슷한(대부분 흰 배경) PNG 를 data URL 로 만듭니다."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(image)
+    y = 40
+    while y < height - 40:
+        # 텍스트 줄 흉내
+        for x in range(40, width - 120, 90):
+            draw.rectangle((x, y, x + 60, y + 14), fill="black")
+        y += 34
+        if (y // 34) % 12 == 0:
+            # 점선 구분선
+            for x in range(20, width - 20, 16):
+                draw.line((x, y, x + 8, y), fill="black", width=2)
+            y += 40
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode()
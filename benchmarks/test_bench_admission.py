@@ -0,0 +1,77 @@
+"""요청 폭주(QR 코드 공유) 중 키오스크 요청의 대기 시간 벤치마크 (AdmissionLimiter 만 사용)"""
+
+import asyncio
+import time
+
+from server.admission import AdmissionLimiter, AdmissionRejected
+from server.prefetch import Prefetcher
+
+BURST = 200
+CRAWL_SECONDS = 0.02
+
+
+def test_kiosk_during_burst(benchmark, event_loop_runner):
+    async def run():
+        limiter = AdmissionLimiter("bench", concurrency=8, queue_size=32, max_wait=5.0)
+        rejected = []
+
+        async def crawl(kiosk: bool) -> float:
+            started = time.perf_counter()
+            try:
+                slot = await limiter.acquire(kiosk)
+            except AdmissionRejected:
+                rejected.append(time.perf_counter() - started)
+                return 0.0
+            waited = time.perf_counter() - started
+            await asyncio.sleep(CRAWL_SECONDS)
+            slot.release()
+            return waited
+
+        remote = [asyncio.create_task(crawl(False)) for _ in range(BURST)]
+        await asyncio.sleep(0)
+        kiosk_wait = await crawl(True)
+        await asyncio.gather(*remote)
+        return kiosk_wait, rejected
+
+    kiosk_wait, rejected = benchmark(lambda: event_loop_runner(run()))
+
+    # 키오스크는 대기열 맨 앞으로 가서 작업 하나가 끝나는 시간 안에 슬롯을 받습니다
+    assert kiosk_wait < CRAWL_SECONDS * 3
+    # 넘친 요청은 기다리지 않고 바로 거절됩니다
+    # (키오스크가 대기열 마지막 원격 요청 자리를 가져가서 하나 더 거절됩니다)
+    assert len(rejected) == BURST - 8 - 32 + 1
+    assert max(rejected) < CRAWL_SECONDS
+    benchmark.extra_info["kiosk_wait_ms"] = round(kiosk_wait * 1000, 1)
+    benchmark.extra_info["rejected"] = len(rejected)
+
+
+def test_prefetch_uses_spare_slots(event_loop_runner):
+    """미리 받기는 남는 수집 슬롯만 쓰고, 기다리는 요청이 있으면 건너뜁니다"""
+    async def run():
+        limiter = AdmissionLimiter("bench", concurrency=2, queue_size=4, max_wait=5.0)
+        prefetcher = Prefetcher(concurrency=4, admission=limiter)
+        finish = asyncio.Event()
+
+        async def fetch(user_info):
+            await finish.wait()
+
+        started = prefetcher.start("first", {}, fetch)
+        held = limiter.active
+        crawl = await limiter.acquire()
+        # 슬롯이 모두 쓰이는 중이고 키오스크 요청이 기다리면 슬롯을 받지 않습니다
+        waiter = asyncio.create_task(limiter.acquire(kiosk=True))
+        await asyncio.sleep(0)
+        skipped = prefetcher.start("second", {}, fetch)
+
+        finish.set()
+        slot = await waiter
+        slot.release()
+        crawl.release()
+        await started.task
+        return started, held, skipped, limiter.active
+
+    started, held, skipped, active = event_loop_runner(run())
+    assert started is not None and held == 1
+    assert skipped is None
+    # 미리 받기가 끝나면 슬롯을 돌려줍니다
+    assert active == 0
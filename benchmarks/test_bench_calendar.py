@@ -0,0 +1,65 @@
+"""캘린더 응답 스트리밍 디코더(CalendarDecoder) 단위 테스트"""
+
+from datetime import date, timedelta
+
+import orjson
+import pytest
+
+from server.calendar_stream import CalendarDecodeError, CalendarDecoder
+
+START = date(2023, 12, 28)
+
+
+def calendar_body(days: int = 20, skip: int = -1) -> bytes:
+    """GitHub 와 같은 weeks -> contributionDays 형태의 응답 본문 (skip 번째 날짜를 빼면 날짜가 끊김)"""
+    records = [
+        {"date": (START + timedelta(days=index)).isoformat(), "contributionCount": index * 7 % 13}
+        for index in range(days)
+        if index != skip
+    ]
+    weeks = [{"contributionDays": records[index:index + 7]} for index in range(0, len(records), 7)]
+    calendar = {"weeks": weeks}
+    return orjson.dumps({"data": {"user": {"contributionsCollection": {"contributionCalendar": calendar}}}})
+
+
+def decode(*chunks: bytes):
+    decoder = CalendarDecoder()
+    for chunk in chunks:
+        decoder.feed(chunk)
+    return decoder.result()
+
+
+def test_day_split_at_every_offset():
+    body = calendar_body()
+    expected = [index * 7 % 13 for index in range(20)]
+
+    # 날짜 / 기여 수 레코드가 두 청크에 걸쳐 잘려도 같은 결과
+    for offset in range(len(body) + 1):
+        days = decode(body[:offset], body[offset:])
+        assert (days.start, list(days.counts)) == (START, expected), offset
+
+    # 한 바이트씩 와도 같은 결과
+    days = decode(*(body[index:index + 1] for index in range(len(body))))
+    assert list(days.counts) == expected
+
+
+def test_errors_payload():
+    body = orjson.dumps({"data": {"user": None}, "errors": [{"type": "NOT_FOUND", "path": ["user"], "message": "Could not resolve"}]})
+    for offset in range(len(body) + 1):
+        with pytest.raises(CalendarDecodeError):
+            decode(body[:offset], body[offset:])
+
+    # 캘린더 일부와 함께 온 오류도 오류로 봅니다
+    with pytest.raises(CalendarDecodeError):
+        decode(calendar_body()[:-1] + b',"errors":[{"message":"timeout"}]}')
+
+
+def test_non_contiguous_dates():
+    with pytest.raises(CalendarDecodeError):
+        decode(calendar_body(skip=10))
+    # 마지막 날짜만 빠진 것은 끊긴 것이 아닙니다
+    assert len(decode(calendar_body(skip=19))) == 19
+
+
+def test_no_calendar():
+    assert decode(orjson.dumps({"data": {"user": None}})) is None
@@ -0,0 +1,93 @@
+"""느린 응답이 섞인 여러 윈도우 수집에서 헤지 요청의 효과 벤치마크 (Hedger 만 사용)"""
+
+import asyncio
+import itertools
+import time
+
+from server.hedge import Hedger
+
+WINDOWS = 40
+FAST_SECONDS = 0.002
+SLOW_SECONDS = 0.15
+# 요청 25개 중 하나(4%)가 느립니다
+SLOW_EVERY = 25
+
+
+def make_attempt():
+    counter = itertools.count()
+
+    async def attempt() -> float:
+        seconds = SLOW_SECONDS if next(counter) % SLOW_EVERY == SLOW_EVERY - 1 else FAST_SECONDS
+        await asyncio.sleep(seconds)
+        return seconds
+
+    return attempt
+
+
+async def crawl(hedger: Hedger) -> float:
+    """윈도우를 차례로 받는 수집 한 번 (표본을 채운 뒤 측정)"""
+    attempt = make_attempt()
+    for _ in range(hedger.min_samples):
+        await hedger.run("calendar_window", attempt)
+    started = time.perf_counter()
+    for _ in range(WINDOWS):
+        await hedger.run("calendar_window", attempt)
+    return time.perf_counter() - started
+
+
+def test_hedged_crawl(benchmark, event_loop_runner):
+    unhedged = event_loop_runner(crawl(Hedger(ratio=0)))
+
+    def run():
+        return event_loop_runner(crawl(Hedger(ratio=0.05, burst=2, min_delay=0.01)))
+
+    elapsed = benchmark.pedantic(run, rounds=3, iterations=1)
+
+    # 느린 요청마다 SLOW_SECONDS 를 기다리는 대신 p95(최소 min_delay) 뒤에 보낸 헤지 요청이 먼저 끝납니다
+    assert unhedged > WINDOWS * FAST_SECONDS + SLOW_SECONDS
+    assert elapsed < unhedged - SLOW_SECONDS
+    benchmark.extra_info["unhedged_ms"] = round(unhedged * 1000, 1)
+    benchmark.extra_info["hedged_ms"] = round(elapsed * 1000, 1)
+
+
+def scripted(*steps):
+    """호출될 때마다 steps 의 (지연 시간, 결과) 를 차례로 쓰는 attempt"""
+    steps = iter(steps)
+
+    async def attempt() -> str:
+        seconds, result = next(steps)
+        await asyncio.sleep(seconds)
+        return result
+
+    return attempt
+
+
+def warmed_hedger() -> Hedger:
+    hedger = Hedger(ratio=0.5, burst=2, min_delay=0.01)
+    hedger.restore({"calendar_window": [0.001] * hedger.min_samples})
+    return hedger
+
+
+def test_hedge_failed_attempt(event_loop_runner):
+    accept = lambda result: result == "ok"  # noqa: E731
+
+    # 헤지 요청이 먼저 끝나도 오류 응답이면 원래 요청을 기다립니다
+    hedger = warmed_hedger()
+    result = event_loop_runner(hedger.run("calendar_window", scripted((0.05, "ok"), (0, "error")), accept))
+    assert result == "ok"
+
+    # 둘 다 실패하면 원래 요청의 결과를 반환합니다
+    hedger = warmed_hedger()
+    result = event_loop_runner(hedger.run("calendar_window", scripted((0.03, "error-primary"), (0, "error-hedge")), accept))
+    assert result == "error-primary"
+
+
+def test_hedge_records_cancelled_primary(event_loop_runner):
+    hedger = warmed_hedger()
+    result = event_loop_runner(hedger.run("calendar_window", scripted((0.2, "slow"), (0, "ok"))))
+    assert result == "ok"
+
+    # 헤지에 져서 취소된 원래 요청도 취소될 때까지의 시간(delay 이상)이 표본에 남습니다
+    samples = list(hedger.latencies["calendar_window"].samples)[hedger.min_samples:]
+    assert len(samples) == 2
+    assert max(samples) >= 0.01
@@ -0,0 +1,200 @@
+"""print_receipt 엔드투엔드 벤치마크 (python-escpos Dummy 프린터 사용)"""
+
+import asyncio
+import base64
+import io
+import time
+
+import httpx
+import pytest
+from escpos.printer import Dummy
+from PIL import Image
+from starlette.requests import Request
+
+from benchmarks.synthetic import make_receipt_png
+from server import main
+from server.avatar import DEFAULT_AVATAR_SIZE, DEFAULT_PRINT_DOTS, AvatarCache
+from server.printers import PrinterConfig, PrinterPool
+from server.raster import ESC_J, GS_L, GS_V0, PRINT_WIDTH, to_mono
+
+# (너비, 높이) - 브라우저에서 pixelRatio 2 로 캡처한 영수증 크기 기준
+RECEIPT_SIZES = {
+    "small": (768, 1400),
+    "tall": (768, 12000),
+}
+
+
+@pytest.fixture
+def dummy_printer(monkeypatch):
+    printers = []
+
+    def open_dummy_printer(config):
+        printer = Dummy()
+        printers.append(printer)
+        return printer
+
+    pool = PrinterPool([PrinterConfig("dummy", "network", "dummy")], opener=open_dummy_printer)
+    monkeypatch.setattr(main, "printer_pool", pool)
+    return printers
+
+
+@pytest.mark.parametrize("size", RECEIPT_SIZES)
+def test_print_receipt(benchmark, dummy_printer, event_loop_runner, size):
+    width, height = RECEIPT_SIZES[size]
+    request = main.ImageUploadRequest(image_data=make_receipt_png(width, height), filename=f"bench-{size}.png")
+
+    # 키오스크(같은 PC)에서 온 요청
+    http_request = Request({"type": "http", "client": ("127.0.0.1", 0), "headers": []})
+
+    result = benchmark(lambda: event_loop_runner(main.print_receipt(request, http_request)))
+
+    assert result["success"]
+    assert dummy_printer[-1].output
+    benchmark.extra_info["bytes_sent"] = len(dummy_printer[-1].output)
+    benchmark.extra_info["bytes_saved"] = result["bytes_saved"]
+
+
+def test_print_keeps_loop_responsive(dummy_printer, event_loop_runner):
+    """큰 영수증의 디코딩 / 리사이즈 / 저장 / 래스터 변환 중에도 이벤트 루프가 멈추지 않습니다"""
+    width, height = RECEIPT_SIZES["tall"]
+    request = main.ImageUploadRequest(image_data=make_receipt_png(width, height), filename="bench-loop.png")
+    http_request = Request({"type": "http", "client": ("127.0.0.1", 0), "headers": []})
+
+    async def run():
+        gaps = []
+        printing = asyncio.ensure_future(main.print_receipt(request, http_request))
+        last = time.perf_counter()
+        while not printing.done():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+        return printing.result(), max(gaps)
+
+    result, longest_gap = event_loop_runner(run())
+    assert result["success"]
+    # 루프에서 처리하면 LANCZOS 리사이즈 한 번만으로도 수백 ms 멈춥니다
+    assert longest_gap < 0.1
+
+
+def raster_rows(output: bytes) -> bytes:
+    """printer.image() 가 보낸 GS v 0 명령들의 래스터 데이터를 이어 붙입니다."""
+    rows = bytearray()
+    position = output.find(GS_V0)
+    while position >= 0:
+        width_bytes = int.from_bytes(output[position + 4:position + 6], "little")
+        height = int.from_bytes(output[position + 6:position + 8], "little")
+        start = position + 8
+        rows += output[start:start + width_bytes * height]
+        position = output.find(GS_V0, start + width_bytes * height)
+    return bytes(rows)
+
+
+def test_raster_matches_escpos_image():
+    """960 줄 조각 경계를 여러 번 넘는 영수증도 printer.image() 와 같은 점을 찍습니다"""
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(base64.b64decode(make_receipt_png(550, 2148).split(",")[1]))).convert("L")
+    # 회색(아바타 사진 등)은 오차 확산으로 아래 줄에 영향을 주므로 조각 경계에 걸쳐 둡니다
+    for top in (900, 1880):
+        image.paste(Image.linear_gradient("L").resize((550, 120)), (0, top))
+    printer = Dummy()
+    printer.image(image)
+
+    assert to_mono(image).tobytes() == raster_rows(printer.output)
+
+
+def test_avatar_for_print(synthetic_github, event_loop_runner):
+    url = "https://avatars.githubusercontent.com/u/1"
+    cache = AvatarCache()
+    assert cache.is_allowed(url)
+    # github.com/<user>.png 는 다른 호스트로 리다이렉트하므로 허용하지 않습니다
+    assert not cache.is_allowed("https://github.com/octocat.png")
+
+    async def load(transport):
+        async with httpx.AsyncClient(transport=transport) as http_client:
+            cache.http_client = http_client
+            return await cache.get(url)
+
+    # 화면용은 캡처 크기의 흑백 이미지입니다 (캡처가 다시 줄어들므로 디더링하지 않음)
+    png = event_loop_runner(load(synthetic_github.transport()))
+    image = Image.open(io.BytesIO(png))
+    assert image.mode == "L" and image.size == (DEFAULT_AVATAR_SIZE, DEFAULT_AVATAR_SIZE)
+    assert sum(1 for count in image.histogram() if count) > 2
+
+    # 리다이렉트는 따라가지 않습니다
+    cache = AvatarCache()
+    redirect = httpx.MockTransport(lambda request: httpx.Response(302, headers={"Location": "http://169.254.169.254/"}))
+    with pytest.raises(httpx.HTTPStatusError):
+        event_loop_runner(load(redirect))
+    assert len(cache) == 0
+
+
+
+def render_raster(output: bytes, height: int):
+    """optimize_raster 의 명령(GS L / GS v 0 / ESC J)을 1비트 이미지로 다시 그립니다."""
+    from PIL import Image
+
+    image = Image.new("1", (PRINT_WIDTH, height))
+    left = y = position = 0
+    while position < len(output):
+        if output.startswith(GS_L, position):
+            left = int.from_bytes(output[position + 2:position + 4], "little")
+            position += 4
+        elif output.startswith(ESC_J, position):
+            y += output[position + 2]
+            position += 3
+        elif output.startswith(GS_V0, position):
+            width_bytes = int.from_bytes(output[position + 4:position + 6], "little")
+            rows = int.from_bytes(output[position + 6:position + 8], "little")
+            data = output[position + 8:position + 8 + width_bytes * rows]
+            image.paste(Image.frombytes("1", (width_bytes * 8, rows), data), (left, y))
+            y += rows
+            position += 8 + len(data)
+        else:
+            position += 1
+    return image
+
+
+def test_print_reuses_dithered_avatar(dummy_printer, synthetic_github, event_loop_runner, monkeypatch):
+    url = "https://avatars.githubusercontent.com/u/1"
+    downloads = []
+
+    def handle(request):
+        downloads.append(request.url)
+        return synthetic_github.handle_request(request)
+
+    cache = AvatarCache()
+    monkeypatch.setattr(main, "avatar_cache", cache)
+    # 영수증(384px) 위쪽 가운데의 아바타 자리 (테두리 안쪽 60px)
+    avatar = main.ReceiptAvatar(url=url, left=162 / 384, top=40 / 384, size=60 / 384)
+    request = main.ImageUploadRequest(image_data=make_receipt_png(768, 1400), filename="bench-avatar.png", avatar=avatar)
+    http_request = Request({"type": "http", "client": ("127.0.0.1", 0), "headers": []})
+
+    async def print_twice():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handle)) as http_client:
+            cache.http_client = http_client
+            # 통계 수집 중의 미리 받기 한 번으로 화면용과 출력용을 함께 만듭니다
+            cache.prewarm(url)
+            await cache.get(url)
+            first = await main.print_receipt(request, http_request)
+            second = await main.print_receipt(request, http_request)
+            return first, second, await cache.get(url, DEFAULT_PRINT_DOTS, mono=True)
+
+    first, second, png = event_loop_runner(print_twice())
+    assert first["success"] and second["success"]
+    # 재출력은 아바타를 다시 받지 않습니다
+    assert len(downloads) == 1
+    assert dummy_printer[0].output == dummy_printer[1].output
+
+    # 출력용 아바타는 미리 디더링한 1비트 이미지이고, 출력한 래스터의 아바타 자리에 원 모양으로 그대로 찍힙니다
+    dots = round(60 / 384 * PRINT_WIDTH)
+    assert dots == DEFAULT_PRINT_DOTS
+    stamp = Image.open(io.BytesIO(png))
+    assert stamp.mode == "1" and stamp.size == (dots, dots)
+
+    left, top = round(162 / 384 * PRINT_WIDTH), round(40 / 384 * PRINT_WIDTH)
+    printed = render_raster(dummy_printer[0].output, 1002).crop((left, top, left + dots, top + dots))
+    middle = dots // 2
+    assert [printed.getpixel((x, middle)) for x in range(4, dots - 4)] == [stamp.getpixel((x, middle)) for x in range(4, dots - 4)]
+    assert [printed.getpixel((middle, y)) for y in range(4, dots - 4)] == [stamp.getpixel((middle, y)) for y in range(4, dots - 4)]
@@ -0,0 +1,131 @@
+"""프린터 풀 벤치마크 (가짜 네트워크 프린터 사용)"""
+
+import asyncio
+import socket
+import time
+
+import pytest
+
+from benchmarks.fake_printer import FakeNetworkPrinter
+from server.printers import PrinterConfig, PrinterPool, PrintInterrupted
+
+# 영수증 한 장 분량의 래스터 (550 도트 x 1400 줄)
+RECEIPT_BYTES = b"\x1dv0\x00" + bytes(69 * 1400)
+
+
+def print_job(printer):
+    printer._raw(RECEIPT_BYTES)
+    printer.cut()
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def network_printers():
+    printers = [FakeNetworkPrinter().start() for _ in range(2)]
+    yield printers
+    for printer in printers:
+        printer.stop()
+
+
+def test_pool_failover(benchmark, network_printers, event_loop_runner):
+    """프린터 3대 중 1대는 연결 불가: 작업 8개가 나머지 2대로 나뉘어 출력되어야 함"""
+    configs = [PrinterConfig("jammed", "network", f"127.0.0.1:{unused_port()}")]
+    configs += [PrinterConfig(f"fake-{index}", "network", printer.address) for index, printer in enumerate(network_printers)]
+
+    def run():
+        pool = PrinterPool(configs, cooldown=60)
+
+        async def submit_all():
+            return await asyncio.gather(*(pool.submit(print_job) for _ in range(8)))
+
+        return pool, event_loop_runner(submit_all())
+
+    pool, results = benchmark(run)
+
+    assert {result.printer for result in results} == {"fake-0", "fake-1"}
+    assert not pool.get("jammed").healthy
+    assert all(result.bytes_sent >= len(RECEIPT_BYTES) for result in results)
+
+
+class FlakyPrinter:
+    """열리지만 fail_after 바이트를 받은 뒤부터 연결 오류를 내는 프린터"""
+
+    def __init__(self, fail_after: int):
+        self.fail_after = fail_after
+        self.received = 0
+
+    def _raw(self, msg):
+        if self.received >= self.fail_after:
+            raise ConnectionResetError("연결이 끊겼습니다")
+        self.received += len(msg)
+
+    def cut(self):
+        self._raw(b"\x1dV\x00")
+
+    def close(self):
+        pass
+
+
+def test_pool_failover_rules(event_loop_runner):
+    """연결 오류만 다른 프린터로 넘기고, 보내기 시작한 작업이나 작업 자체의 오류는 넘기지 않음"""
+    printers = {}
+
+    def opener(config):
+        if config.name == "offline":
+            raise OSError("프린터를 열 수 없습니다")
+        printers[config.name] = printers.get(config.name) or FlakyPrinter(fail_after=0 if config.name == "dead" else 10 ** 9)
+        return printers[config.name]
+
+    # 열기 실패 / 첫 바이트부터 연결 오류 -> 다른 프린터로 넘김
+    pool = PrinterPool([PrinterConfig(name, "network", name) for name in ("offline", "dead", "ok")], opener=opener)
+    result = event_loop_runner(pool.submit(print_job))
+    assert (result.printer, result.attempts) == ("ok", 3)
+    assert not pool.get("offline").healthy and not pool.get("dead").healthy
+
+    # 보내는 도중 연결이 끊기면 같은 영수증이 두 번 나오지 않도록 넘기지 않음
+    printers["cut"] = FlakyPrinter(fail_after=1)
+    pool = PrinterPool([PrinterConfig(name, "network", name) for name in ("cut", "ok")], opener=opener)
+    with pytest.raises(PrintInterrupted):
+        event_loop_runner(pool.submit(print_job))
+    assert not pool.get("cut").healthy and pool.get("ok").jobs_done == 0
+
+    # 작업 자체의 오류는 프린터 상태를 바꾸지 않고 그대로 올림
+    def broken_job(printer):
+        raise ValueError("이미지를 변환할 수 없습니다")
+
+    pool = PrinterPool([PrinterConfig(name, "network", name) for name in ("ok", "ok-2")], opener=opener)
+    with pytest.raises(ValueError):
+        event_loop_runner(pool.submit(broken_job))
+    assert all(device.healthy and device.jobs_failed == 0 and device.pending == 0 for device in pool.devices)
+
+
+def test_pool_device_lock(event_loop_runner, tmp_path):
+    """워커(풀)가 둘이어도 같은 프린터는 한 번에 하나만 엽니다"""
+    opened = []
+    overlaps = []
+
+    class SlowPrinter(FlakyPrinter):
+        def close(self):
+            time.sleep(0.02)
+            opened.remove(self)
+
+    def opener(config):
+        if opened:
+            overlaps.append(config.name)
+        printer = SlowPrinter(fail_after=10 ** 9)
+        opened.append(printer)
+        return printer
+
+    workers = [PrinterPool([PrinterConfig("counter", "serial", "COM1@115200")], opener=opener, lock_dir=str(tmp_path)) for _ in range(2)]
+
+    async def submit_all():
+        return await asyncio.gather(*(pool.submit(print_job) for pool in workers for _ in range(3)))
+
+    results = event_loop_runner(submit_all())
+    assert len(results) == 6
+    assert not overlaps
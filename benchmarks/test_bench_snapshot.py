@@ -0,0 +1,96 @@
+"""재시작 직후 상태 스냅샷 복원 시간 벤치마크 (WarmState 만 사용)"""
+
+import asyncio
+
+import httpx
+import orjson
+
+from benchmarks.synthetic import ACCOUNT_YEARS
+from server.avatar import AvatarCache
+from server.cache import StatsCache
+from server.hedge import Hedger
+from server.leader import LeaderLock
+from server.main import GitHubClient, build_stats_response
+from server.refresh import Popularity, RateBudget
+from server.snapshot import WarmState
+
+COPIES = 50
+
+
+def make_state(path: str) -> WarmState:
+    return WarmState(path, StatsCache(), AvatarCache(), RateBudget(), Popularity(), Hedger())
+
+
+def test_restore(benchmark, synthetic_github, event_loop_runner, tmp_path):
+    async def collect():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            client = GitHubClient(http_client=http_client)
+            return [await client.get_user_stats(f"bench-{years}y") for years in ACCOUNT_YEARS]
+
+    # 행사 중 캐시가 찬 상태 (계정 종류마다 COPIES 명)
+    saved = make_state(str(tmp_path / "warm.snapshot"))
+    for user_data in event_loop_runner(collect()):
+        closed_history = user_data.pop("closed_history")
+        for copy in range(COPIES):
+            username = f"{user_data['login']}-{copy}"
+            saved.stats_cache.put(username, user_data, orjson.dumps(build_stats_response(user_data)), closed_history=closed_history)
+    event_loop_runner(saved.save())
+
+    def run():
+        state = make_state(saved.path)
+        state.restore()
+        return state
+
+    restored = benchmark(run)
+    assert len(restored.stats_cache) == len(saved.stats_cache)
+
+    for key, entry in saved.stats_cache.items():
+        copy = restored.stats_cache.peek(key)
+        assert (copy.etag, copy.body, copy.fetched_at, copy.closed_history) == (entry.etag, entry.body, entry.fetched_at, entry.closed_history)
+    benchmark.extra_info["entries"] = len(saved.stats_cache)
+    benchmark.extra_info["snapshot_bytes"] = (tmp_path / "warm.snapshot").stat().st_size
+
+
+def test_single_snapshot_writer(event_loop_runner, tmp_path):
+    """멀티 워커에서 스냅샷 저장 / 백그라운드 갱신은 잠금 파일을 잡은 워커 하나만 합니다"""
+    path = str(tmp_path / "leader.lock")
+    elected = []
+
+    async def run():
+        first, second = LeaderLock(path), LeaderLock(path, retry=0.01)
+        first.start(lambda: elected.append("first"))
+        second.start(lambda: elected.append("second"))
+        await asyncio.sleep(0.05)
+        assert elected == ["first"] and not second.is_leader
+
+        # 리더 워커가 끝나면 다른 워커가 이어받습니다
+        first.release()
+        await asyncio.sleep(0.05)
+        await second.stop()
+        second.release()
+
+    event_loop_runner(run())
+    assert elected == ["first", "second"]
+
+
+def test_restore_unreadable(synthetic_github, event_loop_runner, tmp_path):
+    """잘린 파일이나 읽을 수 없는 경로도 예외 없이 빈 상태로 시작합니다"""
+    async def collect():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            return await GitHubClient(http_client=http_client).get_user_stats("bench-1y")
+
+    user_data = event_loop_runner(collect())
+    closed_history = user_data.pop("closed_history")
+    saved = make_state(str(tmp_path / "warm.snapshot"))
+    saved.stats_cache.put("bench-1y", user_data, orjson.dumps(build_stats_response(user_data)), closed_history=closed_history)
+    event_loop_runner(saved.save())
+    data = (tmp_path / "warm.snapshot").read_bytes()
+
+    broken = tmp_path / "broken.snapshot"
+    for length in range(len(data)):
+        broken.write_bytes(data[:length])
+        assert make_state(str(broken)).restore() is None, length
+
+    # 디렉터리처럼 열 수 없는 경로 (IsADirectoryError)
+    assert make_state(str(tmp_path)).restore() is None
+    assert make_state(saved.path).restore() is not None
@@ -0,0 +1,155 @@
+"""SSE 팬아웃 벤치마크: 한 사용자의 이벤트를 구독자 N 명에게 전달하는 비용"""
+
+import asyncio
+
+import httpx
+import orjson
+import pytest
+from starlette.requests import Request
+
+from server import main
+
+SUBSCRIBER_COUNTS = [1, 10, 100, 500]
+USERNAME = "bench-10y"
+PROGRESS_EVENTS = 20
+
+
+@pytest.fixture(scope="module")
+def stats_payload(synthetic_github):
+    """마지막 data 이벤트에 실리는 실제 크기의 통계 데이터"""
+    async def run():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            return await main.GitHubClient(http_client=http_client).get_user_stats(USERNAME)
+
+    return asyncio.run(run())
+
+
+async def fan_out(subscribers: int, payload) -> int:
+    generators = [main.event_generator(USERNAME) for _ in range(subscribers)]
+
+    async def drain(generator) -> int:
+        received = 0
+        async for _ in generator:
+            received += 1
+        return received
+
+    tasks = [asyncio.create_task(drain(generator)) for generator in generators]
+    while len(main.event_bus.subscribers.get(USERNAME, [])) < subscribers:
+        await asyncio.sleep(0)
+
+    for index in range(PROGRESS_EVENTS):
+        await main.broadcast_event(USERNAME, main.StatusEvent("api_call", f"진행 중 {index}", index))
+    await main.broadcast_event(USERNAME, main.StatusEvent("data", "데이터 수집 완료", 100, payload))
+
+    # 연결 종료 신호
+    for queue in list(main.event_bus.subscribers.get(USERNAME, [])):
+        queue.put_nowait(None)
+
+    received = await asyncio.gather(*tasks)
+    return sum(received)
+
+
+@pytest.mark.parametrize("subscribers", SUBSCRIBER_COUNTS)
+def test_sse_fan_out(benchmark, event_loop_runner, stats_payload, subscribers):
+    received = benchmark(lambda: event_loop_runner(fan_out(subscribers, stats_payload)))
+
+    assert received == subscribers * (PROGRESS_EVENTS + 1)
+    assert USERNAME not in main.event_bus.subscribers
+
+
+async def join_late(username: str, after: str = None) -> list:
+    """수집을 시작하고, after 타입 이벤트가 발행된 뒤(없으면 작업이 끝난 뒤)에 SSE 를 연결해서 받은 이벤트를 반환합니다."""
+    http_request = Request({"type": "http", "client": ("127.0.0.1", 0), "headers": []})
+    await main.get_github_stats_async(main.GitHubUserRequest(username=username), http_request)
+    while username in main.event_bus.jobs:
+        log = main.event_bus.logs.get(username)
+        if after is not None and log is not None and any(orjson.loads(message[len(b"data: "):])["type"] == after for message in log.messages):
+            break
+        await asyncio.sleep(0)
+
+    events = []
+    generator = main.event_generator(username)
+    async for message in generator:
+        event = orjson.loads(message[len(b"data: "):])
+        events.append(event)
+        if event["type"] in ("data", "error"):
+            break
+    await generator.aclose()
+    return events
+
+
+def test_sse_late_subscriber(benchmark, synthetic_github, event_loop_runner, monkeypatch):
+    async def run():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            monkeypatch.setattr(main, "http_client", http_client)
+            return await join_late("bench-1y")
+
+    events = benchmark.pedantic(lambda: event_loop_runner(run()), rounds=3, iterations=1)
+
+    # 작업이 끝난 뒤에 연결해도 완료 이벤트를 받습니다
+    assert events[-1]["type"] == "data"
+    assert events[-1]["progress"] == 100
+    assert "bench-1y" not in main.event_bus.subscribers
+    benchmark.extra_info["replayed_events"] = len(events)
+
+
+def test_sse_join_after_profile(synthetic_github, event_loop_runner, monkeypatch):
+    async def run():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            monkeypatch.setattr(main, "http_client", http_client)
+            return await join_late("bench-5y", after="profile")
+
+    types = [event["type"] for event in event_loop_runner(run())]
+
+    # 마지막 data 이벤트는 요약만 담으므로 놓친 부분 결과를 처음부터 순서대로 받아야 결과를 만들 수 있습니다
+    assert types[0] == "start"
+    assert types[-1] == "data"
+    for partial in ("profile", "recent", "window", "repositories"):
+        assert partial in types
+    assert types.count("profile") == 1
+    assert types.index("profile") < types.index("recent") < types.index("repositories") < types.index("data")
+
+
+def test_sse_cached_stats(synthetic_github, event_loop_runner, monkeypatch):
+    username = "bench-20y"
+
+    async def run():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            monkeypatch.setattr(main, "http_client", http_client)
+            await join_late(username)
+            http_request = Request({"type": "http", "client": ("127.0.0.1", 0), "headers": []})
+            validated = await main.validate_github_user(main.GitHubUserRequest(username=username), http_request)
+            requests_before = synthetic_github.request_count
+            events = await join_late(username)
+            return validated, synthetic_github.request_count - requests_before, events
+
+    validated, requests, events = event_loop_runner(run())
+
+    # 확인 단계에서 cached 라고 했으면 수집 요청은 GitHub 를 부르지 않고 캐시의 전체 결과를 보냅니다
+    assert validated["prefetch"] == "cached"
+    assert requests == 0
+    assert [event["type"] for event in events] == ["data"]
+    assert events[0]["data"]["daily_commits_data"]
+
+
+def test_redis_sync_publish_failure(event_loop_runner, caplog):
+    """동기화 메시지 발행이 실패해도 새 구독자가 보관한 이벤트를 받고, 발행 태스크는 남지 않습니다"""
+    from server.bus import RedisEventBus
+
+    class BrokenRedis:
+        async def publish(self, channel, message):
+            raise ConnectionError("redis down")
+
+    async def run():
+        bus = RedisEventBus("redis://localhost:6379/0")
+        bus._deliver("bench", b"")
+        bus._deliver("bench", b"event")
+        bus._redis = BrokenRedis()
+        queue = bus.subscribe("bench")
+        await asyncio.sleep(0.01)
+        return bus, queue
+
+    bus, queue = event_loop_runner(run())
+    assert not bus._sync_tasks and not bus._syncs
+    assert bus.subscribers["bench"] == [queue] and queue.get_nowait() == b"event"
+    assert "redis down" in caplog.text
@@ -0,0 +1,10 @@
+"""서버 import 부터 lifespan 시작 완료까지의 시간 (새 프로세스에서 측정)"""
+
+from benchmarks.startup import time_to_ready
+
+
+def test_time_to_ready(benchmark):
+    ready_ms, loaded = benchmark.pedantic(time_to_ready, rounds=5, iterations=1)
+
+    benchmark.extra_info["ready_ms"] = ready_ms
+    assert loaded == []
@@ -0,0 +1,143 @@
+"""GitHubClient.get_user_stats 전체 파이프라인 벤치마크 (MockTransport 사용)"""
+
+import json
+
+import httpx
+import pytest
+
+from benchmarks.synthetic import ACCOUNT_YEARS
+from server.main import GitHubClient
+
+
+@pytest.mark.parametrize("years", ACCOUNT_YEARS)
+def test_get_user_stats(benchmark, synthetic_github, event_loop_runner, years):
+    async def run():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            client = GitHubClient(http_client=http_client)
+            return await client.get_user_stats(f"bench-{years}y")
+
+    result = benchmark(lambda: event_loop_runner(run()))
+
+    assert result["login"] == f"bench-{years}y"
+    assert result["total_contributions"] > 0
+    assert result["daily_commits_data"]
+
+
+def test_get_user_stats_dormant(benchmark, synthetic_github, event_loop_runner):
+    """20년 계정 중 최근 3년만 활동: contributionYears 로 빈 연도를 건너뜀"""
+    graphql_queries = []
+
+    def handle_request(request: httpx.Request) -> httpx.Response:
+        if request.method == "POST":
+            graphql_queries.append(json.loads(request.content))
+        return synthetic_github.handle_request(request)
+
+    async def run():
+        graphql_queries.clear()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handle_request)) as http_client:
+            client = GitHubClient(http_client=http_client)
+            return await client.get_user_stats("bench-dormant")
+
+    result = benchmark(lambda: event_loop_runner(run()))
+
+    account = synthetic_github.get_account("bench-dormant")
+    active_years = account.contribution_years(synthetic_github.now)
+    assert result["contributionYears"] == active_years
+    assert result["total_contributions"] > 0
+
+    # 캘린더(contributionDays) 쿼리는 최근 캘린더 + 활동한 연도마다 하나씩만 보내고, 쉬었던 17년은 한 번도 받지 않습니다
+    calendar_queries = [payload["variables"] for payload in graphql_queries if "contributionDays" in payload["query"]]
+    assert len(calendar_queries) == len(active_years) + 1
+    assert {int(variables["from"][:4]) for variables in calendar_queries} == set(active_years)
+    # 기본 정보, 연도별 합계, 저장소 쿼리를 더한 전체 GraphQL 호출 수
+    assert len(graphql_queries) == len(calendar_queries) + 3
+
+
+def test_batch_collect(benchmark, synthetic_github, event_loop_runner):
+    """ACCOUNT_YEARS 계정 전체를 별칭 쿼리로 묶어서 한 번에 수집"""
+    from server.batch import BatchCollector
+
+    usernames = [f"bench-{years}y" for years in ACCOUNT_YEARS]
+
+    async def run():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            collector = BatchCollector(GitHubClient(http_client=http_client))
+            return [result async for result in collector.collect(usernames)]
+
+    results = benchmark(lambda: event_loop_runner(run()))
+
+    assert sorted(result.username for result in results) == sorted(usernames)
+    assert all(result.error is None and result.user_data["total_contributions"] > 0 for result in results)
+
+    # 단일 사용자 수집과 같은 통계 (같은 DayCounts 계산을 씁니다)
+    async def collect():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            client = GitHubClient(http_client=http_client)
+            return {username: await client.get_user_stats(username) for username in usernames}
+
+    full = event_loop_runner(collect())
+    for result in results:
+        for key in ("total_contributions", "active_days", "max_streak", "best_day", "closed_history"):
+            assert result.user_data[key] == full[result.username][key]
+
+
+def test_refresh_current_year(benchmark, synthetic_github, event_loop_runner):
+    """인기 사용자 갱신: 끝난 연도 요약 + 올해 캘린더만 다시 받기 (전체 수집과 같은 통계)"""
+    from server.cache import CachedStats
+    from server.refresh import refresh_current_year
+
+    usernames = [f"bench-{years}y" for years in ACCOUNT_YEARS] + ["bench-dormant"]
+
+    async def collect():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            client = GitHubClient(http_client=http_client)
+            return {username: await client.get_user_stats(username) for username in usernames}
+
+    full = event_loop_runner(collect())
+    entries = {
+        username: CachedStats(user_data, b"", "", 0.0, closed_history=user_data["closed_history"])
+        for username, user_data in full.items()
+    }
+
+    async def run():
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            return await refresh_current_year(GitHubClient(http_client=http_client), entries)
+
+    results = benchmark(lambda: event_loop_runner(run()))
+
+    # 사용자 5명 갱신이 GraphQL 요청 하나
+    before = synthetic_github.request_count
+    event_loop_runner(run())
+    assert synthetic_github.request_count - before == 1
+    for username in usernames:
+        for key in ("total_contributions", "active_days", "max_streak", "best_day"):
+            assert results[username][key] == full[username][key]
+
+
+def test_conditional_stats(benchmark, synthetic_github, event_loop_runner, monkeypatch):
+    """캐시 적중 시 조건부 응답: since 응답은 전체 응답과 ETag 가 달라서 서로의 304 가 되지 않음"""
+    from starlette.requests import Request
+
+    from server import main
+
+    http_request = Request({"type": "http", "client": ("127.0.0.1", 0), "headers": []})
+    username = "bench-5y"
+
+    async def respond(if_none_match=None, since=None):
+        async with httpx.AsyncClient(transport=synthetic_github.transport()) as http_client:
+            monkeypatch.setattr(main, "http_client", http_client)
+            monkeypatch.setattr(main, "github_client", GitHubClient(http_client=http_client))
+            return await main.respond_with_stats(username, if_none_match, since, http_request)
+
+    full = event_loop_runner(respond())
+    since = sorted(day["date"] for day in main.stats_cache.peek(username).user_data["daily_commits_data"])[-30]
+    delta = event_loop_runner(respond(since=since))
+    assert full.headers["ETag"] != delta.headers["ETag"]
+
+    # 전체 응답의 ETag 로 since 를 요청하면 since 본문을 보냅니다 (반대도 마찬가지)
+    assert event_loop_runner(respond(full.headers["ETag"], since)).status_code == 200
+    assert event_loop_runner(respond(delta.headers["ETag"])).status_code == 200
+
+    not_modified = benchmark(lambda: event_loop_runner(respond(delta.headers["ETag"], since)))
+    assert not_modified.status_code == 304
+    assert not_modified.headers["ETag"] == delta.headers["ETag"]
@@ -1,13 +1,57 @@
 #!/usr/bin/env python3
 """
 GitHub to Receipt 서버 실행 스크립트
+
+    python run_server.py                    # 개발 모드 (단일 프로세스, --reload)
+    python run_server.py --prod --workers 4 # 운영 모드 (멀티 워커, uvloop/httptools, 리로더 없음)
+
+멀티 워커에서는 워커마다 캐시와 한도 상태가 따로 만들어집니다. 워커 수를 WEB_CONCURRENCY 로 넘겨서
+요청 수락 한도(STATS_CONCURRENCY 등)와 PREFETCH_CONCURRENCY 는 워커마다 1/N 씩 나눠 쓰고,
+백그라운드 갱신과 스냅샷 저장은 리더 워커 하나만 합니다. (통계 / 아바타 캐시와 ETag 는 워커마다 따로)
 """
 
+import argparse
+import importlib.util
 import os
 import sys
 from pathlib import Path
 
+def run_production(host: str, port: int, workers: int):
+    """운영 모드: 여러 워커 프로세스로 실행합니다. SSE 이벤트는 프로세스 간 이벤트 버스로 공유합니다."""
+    import uvicorn
+    
+    # 워커 간 SSE 이벤트 공유: 지정하지 않았으면 SQLite 버스를 사용합니다 (워커 프로세스가 환경변수를 물려받음)
+    if workers > 1 and os.getenv("EVENT_BUS", "local") == "local":
+        os.environ["EVENT_BUS"] = "sqlite"
+        print("ℹ️  멀티 워커 모드이므로 EVENT_BUS=sqlite 를 사용합니다.")
+    # 서버 전체 한도를 워커마다 나눠 쓰도록 워커 수를 알려줍니다
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    
+    # uvloop 은 Windows 를 지원하지 않으므로 설치되어 있을 때만 사용합니다
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    
+    print(f"🚀 운영 모드: 워커 {workers}개, loop={loop}, http={http}, event bus={os.environ.get('EVENT_BUS', 'local')}")
+    print(f"📍 서버 주소: http://{host}:{port}")
+    uvicorn.run(
+        "server.main:app",
+        host=host,
+        port=port,
+        workers=workers,
+        loop=loop,
+        http=http,
+        reload=False,
+        access_log=False,
+    )
+
 def main():
+    parser = argparse.ArgumentParser(description="GitHub to Receipt 서버 실행")
+    parser.add_argument("--prod", action="store_true", help="운영 모드 (멀티 워커, 리로더 없음)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="운영 모드 워커 수")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    
     # 프로젝트 루트로 이동
     project_root = Path(__file__).parent
     os.chdir(project_root)
@@ -24,6 +68,10 @@ def main():
         print("   GITHUB_TOKEN=your_token_here")
         return 1
     
+    if args.prod:
+        run_production(args.host, args.port, args.workers)
+        return 0
+    
     # 가상환경 확인
     if not (project_root / ".venv").exists():
         print("❌ 가상환경이 없습니다!")
@@ -33,12 +81,12 @@ def main():
     
     # 서버 실행
     print("🚀 GitHub to Receipt 서버를 시작합니다...")
-    print("📍 서버 주소: http://localhost:8000")
-    print("📖 API 문서: http://localhost:8000/docs")
+    print(f"📍 서버 주소: http://localhost:{args.port}")
+    print(f"📖 API 문서: http://localhost:{args.port}/docs")
     print("⏹️  종료하려면 Ctrl+C를 누르세요")
     print()
     
-    os.system("source .venv/bin/activate && python -m uvicorn server.main:app --host 0.0.0.0 --port 8000 --reload")
+    os.system(f"source .venv/bin/activate && python -m uvicorn server.main:app --host {args.host} --port {args.port} --reload")
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+요청 수락 제어 (admission control)
+
+학회 화면에 QR 코드가 걸리는 순간처럼 요청이 몰리면 통계 수집(get_user_stats)과 출력 작업이 한꺼번에 시작되어
+GitHub 한도를 다 써버리고, 실제로 영수증을 뽑는 키오스크까지 느려집니다. 엔드포인트 종류(stats / validate / batch / print)마다
+
+- 동시에 실행하는 작업 수(concurrency)와 대기열 길이(queue_size)를 제한하고,
+- 대기열에서는 키오스크 요청이 원격 / API 요청보다 먼저 슬롯을 받으며,
+  대기열이 가득 차면 키오스크 요청은 가장 늦게 들어온 원격 요청을 밀어냅니다.
+- 대기열이 가득 찼거나 max_wait 초 안에 슬롯을 받지 못하면 AdmissionRejected 로 바로 거절합니다.
+  (호출한 쪽에서 429 + Retry-After 로 응답)
+
+키오스크는 KIOSK_CLIENTS(IP / 대역 목록)에서 온 요청이거나 X-Kiosk-Key 헤더가 KIOSK_KEY 와 같은 요청입니다.
+"""
+
+import asyncio
+import bisect
+import hmac
+import ipaddress
+import itertools
+import math
+import time
+from typing import List, Optional, Tuple
+
+from . import metrics
+
+KIOSK = 0
+REMOTE = 1
+PRIORITY_NAMES = ("kiosk", "remote")
+
+
+class AdmissionRejected(Exception):
+    """대기열이 가득 찼거나 대기 시간이 지나서 거절된 요청"""
+
+    def __init__(self, endpoint: str, retry_after: int):
+        super().__init__(f"요청이 많아 잠시 후 다시 시도해주세요. ({endpoint}, {retry_after}초 후)")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
+
+class Slot:
+    """수락된 작업 하나. release() 는 여러 번 불러도 한 번만 반영됩니다."""
+
+    def __init__(self, limiter: "AdmissionLimiter"):
+        self.limiter = limiter
+        self.started = time.perf_counter()
+        self.released = False
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            self.limiter._release(self)
+
+
+class AdmissionLimiter:
+    """엔드포인트 종류 하나의 동시 실행 수 / 우선순위 대기열"""
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, max_wait: float = 10.0):
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.active = 0
+        # (우선순위, 도착 순서, future) - 앞에 있을수록 먼저 슬롯을 받습니다
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        # 작업 하나의 평균 소요 시간 (Retry-After 추정용, 지수 이동 평균)
+        self._service_seconds = 1.0
+        self._wait_metric = metrics.ADMISSION_WAIT_SECONDS.labels(name)
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """지금 대기열이 빠지는 데 걸릴 시간(초)을 대략 추정합니다."""
+        seconds = self._service_seconds * (self.queued + 1) / max(self.concurrency, 1)
+        return min(max(math.ceil(seconds), 1), 60)
+
+    def try_acquire(self) -> Optional[Slot]:
+        """기다리지 않고, 남는 슬롯이 있고 기다리는 요청이 없을 때만 받습니다. (미리 받기 같은 낮은 우선순위 작업용)"""
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            return Slot(self)
+        return None
+
+    def _reject(self, priority: int) -> AdmissionRejected:
+        metrics.ADMISSION_REJECTED.labels(self.name, PRIORITY_NAMES[priority]).inc()
+        return AdmissionRejected(self.name, self.retry_after())
+
+    async def acquire(self, kiosk: bool = False) -> Slot:
+        """슬롯을 받을 때까지 기다립니다. 받을 수 없으면 AdmissionRejected."""
+        priority = KIOSK if kiosk else REMOTE
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self._wait_metric.observe(0)
+            return Slot(self)
+
+        if len(self._waiters) >= self.queue_size:
+            if not self._waiters or self._waiters[-1][0] <= priority:
+                raise self._reject(priority)
+            last_priority, _, last_future = self._waiters[-1]
+            # 키오스크 요청이 가장 늦게 들어온 원격 요청 자리를 가져갑니다
+            self._waiters.pop()
+            last_future.set_exception(self._reject(last_priority))
+
+        started = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._sequence), future)
+        bisect.insort(self._waiters, entry, key=lambda waiter: waiter[:2])
+
+        try:
+            slot = await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            self._remove(entry)
+            raise self._reject(priority)
+        except asyncio.CancelledError:
+            # 슬롯을 받은 직후에 요청이 취소되면 바로 돌려줍니다
+            if future.done() and not future.cancelled() and future.exception() is None:
+                future.result().release()
+            self._remove(entry)
+            raise
+
+        self._wait_metric.observe(time.perf_counter() - started)
+        return slot
+
+    def _remove(self, entry):
+        if entry in self._waiters:
+            self._waiters.remove(entry)
+
+    def _release(self, slot: Slot):
+        self.active -= 1
+        self._service_seconds = 0.8 * self._service_seconds + 0.2 * (time.perf_counter() - slot.started)
+        while self._waiters and self.active < self.concurrency:
+            _, _, future = self._waiters.pop(0)
+            if future.done():
+                continue
+            self.active += 1
+            future.set_result(Slot(self))
+
+    def status(self) -> dict:
+        return {
+            "endpoint": self.name,
+            "active": self.active,
+            "concurrency": self.concurrency,
+            "queued": self.queued,
+            "queue_size": self.queue_size,
+            "retry_after": self.retry_after(),
+        }
+
+
+class KioskMatcher:
+    """요청이 키오스크에서 왔는지 판단합니다. (IP / 대역 목록 또는 공유 키)"""
+
+    def __init__(self, clients: Optional[str] = None, key: Optional[str] = None):
+        self.networks = [
+            ipaddress.ip_network(client.strip(), strict=False)
+            for client in (clients or "").split(",") if client.strip()
+        ]
+        self.key = key
+
+    def matches(self, host: Optional[str], key: Optional[str] = None) -> bool:
+        if self.key and key and hmac.compare_digest(self.key, key):
+            return True
+        if not host:
+            return False
+        try:
+            address = ipaddress.ip_address(host)
+        except ValueError:
+            return False
+        return any(address in network for network in self.networks)
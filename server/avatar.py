@@ -0,0 +1,182 @@
+"""
+프로필 사진(아바타) 캐시
+
+영수증에 들어가는 아바타를 공유 HTTP 클라이언트로 한 번만 받아서 두 가지 형태로 보관합니다.
+다시 방문한 사용자나 재출력은 다운로드/변환/디더링을 다시 하지 않습니다.
+
+- 화면용: 영수증 캡처(pixelRatio 2)에 그려지는 픽셀 크기의 흑백(L) PNG (/api/avatar)
+- 출력용: 프린터 도트 크기로 미리 디더링한 1비트 PNG.
+  캡처한 영수증은 출력 너비로 다시 줄어들어서 캡처 안의 아바타는 리사이즈 후 다시 디더링해야 하므로,
+  출력할 때는 영수증을 디더링한 뒤 그 자리에 이 1비트 아바타를 그대로 덮어씁니다. (stamp_avatar)
+- 캐시 키는 (아바타 URL, 한 변 픽셀/도트 수, 1비트 여부) 이고, max_entries 를 넘으면 가장 오래 쓰지 않은 항목부터 버립니다.
+- 같은 아바타를 동시에 요청하면 다운로드는 한 번만 하고, 미리 받기(prewarm)는 두 형태를 한 번의 다운로드로 만듭니다.
+- 리다이렉트는 따라가지 않습니다. (허용한 호스트 밖의 주소를 대신 받아주지 않도록)
+"""
+
+import asyncio
+import io
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode, urlparse, parse_qsl, urlunparse
+
+import httpx
+
+from . import metrics
+from .raster import PRINT_WIDTH, dither
+
+logger = logging.getLogger(__name__)
+
+# 영수증 화면의 아바타(64px, 테두리 2px)가 영수증 캡처(ReceiptScreen 의 toPng, pixelRatio 2)에서 차지하는 크기
+AVATAR_CSS_SIZE = 64
+AVATAR_CSS_BORDER = 2
+CAPTURE_PIXEL_RATIO = 2
+DEFAULT_AVATAR_SIZE = AVATAR_CSS_SIZE * CAPTURE_PIXEL_RATIO
+# 영수증(max-w-sm, 384px) 캡처가 출력 너비로 줄어든 뒤 아바타(테두리 안쪽)가 차지하는 도트 수
+RECEIPT_CSS_WIDTH = 384
+DEFAULT_PRINT_DOTS = round((AVATAR_CSS_SIZE - 2 * AVATAR_CSS_BORDER) * PRINT_WIDTH / RECEIPT_CSS_WIDTH)
+
+# (URL, 한 변 픽셀/도트 수, 1비트 여부)
+AvatarKey = Tuple[str, int, bool]
+
+
+def prepare_avatar(image_bytes: bytes, size: int, mono: bool = False) -> bytes:
+    """아바타를 흰 배경의 size x size 흑백(L) PNG 로 변환합니다.
+
+    mono 면 영수증 래스터와 같은 방식(raster.dither, 1 = 검은 점)으로 디더링한 1비트 PNG 로 만듭니다.
+    """
+    from PIL import Image
+
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.mode in ("RGBA", "LA", "P"):
+        # 투명 배경은 영수증 용지색(흰색)으로
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, "white")
+        image = Image.alpha_composite(background, image)
+    image = image.convert("L").resize((size, size), Image.Resampling.LANCZOS)
+    if mono:
+        image = dither(image)
+
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def stamp_avatar(mono: "Any", png: bytes, left: int, top: int) -> bool:
+    """디더링한 영수증(1비트, 1 = 검은 점)의 아바타 자리에 미리 디더링한 아바타를 원 모양으로 덮어씁니다.
+
+    아바타가 영수증 밖으로 나가면 덮어쓰지 않고 False 를 반환합니다.
+    """
+    from PIL import Image, ImageDraw
+
+    avatar = Image.open(io.BytesIO(png))
+    if left + avatar.width > mono.width or top + avatar.height > mono.height:
+        return False
+    mask = Image.new("1", avatar.size, 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, avatar.width - 1, avatar.height - 1), fill=1)
+    mono.paste(avatar, (left, top), mask)
+    return True
+
+
+def sized_avatar_url(url: str, size: int) -> str:
+    """GitHub 아바타 URL 에 s(크기) 파라미터를 붙여서 필요한 만큼만 받습니다."""
+    parsed = urlparse(url)
+    query = dict(parse_qsl(parsed.query))
+    query["s"] = str(size * 2)
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+class AvatarCache:
+    """(URL, 크기, 1비트 여부)별 아바타 PNG 의 LRU 캐시"""
+
+    def __init__(self, max_entries: int = 256, allowed_hosts: Tuple[str, ...] = ("avatars.githubusercontent.com",)):
+        self.max_entries = max_entries
+        self.allowed_hosts = allowed_hosts
+        self.http_client: Optional[httpx.AsyncClient] = None
+        self._entries: "OrderedDict[AvatarKey, bytes]" = OrderedDict()
+        self._pending: Dict[AvatarKey, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def items(self) -> List[Tuple[AvatarKey, bytes]]:
+        """오래 쓰지 않은 순서의 ((URL, 크기, 1비트 여부), PNG) 목록 (스냅샷용)"""
+        return list(self._entries.items())
+
+    def restore(self, entries: Iterable[Tuple[AvatarKey, bytes]]):
+        """items() 로 저장한 항목을 같은 LRU 순서로 되살립니다."""
+        restored: "OrderedDict[AvatarKey, bytes]" = OrderedDict(entries)
+        restored.update(self._entries)
+        self._entries = restored
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def is_allowed(self, url: str) -> bool:
+        """임의의 주소를 대신 받아주지 않도록 GitHub 아바타 호스트만 허용합니다."""
+        parsed = urlparse(url)
+        return parsed.scheme == "https" and parsed.hostname in self.allowed_hosts
+
+    async def get(self, url: str, size: int = DEFAULT_AVATAR_SIZE, mono: bool = False) -> bytes:
+        """아바타 PNG 를 반환합니다. 없으면 받아서 변환한 뒤 저장합니다. (mono 면 출력용 1비트)"""
+        key = (url, size, mono)
+        png = self._entries.get(key)
+        if png is not None:
+            self._entries.move_to_end(key)
+            metrics.AVATAR_CACHE_HIT.inc()
+            return png
+
+        metrics.AVATAR_CACHE_MISS.inc()
+        task = self._pending.get(key) or self._start(url, [key])
+        return (await asyncio.shield(task))[key]
+
+    def prewarm(self, url: Optional[str]):
+        """통계 수집 중에 화면용과 출력용(기본 도트 크기) 아바타를 한 번의 다운로드로 미리 만들어 둡니다. (실패해도 무시)"""
+        if not url or not self.is_allowed(url):
+            return
+        keys = [
+            key for key in ((url, DEFAULT_AVATAR_SIZE, False), (url, DEFAULT_PRINT_DOTS, True))
+            if key not in self._entries and key not in self._pending
+        ]
+        if keys:
+            self._start(url, keys).add_done_callback(_log_prewarm_failure)
+
+    def _start(self, url: str, keys: List[AvatarKey]) -> asyncio.Task:
+        task = asyncio.create_task(self._load(url, keys))
+        for key in keys:
+            self._pending[key] = task
+
+        def done(_):
+            for key in keys:
+                if self._pending.get(key) is task:
+                    del self._pending[key]
+
+        task.add_done_callback(done)
+        return task
+
+    async def _load(self, url: str, keys: List[AvatarKey]) -> Dict[AvatarKey, bytes]:
+        # 리다이렉트(3xx)도 raise_for_status 에서 실패로 처리됩니다
+        avatar_url = sized_avatar_url(url, max(size for _, size, _ in keys))
+        if self.http_client is not None:
+            response = await self.http_client.get(avatar_url, follow_redirects=False)
+        else:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(avatar_url, follow_redirects=False)
+        response.raise_for_status()
+
+        def convert() -> Dict[AvatarKey, bytes]:
+            return {key: prepare_avatar(response.content, key[1], key[2]) for key in keys}
+
+        with metrics.IMAGE_AVATAR.time():
+            pngs = await asyncio.to_thread(convert)
+
+        for key, png in pngs.items():
+            self._entries[key] = png
+            self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return pngs
+
+
+def _log_prewarm_failure(task: asyncio.Task):
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"아바타 미리 받기 실패: {task.exception()}")
@@ -0,0 +1,306 @@
+"""
+여러 사용자 통계 배치 수집
+
+해커톤 참가자 명단처럼 많은 아이디를 한꺼번에 조회할 때 사용자마다 get_user_stats 를 따로
+돌리지 않고, 별칭(u0: user(login: $l0) ...)으로 여러 user 선택을 한 GraphQL 요청에 담습니다.
+
+1. 프로필 그룹 쿼리: 사용자 PROFILE_GROUP_SIZE 명의 기본 정보 + 최근 6개월 캘린더 + 상위 레포지토리
+2. 캘린더 윈도우 쿼리: 여러 사용자의 기여가 있는 연도(contributionYears) 윈도우를 WINDOWS_PER_QUERY 개씩 묶어서 조회
+
+GitHub GraphQL 은 한 요청에서 가져올 수 있는 노드 수(50만)와 요청당 비용 포인트를 제한하므로
+묶음 크기는 레포지토리 10개 x 10명, 캘린더 1년 x 8개 수준으로 작게 유지합니다.
+사용자의 마지막 윈도우가 도착하면 바로 그 사용자 결과를 내보내고, 오류는 사용자 단위로 보고합니다.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from . import metrics
+from .stats import (
+    DayCounts,
+    calendar_counts,
+    format_top_repositories,
+    history_closed_summary,
+    history_stats,
+    parse_github_datetime,
+    plan_history_windows,
+)
+
+PROFILE_GROUP_SIZE = 10
+WINDOWS_PER_QUERY = 8
+TOP_REPOSITORY_LIMIT = 10
+
+_PROFILE_FIELDS = """
+    name
+    login
+    avatarUrl
+    createdAt
+    followers {
+      totalCount
+    }
+    following {
+      totalCount
+    }
+    repositories(privacy: PUBLIC) {
+      totalCount
+    }
+    years: contributionsCollection {
+      contributionYears
+    }
+    contributionsCollection(from: $from, to: $to) {
+      contributionCalendar {
+        weeks {
+          contributionDays {
+            date
+            contributionCount
+          }
+        }
+      }
+    }
+    topRepositories: repositories(
+      first: $first,
+      privacy: PUBLIC,
+      ownerAffiliations: OWNER,
+      orderBy: {field: STARGAZERS, direction: DESC}
+    ) {
+      nodes {
+        name
+        stargazerCount
+        primaryLanguage {
+          name
+        }
+        updatedAt
+      }
+    }
+"""
+
+# 인기 사용자 갱신(refresh.py)용: 올해 1월 1일부터의 캘린더
+_CURRENT_YEAR_FIELDS = """
+    currentYear: contributionsCollection(from: $yearFrom, to: $to) {
+      contributionCalendar {
+        weeks {
+          contributionDays {
+            date
+            contributionCount
+          }
+        }
+      }
+    }
+"""
+
+_WINDOW_FIELDS = """
+    contributionsCollection(from: $f{index}, to: $t{index}) {{
+      contributionCalendar {{
+        weeks {{
+          contributionDays {{
+            date
+            contributionCount
+          }}
+        }}
+      }}
+    }}
+"""
+
+
+@dataclass
+class BatchResult:
+    """사용자 한 명의 배치 수집 결과 (user_data 와 error 중 하나만 채워집니다)"""
+    username: str
+    user_data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class _PendingUser:
+    username: str
+    profile: Dict[str, Any]
+    recent: List[Dict[str, Any]]
+    top_repositories: List[Dict[str, Any]]
+    remaining_windows: int
+    history: List[DayCounts] = field(default_factory=list)
+    failed: bool = False
+
+
+def build_profile_query(count: int, current_year: bool = False) -> str:
+    """사용자 count 명의 프로필 그룹 쿼리 (변수: $l0..., $from, $to, $first)
+
+    current_year 면 올해 캘린더(currentYear, 변수 $yearFrom)도 함께 조회합니다.
+    """
+    declarations = ", ".join(f"$l{index}: String!" for index in range(count))
+    fields = _PROFILE_FIELDS + _CURRENT_YEAR_FIELDS if current_year else _PROFILE_FIELDS
+    selections = "\n".join(f"  u{index}: user(login: $l{index}) {{{fields}  }}" for index in range(count))
+    extra = ", $yearFrom: DateTime!" if current_year else ""
+    return f"query({declarations}, $from: DateTime!, $to: DateTime!, $first: Int!{extra}) {{\n{selections}\n}}"
+
+
+def build_window_query(count: int) -> str:
+    """캘린더 윈도우 count 개의 쿼리 (변수: $l0/$f0/$t0 ...)"""
+    declarations = ", ".join(f"$l{index}: String!, $f{index}: DateTime!, $t{index}: DateTime!" for index in range(count))
+    selections = "\n".join(
+        f"  w{index}: user(login: $l{index}) {{{_WINDOW_FIELDS.format(index=index)}  }}" for index in range(count)
+    )
+    return f"query({declarations}) {{\n{selections}\n}}"
+
+
+def _errors_by_alias(payload: Dict[str, Any]) -> Dict[str, str]:
+    """GraphQL errors 를 path 의 첫 번째 항목(별칭)별 메시지로 모읍니다."""
+    result: Dict[str, str] = {}
+    for error in payload.get("errors") or []:
+        path = error.get("path") or []
+        if path:
+            result.setdefault(str(path[0]), error.get("message", "GitHub API 오류"))
+    return result
+
+
+def _global_error(payload: Dict[str, Any]) -> Optional[str]:
+    """특정 별칭에 속하지 않는 오류(한도 초과 등)가 있으면 메시지를 반환합니다."""
+    for error in payload.get("errors") or []:
+        if not error.get("path"):
+            return error.get("message", "GitHub API 오류")
+    return None
+
+
+class BatchCollector:
+    """별칭 GraphQL 쿼리로 여러 사용자의 통계를 모으는 수집기
+
+    client 는 GitHubClient 로, 요청 전송(_post_graphql)과 공유 HTTP 클라이언트를 그대로 사용합니다.
+    concurrency 는 동시에 보내는 GraphQL 요청 수입니다.
+    """
+
+    def __init__(self, client, concurrency: int = 4, group_size: int = PROFILE_GROUP_SIZE, windows_per_query: int = WINDOWS_PER_QUERY):
+        self.client = client
+        self.group_size = group_size
+        self.windows_per_query = windows_per_query
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._results: "asyncio.Queue[BatchResult]" = asyncio.Queue()
+        self._reported: set = set()
+        self._end_date = datetime.now()
+
+    async def collect(self, usernames: List[str]) -> AsyncIterator[BatchResult]:
+        """사용자별 결과를 끝나는 순서대로 내보냅니다."""
+        groups = [usernames[index:index + self.group_size] for index in range(0, len(usernames), self.group_size)]
+        tasks = [asyncio.create_task(self._run_group(group)) for group in groups]
+        try:
+            for _ in range(len(usernames)):
+                yield await self._results.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _post(self, query: str, variables: Dict[str, Any], latency_metric) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """쿼리를 보내고 (응답 JSON, 요청 전체 오류 메시지) 를 반환합니다."""
+        async with self._semaphore:
+            try:
+                response = await self.client._post_graphql(query, variables, latency_metric)
+            except Exception as e:
+                return None, f"GitHub API 요청 실패: {e}"
+
+        if response.status_code != 200:
+            return None, f"GitHub API 요청 실패: {response.status_code}"
+
+        payload = response.json()
+        message = _global_error(payload)
+        if message is not None or not isinstance(payload.get("data"), dict):
+            return None, f"GitHub API 오류: {message}"
+        return payload, None
+
+    def _report(self, result: BatchResult):
+        """사용자마다 결과를 한 번만 내보냅니다."""
+        if result.username in self._reported:
+            return
+        self._reported.add(result.username)
+        self._results.put_nowait(result)
+
+    async def _run_group(self, group: List[str]):
+        try:
+            await self._collect_group(group)
+        except Exception as e:
+            # 예상하지 못한 응답 형태 등: 아직 결과가 없는 사용자만 오류로 마감합니다
+            for username in group:
+                self._report(BatchResult(username, error=f"배치 수집 실패: {e}"))
+
+    async def _collect_group(self, group: List[str]):
+        variables: Dict[str, Any] = {f"l{index}": username for index, username in enumerate(group)}
+        variables.update({
+            "from": (self._end_date - timedelta(days=180)).isoformat(),
+            "to": self._end_date.isoformat(),
+            "first": TOP_REPOSITORY_LIMIT,
+        })
+
+        payload, failure = await self._post(build_profile_query(len(group)), variables, metrics.GRAPHQL_BATCH_PROFILE)
+        if failure is not None:
+            for username in group:
+                self._report(BatchResult(username, error=failure))
+            return
+
+        errors = _errors_by_alias(payload)
+        pending: Dict[str, _PendingUser] = {}
+        windows: List[Tuple[str, datetime, datetime]] = []
+
+        for index, username in enumerate(group):
+            alias = f"u{index}"
+            user = payload["data"].get(alias)
+            if not user:
+                self._report(BatchResult(username, error=errors.get(alias, f"사용자 '{username}'를 찾을 수 없습니다.")))
+                continue
+
+            recent = calendar_counts(user.pop("contributionsCollection")["contributionCalendar"], (self._end_date - timedelta(days=180)).date()).to_days()
+            top_repositories = format_top_repositories(user.pop("topRepositories")["nodes"])
+            user["contributionYears"] = user.pop("years")["contributionYears"]
+            user_windows = plan_history_windows(parse_github_datetime(user["createdAt"]), self._end_date, user["contributionYears"])
+
+            pending[username] = _PendingUser(username, user, recent, top_repositories, len(user_windows))
+            windows.extend((username, start, end) for start, end in user_windows)
+
+        for username, entry in list(pending.items()):
+            if entry.remaining_windows == 0:
+                self._finish(entry)
+
+        chunks = [windows[index:index + self.windows_per_query] for index in range(0, len(windows), self.windows_per_query)]
+        await asyncio.gather(*(self._collect_windows(chunk, pending) for chunk in chunks))
+
+    async def _collect_windows(self, chunk: List[Tuple[str, datetime, datetime]], pending: Dict[str, _PendingUser]):
+        variables: Dict[str, Any] = {}
+        for index, (username, start, end) in enumerate(chunk):
+            variables[f"l{index}"] = username
+            variables[f"f{index}"] = start.isoformat()
+            variables[f"t{index}"] = end.isoformat()
+
+        payload, failure = await self._post(build_window_query(len(chunk)), variables, metrics.GRAPHQL_BATCH_CALENDAR)
+        errors = _errors_by_alias(payload) if payload is not None else {}
+
+        for index, (username, start, end) in enumerate(chunk):
+            entry = pending[username]
+            alias = f"w{index}"
+            user = payload["data"].get(alias) if payload is not None else None
+
+            if user is None:
+                if not entry.failed:
+                    entry.failed = True
+                    message = failure or errors.get(alias, "캘린더 조회 실패")
+                    self._report(BatchResult(username, error=f"{start:%Y-%m-%d}~{end:%Y-%m-%d} {message}"))
+            else:
+                entry.history.append(calendar_counts(user["contributionsCollection"]["contributionCalendar"], start.date()))
+
+            entry.remaining_windows -= 1
+            if entry.remaining_windows == 0 and not entry.failed:
+                self._finish(entry)
+
+    def _finish(self, entry: _PendingUser):
+        """마지막 윈도우까지 도착한 사용자의 통계를 계산해서 내보냅니다."""
+        # 윈도우 묶음은 동시에 조회하므로 도착 순서가 날짜 순서가 아닙니다
+        history = sorted(entry.history, key=lambda window: window.start)
+        summary = history_stats(history)
+        user_data = {
+            **entry.profile,
+            "total_contributions": summary["total_contributions"],
+            "daily_commits_data": entry.recent,
+            "active_days": summary["active_days"],
+            "max_streak": summary["max_streak"],
+            "best_day": summary["best_day"],
+            "top_repositories": entry.top_repositories,
+            "closed_history": history_closed_summary(history, self._end_date.year),
+        }
+        self._report(BatchResult(entry.username, user_data=user_data))
@@ -0,0 +1,333 @@
+"""
+SSE 이벤트 버스
+
+작업(get_user_stats)이 발행한 이벤트를 같은 사용자의 SSE 구독자에게 전달합니다.
+구독자 큐는 항상 각 워커 프로세스 안에 있고, 버스 구현에 따라 발행된 메시지가
+다른 워커로 어떻게 전달되는지만 달라집니다.
+
+- local  : 한 프로세스 안에서만 전달 (개발 / 단일 워커)
+- sqlite : 공유 SQLite 파일을 통해 모든 워커에 전달 (별도 브로커 불필요)
+- redis  : Redis(호환) pub/sub 으로 전달 (redis 패키지 필요)
+
+EVENT_BUS / EVENT_BUS_URL 환경변수로 선택합니다.
+
+키오스크는 수집을 시작(POST)한 뒤에 SSE 를 연결하므로 첫 이벤트(또는 캐시된 결과의 data 이벤트)가
+구독보다 먼저 발행될 수 있습니다. 그래서 begin() 으로 시작한 작업의 이벤트는 모든 워커가 채널별로
+replay_ttl 초 동안 보관하고, 새 구독자에게 지금까지의 이벤트를 먼저 보낸 뒤 이후 이벤트를 이어서 보냅니다.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# 새 작업의 시작을 알리는 메시지 (구독자에게는 보내지 않고 워커마다 보관 중인 이벤트를 비웁니다)
+JOB_START = b""
+
+
+class JobLog:
+    """채널의 마지막 작업에서 발행된 이벤트"""
+
+    def __init__(self, limit: int):
+        self.messages: Deque[bytes] = deque(maxlen=limit)
+        self.updated = time.monotonic()
+
+    def append(self, message: bytes):
+        self.messages.append(message)
+        self.updated = time.monotonic()
+
+
+class EventBus:
+    """한 프로세스 안에서만 이벤트를 전달하는 기본 버스"""
+
+    name = "local"
+
+    # 작업 하나의 이벤트는 20년 계정도 60개 정도이므로 부분 결과(profile 등)가 밀려나지 않습니다
+    def __init__(self, replay_ttl: float = 120.0, replay_limit: int = 256):
+        # 채널(사용자 이름)별 이 프로세스의 SSE 구독자 큐
+        self.subscribers: Dict[str, List[asyncio.Queue]] = {}
+        self.replay_ttl = replay_ttl
+        self.replay_limit = replay_limit
+        # 채널별 마지막 작업의 이벤트 (늦게 연결한 구독자에게 먼저 보냅니다)
+        self.logs: Dict[str, JobLog] = {}
+        # 이 워커에서 실행 중인 작업 수
+        self.jobs: Dict[str, int] = {}
+        # 지난 이벤트를 아직 받지 못한 구독자 큐
+        self._pending: Dict[str, List[asyncio.Queue]] = {}
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, channel: str) -> asyncio.Queue:
+        """구독합니다. 큐에는 채널의 마지막 작업에서 이미 발행된 이벤트가 먼저 들어갑니다."""
+        queue: asyncio.Queue = asyncio.Queue()
+        self._pending.setdefault(channel, []).append(queue)
+        self._sync()
+        return queue
+
+    def unsubscribe(self, channel: str, queue: asyncio.Queue):
+        for registry in (self._pending, self.subscribers):
+            queues = registry.get(channel)
+            if queues is None:
+                continue
+            if queue in queues:
+                queues.remove(queue)
+            if not queues:
+                del registry[channel]
+
+    def may_have_listeners(self, channel: str) -> bool:
+        """발행할 필요가 있는지
+
+        이 워커에서 실행 중인 작업의 이벤트는 (다른 워커에) 늦게 연결할 구독자를 위해 항상 발행하고,
+        그 밖의 이벤트는 이 워커에 구독자가 있을 때만 발행합니다. (프로세스 간 버스도 같습니다)
+        """
+        return channel in self.jobs or channel in self.subscribers
+
+    async def begin(self, channel: str):
+        """채널의 새 작업을 시작합니다. 이후 새 구독자는 지난 작업이 아닌 이 작업의 이벤트부터 받습니다."""
+        self.jobs[channel] = self.jobs.get(channel, 0) + 1
+        await self.publish(channel, JOB_START)
+
+    def end(self, channel: str):
+        """작업이 끝났습니다. 보관한 이벤트는 replay_ttl 동안 남습니다."""
+        remaining = self.jobs.get(channel, 0) - 1
+        if remaining > 0:
+            self.jobs[channel] = remaining
+        else:
+            self.jobs.pop(channel, None)
+
+    async def publish(self, channel: str, message: bytes):
+        """인코딩이 끝난 SSE 메시지를 채널의 모든 구독자에게 발행합니다."""
+        self._deliver(channel, message)
+
+    def _deliver(self, channel: str, message: bytes):
+        if message == JOB_START:
+            self._expire()
+            self.logs[channel] = JobLog(self.replay_limit)
+            return
+        log = self.logs.get(channel)
+        if log is not None:
+            log.append(message)
+        for queue in self.subscribers.get(channel, ()):
+            queue.put_nowait(message)
+
+    def _sync(self):
+        """지금까지 발행된 메시지가 이 워커에 모두 전달된 뒤 _replay() 를 호출합니다. (한 프로세스 안에서는 바로)"""
+        self._replay(self._waiting())
+
+    def _waiting(self) -> Dict[str, List[asyncio.Queue]]:
+        return {channel: list(queues) for channel, queues in self._pending.items()}
+
+    def _replay(self, waiting: Dict[str, List[asyncio.Queue]]):
+        """waiting 의 구독자(그사이 구독을 끊지 않은)에게 보관한 이벤트를 보내고 구독자 목록에 넣습니다."""
+        self._expire()
+        for channel, queues in waiting.items():
+            log = self.logs.get(channel)
+            for queue in queues:
+                pending = self._pending.get(channel)
+                if pending is None or queue not in pending:
+                    continue
+                pending.remove(queue)
+                if not pending:
+                    del self._pending[channel]
+                if log is not None:
+                    for message in log.messages:
+                        queue.put_nowait(message)
+                self.subscribers.setdefault(channel, []).append(queue)
+
+    def _expire(self):
+        deadline = time.monotonic() - self.replay_ttl
+        for channel in [channel for channel, log in self.logs.items() if log.updated < deadline]:
+            del self.logs[channel]
+
+
+class SQLiteEventBus(EventBus):
+    """공유 SQLite 파일을 메시지 로그로 사용하는 프로세스 간 버스
+
+    발행은 행을 추가하고, 각 워커는 마지막으로 읽은 id 이후의 행을 주기적으로 읽어서
+    자기 프로세스의 구독자에게 전달합니다. 오래된 행은 retention 이 지나면 지웁니다.
+    새 구독자는 다음 폴링에서 (구독하기 전에 추가된 행까지 읽은 뒤) 보관한 이벤트를 받습니다.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: str, poll_interval: float = 0.05, retention: float = 300.0):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last_id = 0
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, message BLOB NOT NULL, created REAL NOT NULL)"
+        )
+        return connection
+
+    def _execute(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._connection.execute(sql, params).fetchall()
+
+    async def start(self):
+        self._connection = await asyncio.to_thread(self._connect)
+        rows = await asyncio.to_thread(self._execute, "SELECT COALESCE(MAX(id), 0) FROM events")
+        self._last_id = rows[0][0]
+        self._poll_task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self):
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _sync(self):
+        # 구독하기 전에 다른 워커가 추가한 행까지 읽는 다음 폴링에서 보냅니다
+        pass
+
+    async def publish(self, channel: str, message: bytes):
+        await asyncio.to_thread(
+            self._execute,
+            "INSERT INTO events (channel, message, created) VALUES (?, ?, ?)",
+            (channel, message, time.time()),
+        )
+
+    async def _poll_loop(self):
+        last_cleanup = time.time()
+        while True:
+            try:
+                # 구독자가 없어도 늦게 연결할 구독자를 위해 작업 이벤트를 보관합니다
+                waiting = self._waiting()
+                rows = await asyncio.to_thread(
+                    self._execute, "SELECT id, channel, message FROM events WHERE id > ? ORDER BY id", (self._last_id,)
+                )
+                for row_id, channel, message in rows:
+                    self._last_id = row_id
+                    self._deliver(channel, bytes(message))
+                if waiting:
+                    self._replay(waiting)
+
+                if time.time() - last_cleanup > self.retention:
+                    last_cleanup = time.time()
+                    await asyncio.to_thread(self._execute, "DELETE FROM events WHERE created < ?", (last_cleanup - self.retention,))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"SQLite 이벤트 버스 폴링 실패: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+
+class RedisEventBus(EventBus):
+    """Redis(호환) pub/sub 을 사용하는 프로세스 간 버스
+
+    새 구독자는 이 워커의 동기화 채널에 보낸 메시지가 되돌아온 뒤(그 전에 발행된 메시지는 모두 받은 뒤)
+    보관한 이벤트를 받습니다. (동기화 채널 이름은 GitHub 사용자 이름에 쓸 수 없는 '~' 로 시작합니다)
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "github-to-receipt:"):
+        super().__init__()
+        self.url = url
+        self.prefix = prefix
+        self._redis = None
+        self._listen_task: Optional[asyncio.Task] = None
+        self._sync_channel = f"~sync:{uuid.uuid4().hex}"
+        self._sync_ids = itertools.count()
+        self._syncs: Dict[bytes, Dict[str, List[asyncio.Queue]]] = {}
+        # 발행 중인 동기화 메시지 (태스크 참조를 잡아두고 실패하면 로그를 남깁니다)
+        self._sync_tasks: Set[asyncio.Task] = set()
+
+    async def start(self):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("EVENT_BUS=redis 를 사용하려면 redis 패키지가 필요합니다. (pip install redis)") from e
+
+        self._redis = redis.from_url(self.url)
+        pubsub = self._redis.pubsub()
+        await pubsub.psubscribe(f"{self.prefix}*")
+        self._listen_task = asyncio.create_task(self._listen(pubsub))
+
+    async def stop(self):
+        if self._listen_task is not None:
+            self._listen_task.cancel()
+            try:
+                await self._listen_task
+            except asyncio.CancelledError:
+                pass
+        for task in list(self._sync_tasks):
+            task.cancel()
+        await asyncio.gather(*self._sync_tasks, return_exceptions=True)
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+    def _sync(self):
+        token = str(next(self._sync_ids)).encode()
+        self._syncs[token] = self._waiting()
+        task = asyncio.create_task(self.publish(self._sync_channel, token))
+        self._sync_tasks.add(task)
+        task.add_done_callback(lambda task: self._sync_done(token, task))
+
+    def _sync_done(self, token: bytes, task: asyncio.Task):
+        self._sync_tasks.discard(task)
+        if task.cancelled() or task.exception() is None:
+            return
+        logger.warning(f"동기화 메시지를 발행하지 못했습니다: {task.exception()}")
+        # 되돌아오지 않을 메시지를 기다리지 않고 이 워커가 보관한 이벤트를 바로 보냅니다
+        self._replay(self._syncs.pop(token, {}))
+
+    async def publish(self, channel: str, message: bytes):
+        await self._redis.publish(f"{self.prefix}{channel}", message)
+
+    async def _listen(self, pubsub):
+        try:
+            async for item in pubsub.listen():
+                if item["type"] != "pmessage":
+                    continue
+                channel = item["channel"].decode()[len(self.prefix):]
+                if channel.startswith("~"):
+                    if channel == self._sync_channel:
+                        self._replay(self._syncs.pop(item["data"], {}))
+                    continue
+                self._deliver(channel, item["data"])
+        finally:
+            await pubsub.aclose()
+
+
+def create_event_bus() -> EventBus:
+    """EVENT_BUS / EVENT_BUS_URL 환경변수에 맞는 버스를 만듭니다."""
+    kind = os.getenv("EVENT_BUS", "local").lower()
+    url = os.getenv("EVENT_BUS_URL")
+
+    if kind == "sqlite":
+        return SQLiteEventBus(url or os.path.join(tempfile.gettempdir(), "github-to-receipt-events.db"))
+    if kind == "redis":
+        return RedisEventBus(url or "redis://localhost:6379/0")
+    if kind != "local":
+        raise ValueError(f"알 수 없는 EVENT_BUS 값입니다: {kind}")
+    return EventBus()
@@ -0,0 +1,126 @@
+"""
+사용자 통계 캐시
+
+get_user_stats 결과와 직렬화된 응답 본문, 버전 해시(ETag)를 함께 보관합니다.
+- 신선한(fresh_seconds 이내) 항목은 GitHub 를 다시 호출하지 않고 그대로 응답합니다.
+- ETag 가 같으면 304 로 응답하므로 본문을 다시 직렬화하거나 전송하지 않습니다.
+- since 로 일부만 보내는 응답은 본문이 다르므로 전체 응답과 다른 ETag(representation_etag)를 씁니다.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from . import metrics
+
+
+def compute_etag(user_data: Dict[str, Any]) -> str:
+    """프로필과 캘린더 데이터로 응답 버전 해시를 계산합니다."""
+    version = (
+        user_data["login"],
+        user_data["name"],
+        user_data["avatarUrl"],
+        user_data["followers"]["totalCount"],
+        user_data["following"]["totalCount"],
+        user_data["repositories"]["totalCount"],
+        user_data["total_contributions"],
+        user_data["active_days"],
+        user_data["max_streak"],
+        user_data["best_day"]["date"],
+        user_data["best_day"]["count"],
+        [(day["date"], day["count"]) for day in user_data["daily_commits_data"]],
+        [(repo["name"], repo["stargazers_count"], repo["updated_at"]) for repo in user_data["top_repositories"]],
+    )
+    digest = hashlib.blake2b(orjson.dumps(version), digest_size=12).hexdigest()
+    return f'"{digest}"'
+
+
+def representation_etag(etag: str, since: Optional[str] = None) -> str:
+    """실제로 보내는 본문의 ETag. since 응답은 (전체 버전, since) 로 본문이 정해지므로 둘을 합칩니다."""
+    if not since:
+        return etag
+    return f'"{etag.strip(chr(34))}-since-{since}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더 값이 etag 와 일치하는지 확인합니다. (목록 / 약한 비교 / * 지원)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+@dataclass
+class CachedStats:
+    user_data: Dict[str, Any]
+    body: bytes
+    etag: str
+    fetched_at: float
+    # 끝난 연도의 통계 요약 (stats.history_closed_summary) - 올해 캘린더만 다시 받아서 갱신할 때 사용
+    closed_history: Optional[Dict[str, Any]] = None
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+
+class StatsCache:
+    """사용자 이름(대소문자 무시)별 통계 LRU 캐시"""
+
+    def __init__(self, max_entries: int = 512, fresh_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.fresh_seconds = fresh_seconds
+        self._entries: "OrderedDict[str, CachedStats]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, username: str) -> Optional[CachedStats]:
+        entry = self._entries.get(username.lower())
+        if entry is None:
+            metrics.STATS_CACHE_MISS.inc()
+            return None
+        self._entries.move_to_end(username.lower())
+        metrics.STATS_CACHE_HIT.inc()
+        return entry
+
+    def peek(self, username: str) -> Optional[CachedStats]:
+        """적중률 / LRU 순서에 영향을 주지 않고 항목을 확인합니다. (백그라운드 갱신용)"""
+        return self._entries.get(username.lower())
+
+    def is_fresh(self, entry: CachedStats) -> bool:
+        return entry.age < self.fresh_seconds
+
+    def put(self, username: str, user_data: Dict[str, Any], body: bytes, fetched_at: Optional[float] = None, closed_history: Optional[Dict[str, Any]] = None) -> CachedStats:
+        entry = CachedStats(
+            user_data=user_data,
+            body=body,
+            etag=compute_etag(user_data),
+            fetched_at=fetched_at if fetched_at is not None else time.time(),
+            closed_history=closed_history,
+        )
+        key = username.lower()
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def items(self) -> List[Tuple[str, CachedStats]]:
+        """오래 쓰지 않은 순서의 (키, 항목) 목록 (스냅샷용)"""
+        return list(self._entries.items())
+
+    def restore(self, entries: Iterable[Tuple[str, CachedStats]]):
+        """items() 로 저장한 항목을 같은 LRU 순서로 되살립니다. (이미 있는 항목이 더 최근으로 남습니다)"""
+        restored: "OrderedDict[str, CachedStats]" = OrderedDict(entries)
+        restored.update(self._entries)
+        self._entries = restored
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
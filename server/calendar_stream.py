@@ -0,0 +1,61 @@
+"""
+캘린더 응답 스트리밍 디코더
+
+여러 해에 걸친 수집에서 response.json() 은 연도마다 weeks -> contributionDays 의 중첩 dict 트리를 만듭니다.
+(10년이면 수만 개의 짧게 사는 객체)
+
+CalendarDecoder 는 응답 본문을 받는 대로(feed) 일별 레코드만 정규식으로 찾아서 기여 수를 정수 배열(DayCounts)에
+바로 넣습니다. 날짜는 첫 날짜와 마지막 날짜만 보관하고, 끝에서 배열 길이와 맞는지(날짜가 연속인지) 확인합니다.
+
+쿼리는 contributionDays { date contributionCount } 순서로 선택해야 합니다. (GraphQL 응답은 선택 순서를 따릅니다)
+"""
+
+import re
+from array import array
+from datetime import date
+from typing import Optional
+
+from .stats import DayCounts
+
+DAY_PATTERN = re.compile(rb'"date"\s*:\s*"(\d{4}-\d{2}-\d{2})"\s*,\s*"contributionCount"\s*:\s*(\d+)')
+ERRORS_KEY = b'"errors"'
+
+
+class CalendarDecodeError(ValueError):
+    """GitHub 오류 응답이거나 응답의 날짜가 연속되지 않아 DayCounts 로 만들 수 없음"""
+
+
+class CalendarDecoder:
+    def __init__(self):
+        self.counts = array("I")
+        self.first_date: Optional[bytes] = None
+        self.last_date: Optional[bytes] = None
+        self.errors = False
+        # 아직 끝나지 않은 레코드가 있을 수 있는 마지막 '}' 이후 부분
+        self._pending = b""
+
+    def feed(self, chunk: bytes):
+        buffer = self._pending + chunk if self._pending else chunk
+        if not self.errors and ERRORS_KEY in buffer:
+            self.errors = True
+
+        # 일별 레코드는 '}' 를 포함하지 않으므로 마지막 '}' 까지는 완성된 레코드만 있습니다
+        cut = buffer.rfind(b"}") + 1
+        days = DAY_PATTERN.findall(buffer, 0, cut)
+        if days:
+            if self.first_date is None:
+                self.first_date = days[0][0]
+            self.last_date = days[-1][0]
+            self.counts.extend(int(count) for _, count in days)
+        self._pending = buffer[cut:]
+
+    def result(self) -> Optional[DayCounts]:
+        """캘린더가 없으면 None. GitHub 오류 응답("errors")이거나 날짜가 연속되지 않으면 CalendarDecodeError."""
+        if self.errors:
+            raise CalendarDecodeError("GitHub API 오류 응답입니다.")
+        if self.first_date is None:
+            return None
+        days = DayCounts(date.fromisoformat(self.first_date.decode()), self.counts)
+        if days.end != date.fromisoformat(self.last_date.decode()):
+            raise CalendarDecodeError(f"캘린더 날짜가 연속되지 않습니다: {days.start} ~ {self.last_date.decode()} ({len(days)}일)")
+        return days
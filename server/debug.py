@@ -0,0 +1,241 @@
+"""
+운영 중 진단용 디버그 엔드포인트 (/api/debug/*)
+
+행사 중에 키오스크 서버가 느려졌을 때 재시작하지 않고 원인을 보기 위한 도구입니다.
+DEBUG_TOKEN 환경변수가 있을 때만 install() 로 라우트와 미들웨어를 등록하므로, 꺼져 있을 때는 비용이 없습니다.
+모든 요청은 X-Debug-Token 헤더가 DEBUG_TOKEN 과 같아야 합니다.
+
+- POST /api/debug/profile?seconds=10 | ?requests=5 : 샘플링 프로파일러(pyinstrument)를 N초 동안 또는
+  다음 N개 요청이 끝날 때까지 실행하고 HTML / speedscope / 텍스트 보고서를 반환합니다.
+- POST /api/debug/tracemalloc/start, POST .../snapshot?name=before, GET .../diff?base=before :
+  tracemalloc 스냅샷을 찍고 비교해서 메모리를 많이 할당한 위치를 보여줍니다.
+- GET /api/debug/tasks : 살아 있는 asyncio 태스크와 스택
+- GET /api/debug/stalls : 루프 지연 감시(looplag)가 기록한 최근 루프 정지와 그때의 스택 (LOOP_LAG_MONITOR=0 이면 404)
+
+pyinstrument 는 선택 의존성입니다. (pip install pyinstrument)
+"""
+
+import asyncio
+import hmac
+import time
+import tracemalloc
+import traceback
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, FastAPI, Header, HTTPException
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response
+
+PROFILE_MAX_SECONDS = 120.0
+# 샘플 간격이 이보다 짧으면 프로파일러가 루프 스레드를 잡아먹어서 보려던 지연을 오히려 만듭니다
+PROFILE_MIN_INTERVAL = 0.0005
+MAX_SNAPSHOTS = 8
+
+
+class ProfileSession:
+    """진행 중인 프로파일링 (한 번에 하나만)"""
+
+    def __init__(self, requests: Optional[int]):
+        self.requests = requests
+        self.completed = 0
+        self.done = asyncio.Event()
+
+    def request_finished(self):
+        self.completed += 1
+        if self.requests is not None and self.completed >= self.requests:
+            self.done.set()
+
+
+class DebugState:
+    def __init__(self, token: str):
+        self.token = token
+        self.session: Optional[ProfileSession] = None
+        self.snapshots: "OrderedDict[str, tracemalloc.Snapshot]" = OrderedDict()
+
+
+class RequestCounterMiddleware:
+    """프로파일링 중일 때만 끝난 요청 수를 셉니다. (/api/debug 요청은 제외)"""
+
+    def __init__(self, app, state: DebugState):
+        self.app = app
+        self.state = state
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.state.session is None or scope["path"].startswith("/api/debug"):
+            await self.app(scope, receive, send)
+            return
+        session = self.state.session
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            session.request_finished()
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    # tracemalloc 자체와 import 과정의 할당은 제외합니다
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    ))
+
+
+def _format_stat(stat, include_diff: bool) -> Dict[str, Any]:
+    frame = stat.traceback[0]
+    result = {
+        "location": f"{frame.filename}:{frame.lineno}",
+        "size_kb": round(stat.size / 1024, 1),
+        "count": stat.count,
+        "traceback": [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback] if len(stat.traceback) > 1 else None,
+    }
+    if include_diff:
+        result["size_diff_kb"] = round(stat.size_diff / 1024, 1)
+        result["count_diff"] = stat.count_diff
+    return result
+
+
+def _task_info(task: asyncio.Task) -> Dict[str, Any]:
+    coro = task.get_coro()
+    stack = traceback.StackSummary.extract(
+        ((frame, frame.f_lineno) for frame in task.get_stack()), lookup_lines=True
+    )
+    return {
+        "name": task.get_name(),
+        "coro": getattr(coro, "__qualname__", repr(coro)),
+        "done": task.done(),
+        "cancelled": task.cancelled(),
+        "stack": [f"{frame.filename}:{frame.lineno} in {frame.name}: {frame.line}" for frame in stack],
+    }
+
+
+def create_router(state: DebugState, loop_monitor=None) -> APIRouter:
+    async def require_token(x_debug_token: Optional[str] = Header(None)):
+        if not x_debug_token or not hmac.compare_digest(x_debug_token, state.token):
+            raise HTTPException(status_code=401, detail="X-Debug-Token 이 필요합니다.")
+
+    router = APIRouter(prefix="/api/debug", dependencies=[Depends(require_token)])
+
+    @router.post("/profile")
+    async def profile(seconds: Optional[float] = None, requests: Optional[int] = None, format: str = "html", interval: float = 0.001):
+        """N초 동안 또는 다음 N개 요청이 끝날 때까지 이벤트 루프 스레드를 샘플링합니다."""
+        try:
+            from pyinstrument import Profiler
+            from pyinstrument.renderers import SpeedscopeRenderer
+        except ImportError:
+            raise HTTPException(status_code=501, detail="pyinstrument 가 설치되어 있지 않습니다. (pip install pyinstrument)")
+        if format not in ("html", "speedscope", "text"):
+            raise HTTPException(status_code=400, detail="format 은 html, speedscope, text 중 하나입니다.")
+        if seconds is None and requests is None:
+            seconds = 10.0
+        # 0, 음수, nan 도 최소 간격으로
+        interval = interval if interval >= PROFILE_MIN_INTERVAL else PROFILE_MIN_INTERVAL
+        if state.session is not None:
+            raise HTTPException(status_code=409, detail="이미 프로파일링 중입니다.")
+
+        # requests 만 주면 PROFILE_MAX_SECONDS 까지 기다립니다
+        timeout = min(seconds if seconds is not None else PROFILE_MAX_SECONDS, PROFILE_MAX_SECONDS)
+        session = ProfileSession(requests)
+        # 루프 스레드 전체(모든 요청 / 백그라운드 작업)를 보기 위해 async_mode 를 끕니다
+        profiler = Profiler(interval=interval, async_mode="disabled")
+        state.session = session
+        started = time.perf_counter()
+        profiler.start()
+        try:
+            await asyncio.wait_for(session.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            profiler.stop()
+            state.session = None
+
+        headers = {
+            "X-Profile-Seconds": f"{time.perf_counter() - started:.2f}",
+            "X-Profile-Requests": str(session.completed),
+        }
+        if format == "speedscope":
+            headers["Content-Disposition"] = 'attachment; filename="profile.speedscope.json"'
+            return Response(profiler.output(renderer=SpeedscopeRenderer()), media_type="application/json", headers=headers)
+        if format == "text":
+            return PlainTextResponse(profiler.output_text(unicode=True), headers=headers)
+        return HTMLResponse(profiler.output_html(), headers=headers)
+
+    @router.post("/tracemalloc/start")
+    async def tracemalloc_start(frames: int = 1):
+        """할당 추적을 시작합니다. frames 가 크면 호출 경로까지 보지만 느려집니다."""
+        if tracemalloc.is_tracing():
+            raise HTTPException(status_code=409, detail="이미 추적 중입니다.")
+        tracemalloc.start(frames)
+        return {"tracing": True, "frames": frames}
+
+    @router.post("/tracemalloc/stop")
+    async def tracemalloc_stop():
+        tracemalloc.stop()
+        state.snapshots.clear()
+        return {"tracing": False}
+
+    @router.post("/tracemalloc/snapshot")
+    async def tracemalloc_snapshot(name: str = "latest", top: int = 20, key_type: str = "lineno", include: Optional[str] = None):
+        """스냅샷을 name 으로 저장하고 할당량이 큰 위치 top 개를 반환합니다. (include: 경로에 포함된 문자열)"""
+        if not tracemalloc.is_tracing():
+            raise HTTPException(status_code=409, detail="먼저 /api/debug/tracemalloc/start 를 호출하세요.")
+        snapshot = await asyncio.to_thread(_snapshot)
+        state.snapshots[name] = snapshot
+        state.snapshots.move_to_end(name)
+        while len(state.snapshots) > MAX_SNAPSHOTS:
+            state.snapshots.popitem(last=False)
+
+        if include:
+            snapshot = snapshot.filter_traces((tracemalloc.Filter(True, f"*{include}*"),))
+        stats = snapshot.statistics(key_type)
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "name": name,
+            "traced_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "top": [_format_stat(stat, include_diff=False) for stat in stats[:top]],
+        }
+
+    @router.get("/tracemalloc/diff")
+    async def tracemalloc_diff(base: str, target: Optional[str] = None, top: int = 20, key_type: str = "lineno", include: Optional[str] = None):
+        """base 스냅샷과 target 스냅샷(없으면 지금) 사이에 늘어난 할당을 큰 순서로 반환합니다."""
+        if base not in state.snapshots or (target is not None and target not in state.snapshots):
+            raise HTTPException(status_code=404, detail=f"스냅샷이 없습니다. (저장된 스냅샷: {list(state.snapshots)})")
+        if target is None and not tracemalloc.is_tracing():
+            raise HTTPException(status_code=409, detail="추적 중이 아닙니다.")
+
+        before = state.snapshots[base]
+        after = state.snapshots[target] if target is not None else await asyncio.to_thread(_snapshot)
+        if include:
+            include_filter = (tracemalloc.Filter(True, f"*{include}*"),)
+            before, after = before.filter_traces(include_filter), after.filter_traces(include_filter)
+        stats = await asyncio.to_thread(after.compare_to, before, key_type)
+        return {
+            "base": base,
+            "target": target or "now",
+            "size_diff_kb": round(sum(stat.size_diff for stat in stats) / 1024, 1),
+            "top": [_format_stat(stat, include_diff=True) for stat in stats[:top]],
+        }
+
+    @router.get("/tasks")
+    async def tasks():
+        """살아 있는 asyncio 태스크와 각 태스크가 멈춰 있는 위치(스택)"""
+        current = asyncio.current_task()
+        infos: List[Dict[str, Any]] = [_task_info(task) for task in asyncio.all_tasks() if task is not current]
+        return {"count": len(infos), "tasks": sorted(infos, key=lambda info: info["coro"])}
+
+    @router.get("/stalls")
+    async def stalls():
+        """최근 루프 정지 기록 (감시 스레드가 잡은 루프 스레드 스택)"""
+        if loop_monitor is None or not loop_monitor.running:
+            raise HTTPException(status_code=404, detail="루프 지연 감시가 꺼져 있습니다.")
+        return loop_monitor.status()
+
+    return router
+
+
+def install(app: FastAPI, token: str, loop_monitor=None):
+    """디버그 라우트와 요청 카운터 미들웨어를 등록합니다."""
+    state = DebugState(token)
+    app.include_router(create_router(state, loop_monitor))
+    app.add_middleware(RequestCounterMiddleware, state=state)
+    return state
@@ -0,0 +1,152 @@
+"""
+GraphQL 요청 헤징(hedged requests)
+
+여러 윈도우를 차례로 받는 수집에서는 가장 느린 GitHub 응답 하나가 get_user_stats 전체 시간을 정합니다.
+조회 쿼리는 여러 번 보내도 결과가 같으므로, 요청이 쿼리 종류별 최근 지연 시간의 percentile(기본 p95)보다
+오래 걸리면 같은 요청을 한 번 더 보내고 먼저 끝난 응답을 씁니다. 늦은 쪽은 취소합니다.
+
+- 헤지 요청은 예산 안에서만 보냅니다. 헤징 대상 요청마다 ratio 만큼 토큰이 쌓이고(최대 burst) 헤지 하나에 1 을 씁니다.
+  (기본 5%: 헤지로 늘어나는 GitHub 한도 사용량은 요청 수의 5% 이하)
+- allow() 가 False 면(GitHub 남은 한도가 적을 때 등) 헤지하지 않습니다.
+- 지연 시간 표본이 min_samples 개 모이기 전에는 헤지하지 않습니다.
+- 예외가 나거나 accept(결과) 가 False 인 시도(GitHub 오류 응답 등)는 실패로 보고 다른 시도를 기다립니다.
+  둘 다 실패했을 때만 원래 요청의 결과(또는 오류)를 반환합니다.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, TypeVar
+
+from . import metrics
+
+T = TypeVar("T")
+
+
+class LatencyWindow:
+    """최근 size 개 요청의 지연 시간"""
+
+    def __init__(self, size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def observe(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> float:
+        ordered = sorted(self.samples)
+        return ordered[min(math.ceil(q * len(ordered)) - 1, len(ordered) - 1)]
+
+
+class HedgeBudget:
+    """헤지 요청 수를 헤징 대상 요청 수의 ratio 비율로 제한하는 토큰 버킷"""
+
+    def __init__(self, ratio: float = 0.05, burst: float = 2.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst if ratio > 0 else 0.0
+
+    def earn(self):
+        self.tokens = min(self.tokens + self.ratio, self.burst)
+
+    def take(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class Hedger:
+    def __init__(
+        self,
+        percentile: float = 0.95,
+        ratio: float = 0.05,
+        burst: float = 2.0,
+        min_samples: int = 20,
+        min_delay: float = 0.05,
+        window: int = 200,
+        allow: Callable[[], bool] = lambda: True,
+    ):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.window = window
+        self.allow = allow
+        self.budget = HedgeBudget(ratio, burst)
+        self.latencies: Dict[str, LatencyWindow] = {}
+
+    def _latencies(self, kind: str) -> LatencyWindow:
+        if kind not in self.latencies:
+            self.latencies[kind] = LatencyWindow(self.window)
+        return self.latencies[kind]
+
+    def delay(self, kind: str) -> Optional[float]:
+        """헤지 요청을 보내기 전까지 기다릴 시간 (표본이 모자라면 None)"""
+        latencies = self._latencies(kind)
+        if len(latencies) < self.min_samples:
+            return None
+        return max(latencies.percentile(self.percentile), self.min_delay)
+
+    def snapshot(self) -> Dict[str, List[float]]:
+        return {kind: list(latencies.samples) for kind, latencies in self.latencies.items()}
+
+    def restore(self, samples: Dict[str, List[float]]):
+        for kind, values in samples.items():
+            latencies = self._latencies(kind)
+            if not latencies.samples:
+                latencies.samples.extend(values)
+
+    async def _timed(self, kind: str, attempt: Callable[[], Awaitable[T]], primary: bool) -> T:
+        """attempt() 가 끝나는 데 걸린 시간을 기록합니다.
+
+        헤지에 져서 취소된 원래 요청은 취소될 때까지의 시간(실제 지연 시간의 하한)을 기록합니다.
+        빼면 가장 느린 요청들이 표본에서 빠져서 percentile 이 점점 낮아집니다.
+        취소된 헤지 요청은 늦게 시작했을 뿐이라 지연 시간에 대해 알려주는 것이 없어서 기록하지 않습니다.
+        """
+        started = time.perf_counter()
+        try:
+            result = await attempt()
+        except asyncio.CancelledError:
+            if primary:
+                self._latencies(kind).observe(time.perf_counter() - started)
+            raise
+        self._latencies(kind).observe(time.perf_counter() - started)
+        return result
+
+    async def run(self, kind: str, attempt: Callable[[], Awaitable[T]], accept: Callable[[T], bool] = lambda result: True) -> T:
+        """attempt() 를 실행하고, delay(kind) 안에 끝나지 않으면 한 번 더 실행해서 먼저 성공한 결과를 반환합니다."""
+        if self.budget.ratio <= 0:
+            return await attempt()
+        self.budget.earn()
+        primary = asyncio.ensure_future(self._timed(kind, attempt, primary=True))
+        tasks = [primary]
+        try:
+            delay = self.delay(kind)
+            if delay is None:
+                return await primary
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return primary.result()
+            if not self.allow() or not self.budget.take():
+                metrics.GRAPHQL_HEDGES.labels(kind, "skipped").inc()
+                return await primary
+
+            hedge = asyncio.ensure_future(self._timed(kind, attempt, primary=False))
+            tasks.append(hedge)
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None and accept(task.result()):
+                        # won: 헤지 요청이 먼저 끝나서 지연을 줄임 / lost: 원래 요청이 먼저 끝남
+                        metrics.GRAPHQL_HEDGES.labels(kind, "won" if task is hedge else "lost").inc()
+                        return task.result()
+            # 둘 다 실패하면 원래 요청의 오류를 그대로 올립니다
+            metrics.GRAPHQL_HEDGES.labels(kind, "failed").inc()
+            return primary.result()
+        finally:
+            for task in tasks:
+                task.cancel()
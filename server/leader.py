@@ -0,0 +1,79 @@
+"""
+멀티 워커 리더 선출
+
+run_server.py --prod 로 여러 워커를 띄우면 워커마다 모듈 상태(캐시, 백그라운드 갱신, 스냅샷)가 따로 만들어집니다.
+GitHub 한도를 쓰는 백그라운드 갱신과 스냅샷 파일 쓰기는 한 워커만 해야 하므로, 잠금 파일을 잡은 워커 하나를
+리더로 정해서 그 워커에서만 실행합니다. 잠금은 프로세스가 끝나면 운영체제가 풀어 주므로, 리더 워커가 죽으면
+다른 워커가 retry 초 안에 이어받습니다. (단일 프로세스에서는 항상 리더)
+"""
+
+import asyncio
+import logging
+import os
+from typing import IO, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _try_lock(file: IO[bytes]) -> bool:
+    """기다리지 않고 파일을 잠급니다. 다른 프로세스가 잡고 있으면 False."""
+    try:
+        if os.name == "nt":
+            import msvcrt
+
+            file.seek(0)
+            msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        return False
+    return True
+
+
+class LeaderLock:
+    def __init__(self, path: str, retry: float = 10.0):
+        self.path = path
+        self.retry = retry
+        self.is_leader = False
+        self._file: Optional[IO[bytes]] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def try_acquire(self) -> bool:
+        if self.is_leader:
+            return True
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        file = open(self.path, "a+b")
+        if not _try_lock(file):
+            file.close()
+            return False
+        self._file = file
+        self.is_leader = True
+        return True
+
+    def start(self, on_elected: Callable[[], None]):
+        """리더가 되면 on_elected() 를 한 번 호출합니다. (지금 될 수 없으면 retry 초마다 다시 시도)"""
+        if self.try_acquire():
+            on_elected()
+        elif self._task is None:
+            self._task = asyncio.create_task(self._wait(on_elected))
+
+    async def _wait(self, on_elected: Callable[[], None]):
+        while not self.try_acquire():
+            await asyncio.sleep(self.retry)
+        logger.info(f"리더 워커가 되었습니다 (pid {os.getpid()})")
+        on_elected()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def release(self):
+        """잠금을 풉니다. (종료할 때 백그라운드 작업을 모두 멈춘 뒤 호출)"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.is_leader = False
@@ -0,0 +1,108 @@
+"""
+이벤트 루프 지연(loop lag) 감시
+
+비동기 엔드포인트 안의 블로킹 작업(시리얼 쓰기, Pillow 리사이즈, 파일 저장 등) 하나가 루프를 막으면
+모든 SSE 스트림이 함께 멈춥니다.
+
+- 하트비트 태스크가 interval 마다 깨어나서 예정보다 늦게 깨어난 시간(스케줄링 지연)을 메트릭으로 남깁니다.
+- 감시 스레드는 하트비트가 threshold 이상 늦어지면 그 순간 루프 스레드의 스택(sys._current_frames)을 잡아서
+  경고 로그로 남기고 최근 기록(recent)에 보관합니다. 막고 있는 코드가 바로 그 스택의 맨 아래에 있습니다.
+- debug 를 켜면 asyncio 디버그 모드와 slow_callback_duration 으로 느린 콜백도 asyncio 로그에 남깁니다. (스테이징용)
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    def __init__(self, interval: float = 0.1, threshold: float = 0.1, debug: bool = False, keep: int = 20):
+        self.interval = interval
+        self.threshold = threshold
+        self.debug = debug
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=keep)
+        self.max_lag = 0.0
+        self._last_beat = time.perf_counter()
+        self._captured_beat: Optional[float] = None
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        """실행 중인 루프에서 호출합니다."""
+        loop = asyncio.get_running_loop()
+        if self.debug:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+        self._loop_thread = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _heartbeat(self):
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.perf_counter()
+            lag = max(now - expected, 0.0)
+            self._last_beat = now
+            self.max_lag = max(self.max_lag, lag)
+            metrics.EVENT_LOOP_LAG_SECONDS.observe(lag)
+            metrics.EVENT_LOOP_LAG.set(lag)
+            if lag >= self.threshold and self.recent and self.recent[-1]["lag_seconds"] is None:
+                # 감시 스레드가 잡은 정지 기록에 실제로 막힌 시간을 채웁니다
+                self.recent[-1]["lag_seconds"] = round(lag, 3)
+
+    def _watch(self):
+        while not self._stop.wait(self.threshold / 4):
+            beat = self._last_beat
+            stalled = time.perf_counter() - beat - self.interval
+            if stalled < self.threshold or self._captured_beat == beat:
+                continue
+            # 같은 정지는 한 번만 기록합니다
+            self._captured_beat = beat
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            stack = traceback.format_stack(frame)
+            metrics.EVENT_LOOP_STALLS.inc()
+            self.recent.append({
+                "at": time.time(),
+                "stalled_seconds": round(stalled, 3),
+                "lag_seconds": None,
+                "stack": [line.rstrip() for line in stack],
+            })
+            logger.warning(f"이벤트 루프가 {stalled * 1000:.0f}ms 이상 멈춰 있습니다. 루프 스레드 스택:\n{''.join(stack[-8:])}")
+
+    def status(self) -> Dict[str, Any]:
+        stalls: List[Dict[str, Any]] = list(self.recent)
+        return {
+            "interval": self.interval,
+            "threshold": self.threshold,
+            "debug": self.debug,
+            "max_lag_seconds": round(self.max_lag, 3),
+            "stalls": stalls,
+        }
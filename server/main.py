@@ -1,25 +1,135 @@
-from fastapi import FastAPI, HTTPException, File, UploadFile
+import time
+
+# import 시작 시각 (서버 준비 완료까지 걸린 시간 보고용)
+_import_started = time.perf_counter()
+
+from contextlib import AsyncExitStack, asynccontextmanager
+from fastapi import FastAPI, HTTPException, File, UploadFile, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, Response
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional, Union, AsyncGenerator
+from typing import List, Dict, Any, Optional, Tuple, Union, AsyncGenerator, TYPE_CHECKING
 import httpx
 import os
-import json
+import orjson
 import asyncio
-from datetime import datetime, timedelta
+import tempfile
+from datetime import datetime, timedelta, date
 from dotenv import load_dotenv
 import base64
-from PIL import Image
 import io
-from escpos.printer import Usb, Serial, Network
+# 프린터(python-escpos -> pyusb, pyserial, barcode, qrcode)와 이미지(Pillow) 스택은
+# import 비용이 커서 처음 사용할 때 불러옵니다
 # from escpos.exceptions import USBNotFoundError, SerialException
 import logging
 
+if TYPE_CHECKING:
+    from PIL import Image
+
+from . import metrics, timing
+from .admission import AdmissionLimiter, AdmissionRejected, KioskMatcher, Slot
+from .avatar import DEFAULT_AVATAR_SIZE, AvatarCache, stamp_avatar
+from .batch import BatchCollector
+from .bus import create_event_bus
+from .cache import CachedStats, StatsCache, etag_matches, representation_etag
+from .calendar_stream import CalendarDecodeError, CalendarDecoder
+from .hedge import Hedger
+from .leader import LeaderLock
+from .looplag import LoopLagMonitor
+from .prefetch import PrefetchedStats, Prefetcher, Warmup
+from .printers import PrinterUnavailable, create_printer_pool
+from .raster import PRINT_WIDTH, encode_raster, to_mono
+from .refresh import RateBudget, Refresher, refresh_current_year
+from .snapshot import WarmState
+from .stats import (
+    DayCounts,
+    format_top_repositories,
+    history_closed_summary,
+    history_stats,
+    history_window_summary,
+    parse_github_datetime,
+    plan_history_windows,
+    stats_summary,
+)
+from .timing import StageTimer
+
 # 환경변수 로드
 load_dotenv()
 
-app = FastAPI(title="GitHub to Receipt API", version="1.0.0")
+# 워커 수 (run_server.py --prod 가 WEB_CONCURRENCY 로 넘김, uvicorn --workers 로 직접 띄울 때도 같이 설정)
+# 워커마다 같은 모듈 상태가 따로 만들어지므로 프로세스 전체에 거는 한도는 워커 수로 나눠서 씁니다
+WORKERS = max(int(os.getenv("WEB_CONCURRENCY", "1")), 1)
+
+def per_worker(total: int) -> int:
+    """전체 한도를 워커 하나의 몫으로 나눕니다. (올림, 최소 1)"""
+    return max(-(-total // WORKERS), 1)
+
+# 백그라운드 갱신과 스냅샷 저장은 잠금 파일을 잡은 리더 워커 하나만 합니다
+# (기본 잠금 파일은 같은 uvicorn 부모 프로세스의 워커끼리만 공유)
+leader = LeaderLock(
+    os.getenv("LEADER_LOCK_PATH") or os.path.join(tempfile.gettempdir(), f"github-to-receipt-leader-{os.getppid()}.lock")
+)
+
+# 이벤트 루프 지연 감시 (LOOP_LAG_MONITOR=0 이면 끔, ASYNCIO_DEBUG=1 이면 느린 콜백도 asyncio 로그에 남김)
+LOOP_LAG_MONITOR = os.getenv("LOOP_LAG_MONITOR", "1") != "0"
+loop_monitor = LoopLagMonitor(
+    interval=float(os.getenv("LOOP_LAG_INTERVAL", "0.1")),
+    threshold=float(os.getenv("LOOP_LAG_THRESHOLD", "0.1")),
+    debug=os.getenv("ASYNCIO_DEBUG") == "1"
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """공유 HTTP 클라이언트와 GitHub 클라이언트를 서버 시작 시 만들고, 종료 시 정리합니다."""
+    global http_client, github_client
+    
+    # 지난 실행의 캐시와 한도 정보를 먼저 되살립니다
+    if warm_state is not None:
+        warm_state.restore()
+    
+    await event_bus.start()
+    if LOOP_LAG_MONITOR:
+        loop_monitor.start()
+    
+    http_client = httpx.AsyncClient(
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+    )
+    avatar_cache.http_client = http_client
+    try:
+        github_client = GitHubClient(http_client=http_client)
+    except ValueError as e:
+        # 토큰이 없어도 서버는 뜨고, GitHub 조회 요청만 실패합니다
+        logger.error(f"GitHub 클라이언트를 만들 수 없습니다: {e}")
+    
+    def start_leader_tasks():
+        refresher.start()
+        if warm_state is not None:
+            warm_state.start()
+    
+    leader.start(start_leader_tasks)
+    
+    logger.info(f"서버 준비 완료 (import 부터 {(time.perf_counter() - _import_started) * 1000:.0f}ms)")
+    
+    try:
+        yield
+    finally:
+        await leader.stop()
+        # 스냅샷 파일은 리더만 씁니다 (다른 워커가 덮어쓰지 않도록)
+        if warm_state is not None and leader.is_leader:
+            await warm_state.stop()
+        await loop_monitor.stop()
+        await refresher.stop()
+        await prefetcher.stop()
+        await http_client.aclose()
+        await event_bus.stop()
+        leader.release()
+        avatar_cache.http_client = None
+        http_client = None
+        github_client = None
+
+app = FastAPI(title="GitHub to Receipt API", version="1.0.0", lifespan=lifespan)
 
 # CORS 설정 (React 앱에서 접근 가능하도록)
 app.add_middleware(
@@ -28,15 +138,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "ETag"],
 )
 
+# 진단용 디버그 엔드포인트 (DEBUG_TOKEN 이 있을 때만 라우트와 미들웨어를 등록합니다)
+if os.getenv("DEBUG_TOKEN"):
+    from . import debug
+    debug.install(app, os.getenv("DEBUG_TOKEN"), loop_monitor)
+
 # Pydantic 모델들
 class GitHubUserRequest(BaseModel):
     username: str
 
+class GitHubBatchRequest(BaseModel):
+    usernames: List[str]
+
+class ReceiptAvatar(BaseModel):
+    """영수증 이미지 안의 아바타 위치 (테두리 안쪽, 영수증 너비에 대한 비율)"""
+    url: str
+    left: float
+    top: float
+    size: float
+
 class ImageUploadRequest(BaseModel):
     image_data: str  # base64 encoded image data
     filename: Optional[str] = None
+    avatar: Optional[ReceiptAvatar] = None
 
 class CommitData(BaseModel):
     date: str
@@ -65,26 +192,30 @@ class GitHubStatsResponse(BaseModel):
 
 # 상태 이벤트 타입 정의
 class StatusEvent:
-    def __init__(self, event_type: str, message: str, progress: int = 0, data: Optional[Dict[str, Any]] = None):
+    def __init__(self, event_type: str, message: str, progress: int = 0, data: Optional[Dict[str, Any]] = None, timing: Optional[Dict[str, Any]] = None):
         self.event_type = event_type
         self.message = message
         self.progress = progress
         self.data = data or {}
+        self.timing = timing  # 최종 data 이벤트에만 포함되는 단계별 소요 시간
         self.timestamp = datetime.now().isoformat()
 
 # GitHub GraphQL API 클라이언트
 class GitHubClient:
-    def __init__(self, status_callback=None):
+    def __init__(self, status_callback=None, http_client: Optional[httpx.AsyncClient] = None):
         self.token = os.getenv("GITHUB_TOKEN")
         if not self.token:
             raise ValueError("GITHUB_TOKEN 환경변수가 설정되지 않았습니다.")
         
-        self.base_url = "https://api.github.com/graphql"
+        # 로컬 부하 테스트용 가짜 서버를 가리키도록 GITHUB_GRAPHQL_URL 로 변경 가능
+        self.base_url = os.getenv("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
         self.headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json",
         }
         self.status_callback = status_callback
+        # 외부에서 주입한 HTTP 클라이언트 (없으면 요청마다 새로 생성)
+        self.http_client = http_client
     
     async def emit_status(self, event_type: str, message: str, progress: int = 0, data: Optional[Dict[str, Any]] = None):
         """상태 이벤트를 발생시킵니다."""
@@ -92,6 +223,100 @@ class GitHubClient:
             event = StatusEvent(event_type, message, progress, data)
             await self.status_callback(event)
     
+    async def _post_graphql(self, query: str, variables: Dict[str, Any], latency_metric, hedge: Optional[str] = None) -> httpx.Response:
+        """GraphQL 쿼리를 전송하고 응답을 반환합니다. 소요 시간은 latency_metric 에 기록합니다.
+        
+        hedge 에 쿼리 종류를 넘기면 그 종류의 최근 p95 보다 오래 걸릴 때 같은 요청을 한 번 더 보내고 먼저 온 응답을 씁니다.
+        """
+        if hedge is not None:
+            return await hedger.run(
+                hedge,
+                lambda: self._send_graphql(query, variables, latency_metric),
+                accept=lambda response: response.status_code == 200
+            )
+        return await self._send_graphql(query, variables, latency_metric)
+    
+    async def _send_graphql(self, query: str, variables: Dict[str, Any], latency_metric) -> httpx.Response:
+        """GraphQL 요청 하나를 전송합니다."""
+        with latency_metric.time():
+            if self.http_client is not None:
+                response = await self.http_client.post(
+                    self.base_url,
+                    json={"query": query, "variables": variables},
+                    headers=self.headers,
+                    timeout=30.0
+                )
+            else:
+                async with httpx.AsyncClient() as client:
+                    response = await client.post(
+                        self.base_url,
+                        json={"query": query, "variables": variables},
+                        headers=self.headers,
+                        timeout=30.0
+                    )
+        
+        # 남은 한도 (백그라운드 갱신이 쓸 수 있는 몫 계산용)
+        rate_budget.update(response.headers)
+        return response
+    
+    async def _stream_graphql(self, query: str, variables: Dict[str, Any], latency_metric, decoder: CalendarDecoder) -> int:
+        """GraphQL 쿼리를 전송하고 응답 본문을 받는 대로 decoder 에 넘깁니다. 응답 상태 코드를 반환합니다."""
+        with latency_metric.time():
+            async with AsyncExitStack() as stack:
+                client = self.http_client or await stack.enter_async_context(httpx.AsyncClient())
+                response = await stack.enter_async_context(client.stream(
+                    "POST",
+                    self.base_url,
+                    json={"query": query, "variables": variables},
+                    headers=self.headers,
+                    timeout=30.0
+                ))
+                if response.status_code == 200:
+                    async for chunk in response.aiter_bytes():
+                        decoder.feed(chunk)
+        
+        rate_budget.update(response.headers)
+        return response.status_code
+    
+    async def _get_calendar_counts(self, username: str, from_date: datetime, to_date: datetime, latency_metric, hedge: str) -> Optional[DayCounts]:
+        """기간의 일별 기여 수를 dict 트리 없이 DayCounts 로 가져옵니다. (실패하거나 없는 사용자면 None)"""
+        query = """
+        query($username: String!, $from: DateTime!, $to: DateTime!) {
+          user(login: $username) {
+            contributionsCollection(from: $from, to: $to) {
+              contributionCalendar {
+                weeks {
+                  contributionDays {
+                    date
+                    contributionCount
+                  }
+                }
+              }
+            }
+          }
+        }
+        """
+        
+        variables = {
+            "username": username,
+            "from": from_date.isoformat(),
+            "to": to_date.isoformat()
+        }
+        
+        async def attempt() -> Optional[DayCounts]:
+            # 헤지 요청은 각자 디코더를 쓰고, 오류 응답 / 디코딩 실패(CalendarDecodeError)도 그 시도의 실패입니다
+            decoder = CalendarDecoder()
+            status_code = await self._stream_graphql(query, variables, latency_metric, decoder)
+            return decoder.result() if status_code == 200 else None
+        
+        # 실패한 시도는 헤지 경쟁에서 이긴 것으로 치지 않고 다른 시도를 기다립니다
+        try:
+            return await hedger.run(hedge, attempt, accept=lambda days: days is not None)
+        except CalendarDecodeError as e:
+            # HTTP 오류 응답과 같이 그 기간의 캘린더 없이 진행합니다
+            logger.warning(f"캘린더 응답을 읽을 수 없습니다 ({username}, {from_date:%Y-%m-%d}~{to_date:%Y-%m-%d}): {e}")
+            return None
+    
     async def get_user_basic_info(self, username: str) -> Dict[str, Any]:
         """사용자의 기본 정보와 계정 생성일을 가져옵니다."""
         await self.emit_status("api_call", f"사용자 기본 정보를 조회하고 있습니다: {username}", 5)
@@ -112,226 +337,136 @@ class GitHubClient:
             repositories(privacy: PUBLIC) {
               totalCount
             }
+            contributionsCollection {
+              contributionYears
+            }
           }
         }
         """
         
         variables = {"username": username}
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.base_url,
-                json={"query": query, "variables": variables},
-                headers=self.headers,
-                timeout=30.0
+        response = await self._post_graphql(query, variables, metrics.GRAPHQL_BASIC_INFO, hedge="basic_info")
+        
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"GitHub API 요청 실패: {response.text}"
             )
-            
-            if response.status_code != 200:
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=f"GitHub API 요청 실패: {response.text}"
-                )
-            
-            data = response.json()
-            
-            if "errors" in data:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"GitHub API 오류: {data['errors']}"
-                )
-            
-            if not data.get("data", {}).get("user"):
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"사용자 '{username}'를 찾을 수 없습니다."
-                )
-            
-            return data["data"]["user"]
-    
-    async def get_contributions_for_period(self, username: str, from_date: datetime, to_date: datetime) -> int:
-        """특정 기간의 커밋 수를 가져옵니다."""
-        await self.emit_status("api_call", f"기간별 커밋 수를 조회하고 있습니다: {from_date.strftime('%Y-%m-%d')} ~ {to_date.strftime('%Y-%m-%d')}", 15)
         
-        query = """
-        query($username: String!, $from: DateTime!, $to: DateTime!) {
-          user(login: $username) {
-            contributionsCollection(from: $from, to: $to) {
-              contributionCalendar {
-                totalContributions
-              }
-            }
-          }
-        }
-        """
+        data = response.json()
         
-        variables = {
-            "username": username,
-            "from": from_date.isoformat(),
-            "to": to_date.isoformat()
-        }
+        # 없는 사용자는 user: null 과 함께 NOT_FOUND 오류로 옵니다
+        if any(error.get("type") == "NOT_FOUND" for error in data.get("errors", [])):
+            raise HTTPException(
+                status_code=404,
+                detail=f"사용자 '{username}'를 찾을 수 없습니다."
+            )
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.base_url,
-                json={"query": query, "variables": variables},
-                headers=self.headers,
-                timeout=30.0
+        if "errors" in data:
+            raise HTTPException(
+                status_code=400,
+                detail=f"GitHub API 오류: {data['errors']}"
             )
-            
-            if response.status_code != 200:
-                return 0  # 오류 시 0 반환
-            
-            data = response.json()
-            
-            if "errors" in data or not data.get("data", {}).get("user"):
-                return 0
-            
-            return data["data"]["user"]["contributionsCollection"]["contributionCalendar"]["totalContributions"]
-    
+        
+        if not data.get("data", {}).get("user"):
+            raise HTTPException(
+                status_code=404,
+                detail=f"사용자 '{username}'를 찾을 수 없습니다."
+            )
+        
+        user = data["data"]["user"]
+        # 기여가 있는 연도 목록 (전체 기간 캘린더 조회 계획용)
+        user["contributionYears"] = user.pop("contributionsCollection")["contributionYears"]
+        return user
+
     async def get_graph_contributions(self, username: str, from_date: datetime, to_date: datetime) -> List[Dict[str, Any]]:
         """6개월 그래프용 일별 커밋 데이터를 가져옵니다."""
         await self.emit_status("api_call", f"일별 커밋 데이터를 조회하고 있습니다: {from_date.strftime('%Y-%m-%d')} ~ {to_date.strftime('%Y-%m-%d')}", 25)
         
-        query = """
-        query($username: String!, $from: DateTime!, $to: DateTime!) {
-          user(login: $username) {
-            contributionsCollection(from: $from, to: $to) {
-              contributionCalendar {
-                weeks {
-                  contributionDays {
-                    date
-                    contributionCount
-                  }
-                }
-              }
-            }
-          }
-        }
-        """
+        days = await self._get_calendar_counts(username, from_date, to_date, metrics.GRAPHQL_RECENT_CALENDAR, hedge="recent_calendar")
+        return days.to_days() if days is not None else []
+
+    async def get_window_totals(self, username: str, windows: List[Tuple[datetime, datetime]]) -> List[Optional[int]]:
+        """여러 구간의 기여 수 합계를 한 번의 요청으로 가져옵니다. (실패한 구간은 None)"""
+        declarations = ", ".join(f"$f{index}: DateTime!, $t{index}: DateTime!" for index in range(len(windows)))
+        selections = "\n".join(
+            f"y{index}: contributionsCollection(from: $f{index}, to: $t{index}) {{ contributionCalendar {{ totalContributions }} }}"
+            for index in range(len(windows))
+        )
+        query = f"query($username: String!, {declarations}) {{ user(login: $username) {{\n{selections}\n}} }}"
         
-        variables = {
-            "username": username,
-            "from": from_date.isoformat(),
-            "to": to_date.isoformat()
-        }
+        variables: Dict[str, Any] = {"username": username}
+        for index, (start, end) in enumerate(windows):
+            variables[f"f{index}"] = start.isoformat()
+            variables[f"t{index}"] = end.isoformat()
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.base_url,
-                json={"query": query, "variables": variables},
-                headers=self.headers,
-                timeout=30.0
-            )
-            
-            if response.status_code != 200:
-                return []
-            
-            data = response.json()
-            
-            if "errors" in data or not data.get("data", {}).get("user"):
-                return []
-            
-            daily_commits = []
-            contribution_calendar = data["data"]["user"]["contributionsCollection"]["contributionCalendar"]
-            
-            for week in contribution_calendar["weeks"]:
-                for day in week["contributionDays"]:
-                    daily_commits.append({
-                        "date": day["date"],
-                        "count": day["contributionCount"]
-                    })
-            
-            return daily_commits
+        response = await self._post_graphql(query, variables, metrics.GRAPHQL_WINDOW_TOTALS, hedge="window_totals")
+        
+        if response.status_code != 200:
+            return [None] * len(windows)
+        
+        user = (response.json().get("data") or {}).get("user") or {}
+        totals: List[Optional[int]] = []
+        for index in range(len(windows)):
+            collection = user.get(f"y{index}")
+            totals.append(collection["contributionCalendar"]["totalContributions"] if collection else None)
+        return totals
 
-    async def get_all_daily_contributions(self, username: str, from_date: datetime, to_date: datetime) -> List[Dict[str, Any]]:
-        """전체 기간의 일별 커밋 데이터를 1년씩 분할해서 가져옵니다."""
+    async def get_all_daily_contributions(self, username: str, from_date: datetime, to_date: datetime, contribution_years: Optional[List[int]] = None) -> List[DayCounts]:
+        """전체 기간의 일별 커밋 데이터를 달력 연도 단위 윈도우(DayCounts) 목록으로 가져옵니다.
+        
+        contribution_years 에 없는 연도는 건너뛰고, 여러 연도가 남으면 연도별 합계를 먼저 한 번에 조회해서
+        기여가 0 인 연도의 일별 캘린더는 가져오지 않습니다.
+        """
         await self.emit_status("api_call", "전체 기간의 커밋 데이터를 수집하고 있습니다...", 35)
         
         all_daily_data = []
-        current_start = from_date
-        year_count = 0
-        total_years = ((to_date - from_date).days // 365) + 1
+        windows = plan_history_windows(from_date, to_date, contribution_years)
+        if len(windows) > 1:
+            with timing.span("window_totals", detail=f"{len(windows)} windows"):
+                totals = await self.get_window_totals(username, windows)
+            windows = [window for window, total in zip(windows, totals) if total != 0]
+        total_years = len(windows)
+        running_total = 0
+        running_active_days = 0
         
         # 진행도 계산을 위한 기본값 설정
         base_progress = 35
         progress_range = 40  # 35%에서 75%까지 사용
         
-        while current_start < to_date:
-            year_count += 1
+        for year_count, (current_start, current_end) in enumerate(windows, start=1):
             # 더 세밀한 진행도 계산
             current_progress = base_progress + (year_count / total_years * progress_range)
             
             await self.emit_status("api_call", f"커밋 데이터 수집 중... ({year_count} / {total_years}년차)", int(current_progress))
             
-            # 1년 후 또는 현재 날짜 중 더 작은 값
-            current_end = min(current_start + timedelta(days=365), to_date)
-            
             # 해당 기간의 일별 데이터 가져오기 (개별 진행도 없이)
-            period_data = await self._get_graph_contributions_silent(username, current_start, current_end)
-            all_daily_data.extend(period_data)
+            with timing.span("calendar_window", detail=f"{current_start:%Y-%m-%d}~{current_end:%Y-%m-%d}"):
+                period_data = await self._get_graph_contributions_silent(username, current_start, current_end)
+            all_daily_data.append(period_data)
             
-            # 중간 진행도 업데이트 (각 년도 내에서의 세부 진행)
-            if year_count < total_years:
-                mid_progress = current_progress + (progress_range / total_years * 0.5)
-                await self.emit_status("processing", f"{year_count}년차 데이터 처리 완료", int(mid_progress))
+            # 윈도우 합계와 누적 합계를 바로 보내서 화면이 마지막 윈도우를 기다리지 않게 합니다
+            window = history_window_summary([period_data], current_start, current_end)
+            running_total += window["contributions"]
+            running_active_days += window["active_days"]
             
-            # 다음 기간으로 이동
-            current_start = current_end
+            # 중간 진행도 업데이트 (각 년도 내에서의 세부 진행)
+            mid_progress = current_progress + (progress_range / total_years * 0.5) if year_count < total_years else current_progress
+            await self.emit_status("window", f"{year_count}년차 데이터 처리 완료", int(mid_progress), {
+                **window,
+                "index": year_count,
+                "count": len(windows),
+                "running_total": running_total,
+                "running_active_days": running_active_days
+            })
         
         return all_daily_data
 
-    async def _get_graph_contributions_silent(self, username: str, from_date: datetime, to_date: datetime) -> List[Dict[str, Any]]:
-        """진행도 업데이트 없이 일별 커밋 데이터를 가져옵니다."""
-        query = """
-        query($username: String!, $from: DateTime!, $to: DateTime!) {
-          user(login: $username) {
-            contributionsCollection(from: $from, to: $to) {
-              contributionCalendar {
-                weeks {
-                  contributionDays {
-                    date
-                    contributionCount
-                  }
-                }
-              }
-            }
-          }
-        }
-        """
-        
-        variables = {
-            "username": username,
-            "from": from_date.isoformat(),
-            "to": to_date.isoformat()
-        }
-        
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.base_url,
-                json={"query": query, "variables": variables},
-                headers=self.headers,
-                timeout=30.0
-            )
-            
-            if response.status_code != 200:
-                return []
-            
-            data = response.json()
-            
-            if "errors" in data or not data.get("data", {}).get("user"):
-                return []
-            
-            daily_commits = []
-            contribution_calendar = data["data"]["user"]["contributionsCollection"]["contributionCalendar"]
-            
-            for week in contribution_calendar["weeks"]:
-                for day in week["contributionDays"]:
-                    daily_commits.append({
-                        "date": day["date"],
-                        "count": day["contributionCount"]
-                    })
-            
-            return daily_commits
+    async def _get_graph_contributions_silent(self, username: str, from_date: datetime, to_date: datetime) -> DayCounts:
+        """진행도 업데이트 없이 일별 커밋 데이터를 가져옵니다. (실패하면 빈 윈도우)"""
+        days = await self._get_calendar_counts(username, from_date, to_date, metrics.GRAPHQL_CALENDAR_WINDOW, hedge="calendar_window")
+        return days if days is not None else DayCounts(from_date.date())
 
     async def get_top_repositories(self, username: str, limit: int = 10) -> List[Dict[str, Any]]:
         """사용자의 상위 레포지토리를 가져옵니다. 스타 수 기준으로 정렬하고, 동일한 경우 최신 업데이트 순으로 정렬합니다."""
@@ -364,89 +499,112 @@ class GitHubClient:
             "first": limit
         }
         
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.base_url,
-                json={"query": query, "variables": variables},
-                headers=self.headers,
-                timeout=30.0
-            )
-            
-            if response.status_code != 200:
-                return []
-            
-            data = response.json()
-            
-            if "errors" in data or not data.get("data", {}).get("user"):
-                return []
-            
-            repositories = data["data"]["user"]["repositories"]["nodes"]
-            
-            # 스타 수로 정렬하고, 동일한 경우 최신 업데이트 순으로 정렬
-            sorted_repos = sorted(repositories, key=lambda x: (-x["stargazerCount"], x["updatedAt"]), reverse=True)
-            
-            result = []
-            for repo in sorted_repos:
-                result.append({
-                    "name": repo["name"],
-                    "stargazers_count": repo["stargazerCount"],
-                    "primary_language": repo["primaryLanguage"]["name"] if repo["primaryLanguage"] else None,
-                    "updated_at": repo["updatedAt"]
-                })
-            
-            return result
+        response = await self._post_graphql(query, variables, metrics.GRAPHQL_TOP_REPOS, hedge="top_repos")
+        
+        if response.status_code != 200:
+            return []
+        
+        data = response.json()
+        
+        if "errors" in data or not data.get("data", {}).get("user"):
+            return []
+        
+        return format_top_repositories(data["data"]["user"]["repositories"]["nodes"])
+
+    async def fetch_activity(self, user_info: Dict[str, Any]) -> PrefetchedStats:
+        """기본 정보 이후 단계(6개월 / 전체 기간 캘린더, 상위 레포지토리)를 차례로 가져옵니다. (미리 받기용)"""
+        username = user_info["login"]
+        end_date = datetime.now()
+        
+        daily_commits_data = await self.get_graph_contributions(username, end_date - timedelta(days=180), end_date)
+        all_daily_data = await self.get_all_daily_contributions(
+            username, parse_github_datetime(user_info["createdAt"]), end_date, user_info.get("contributionYears")
+        )
+        top_repositories = await self.get_top_repositories(username, 10)
+        
+        return PrefetchedStats(user_info, daily_commits_data, all_daily_data, top_repositories)
 
-    async def get_user_stats(self, username: str) -> Dict[str, Any]:
-        """사용자의 기본 정보와 전체/6개월 커밋 통계를 가져옵니다."""
+    async def get_user_stats(self, username: str, timer: Optional[StageTimer] = None, warmup: Optional[Warmup] = None) -> Dict[str, Any]:
+        """사용자의 기본 정보와 전체/6개월 커밋 통계를 가져옵니다.
+        
+        timer 를 넘기면 단계별 소요 시간이 그 타이머에 기록됩니다.
+        warmup 을 넘기면 미리 받아둔 데이터가 있을 때 GitHub 를 다시 호출하지 않습니다.
+        """
+        timer = timer or StageTimer("get_user_stats")
         
         await self.emit_status("start", f"GitHub 사용자 '{username}' 정보 수집을 시작합니다", 0)
         
+        try:
+            with timer.activate():
+                return await self._collect_user_stats(username, warmup)
+        finally:
+            timer.finish()
+            metrics.USER_STATS_SECONDS.observe(timer.root.duration_ms / 1000)
+            timer.log(username=username)
+    
+    async def _collect_user_stats(self, username: str, warmup: Optional[Warmup] = None) -> Dict[str, Any]:
+        """get_user_stats 의 실제 수집/계산 과정 (단계별 소요 시간을 기록합니다)"""
+        prefetched = None
+        if warmup is not None:
+            with timing.span("prefetch", detail=warmup.state):
+                prefetched = await warmup.result()
+        
         # 1. 기본 정보와 계정 생성일 가져오기
-        user_info = await self.get_user_basic_info(username)
-        created_at = datetime.fromisoformat(user_info["createdAt"].replace('Z', '+00:00')).replace(tzinfo=None)
+        if prefetched is not None:
+            user_info = prefetched.user_info
+        else:
+            with timing.span("basic_info", metrics.STAGE_BASIC_INFO):
+                user_info = await self.get_user_basic_info(username)
+        created_at = parse_github_datetime(user_info["createdAt"])
         
-        await self.emit_status("processing", "사용자 계정 정보 처리 완료", 10)
+        await self.emit_status("profile", "사용자 계정 정보 처리 완료", 10, user_info)
         
         # 2. 6개월 그래프용 데이터 가져오기
         end_date = datetime.now()
         graph_start_date = end_date - timedelta(days=180)
-        daily_commits_data = await self.get_graph_contributions(username, graph_start_date, end_date)
+        if prefetched is not None:
+            daily_commits_data = prefetched.daily_commits_data
+        else:
+            with timing.span("recent_calendar", metrics.STAGE_RECENT_CALENDAR):
+                daily_commits_data = await self.get_graph_contributions(username, graph_start_date, end_date)
         
-        await self.emit_status("processing", "최근 6개월 커밋 데이터 수집 완료", 30)
+        await self.emit_status("recent", "최근 6개월 커밋 데이터 수집 완료", 30, {"daily_commits": daily_commits_data})
         
         # 3. 전체 기간 일별 데이터 가져오기 (통계 계산용)
-        all_daily_data = await self.get_all_daily_contributions(username, created_at, end_date)
+        if prefetched is not None:
+            all_daily_data = prefetched.all_daily_data
+            # 미리 받은 전체 기간은 윈도우 하나로 보냅니다
+            history = history_window_summary(all_daily_data, created_at, end_date)
+            await self.emit_status("window", "전체 기간 데이터 처리 완료", 75, {
+                **history,
+                "index": 1,
+                "count": 1,
+                "running_total": history["contributions"],
+                "running_active_days": history["active_days"]
+            })
+        else:
+            with timing.span("history", metrics.STAGE_HISTORY):
+                all_daily_data = await self.get_all_daily_contributions(username, created_at, end_date, user_info.get("contributionYears"))
         
         await self.emit_status("processing", "전체 기간 커밋 데이터 수집 완료", 78)
         
         # 4. 상위 레포지토리 정보 가져오기
-        top_repositories = await self.get_top_repositories(username, 10)
+        if prefetched is not None:
+            top_repositories = prefetched.top_repositories
+        else:
+            with timing.span("top_repos", metrics.STAGE_TOP_REPOS):
+                top_repositories = await self.get_top_repositories(username, 10)
         
-        await self.emit_status("processing", "레포지토리 정보 수집 완료", 85)
+        await self.emit_status("repositories", "레포지토리 정보 수집 완료", 85, {"top_repositories": top_repositories})
         
         # 5. 전체 기간 통계 계산
         await self.emit_status("processing", "통계 데이터를 분석하고 있습니다...", 88)
         
-        total_contributions = sum(day["count"] for day in all_daily_data)
-        active_days = len([day for day in all_daily_data if day["count"] > 0])
+        with timing.span("compute", metrics.STAGE_COMPUTE):
+            summary = history_stats(all_daily_data)
         
         await self.emit_status("processing", "활동 패턴을 분석하고 있습니다...", 92)
-        
-        # 최대 연속일 계산
-        max_streak = 0
-        current_streak = 0
-        for day in sorted(all_daily_data, key=lambda x: x["date"]):
-            if day["count"] > 0:
-                current_streak += 1
-                max_streak = max(max_streak, current_streak)
-            else:
-                current_streak = 0
-        
         await self.emit_status("processing", "최고 기록을 계산하고 있습니다...", 95)
-        
-        # 최고 기록 날
-        best_day = max(all_daily_data, key=lambda x: x["count"]) if all_daily_data else {"date": "", "count": 0}
-        
         await self.emit_status("processing", "최종 데이터를 정리하고 있습니다...", 98)
         
         await self.emit_status("complete", "데이터 수집이 완료되었습니다!", 100)
@@ -454,73 +612,137 @@ class GitHubClient:
         # 결과 반환
         return {
             **user_info,
-            "total_contributions": total_contributions,
+            "total_contributions": summary["total_contributions"],
             "daily_commits_data": daily_commits_data,
-            "active_days": active_days,
-            "max_streak": max_streak,
-            "best_day": best_day,
-            "top_repositories": top_repositories
+            "active_days": summary["active_days"],
+            "max_streak": summary["max_streak"],
+            "best_day": summary["best_day"],
+            "top_repositories": top_repositories,
+            # 캐시에만 보관 (store_user_stats) - 백그라운드 갱신은 올해 캘린더만 다시 받습니다
+            "closed_history": history_closed_summary(all_daily_data, end_date.year)
         }
 
-# 활성 SSE 연결을 저장하는 딕셔너리
-active_connections: Dict[str, List[asyncio.Queue]] = {}
+# SSE 이벤트 버스 (구독자 큐는 event_bus.subscribers 에 있습니다)
+event_bus = create_event_bus()
+metrics.track_connections(event_bus.subscribers)
 
-# GitHub 클라이언트 인스턴스
-github_client = GitHubClient()
+# 공유 HTTP 클라이언트와 GitHub 클라이언트 인스턴스 (lifespan 에서 생성)
+http_client: Optional[httpx.AsyncClient] = None
+github_client: Optional[GitHubClient] = None
 
-async def event_generator(username: str) -> AsyncGenerator[str, None]:
-    """SSE 이벤트를 생성하는 제너레이터"""
-    # 연결 큐 생성
-    queue = asyncio.Queue()
+def get_github_client(status_callback=None) -> GitHubClient:
+    """GitHub 클라이언트를 반환합니다. status_callback 이 있으면 공유 HTTP 클라이언트를 쓰는 새 클라이언트를 만듭니다."""
+    if status_callback is None and github_client is not None:
+        return github_client
     
-    # 활성 연결 목록에 추가
-    if username not in active_connections:
-        active_connections[username] = []
-    active_connections[username].append(queue)
+    try:
+        return GitHubClient(status_callback, http_client=http_client)
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+# 요청 수락 제어: 엔드포인트 종류별 동시 실행 수 / 대기열 길이 (키오스크 요청 우선)
+# 설정값은 서버 전체 한도이고 워커마다 그 몫(per_worker)만큼 받습니다
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", "10"))
+stats_admission = AdmissionLimiter(
+    "stats",
+    concurrency=per_worker(int(os.getenv("STATS_CONCURRENCY", "8"))),
+    queue_size=per_worker(int(os.getenv("STATS_QUEUE", "32"))),
+    max_wait=ADMISSION_MAX_WAIT
+)
+# 아이디 확인은 GitHub 요청 하나지만 QR 코드로 몰리면 한도를 쓰므로 따로 제한합니다
+validate_admission = AdmissionLimiter(
+    "validate",
+    concurrency=per_worker(int(os.getenv("VALIDATE_CONCURRENCY", "8"))),
+    queue_size=per_worker(int(os.getenv("VALIDATE_QUEUE", "32"))),
+    max_wait=ADMISSION_MAX_WAIT
+)
+batch_admission = AdmissionLimiter(
+    "batch",
+    concurrency=per_worker(int(os.getenv("BATCH_REQUEST_CONCURRENCY", "1"))),
+    queue_size=per_worker(int(os.getenv("BATCH_QUEUE", "2"))),
+    max_wait=ADMISSION_MAX_WAIT
+)
+print_admission = AdmissionLimiter(
+    "print",
+    concurrency=per_worker(int(os.getenv("PRINT_CONCURRENCY", "4"))),
+    queue_size=per_worker(int(os.getenv("PRINT_QUEUE", "16"))),
+    max_wait=ADMISSION_MAX_WAIT
+)
+metrics.track_admission([stats_admission, validate_admission, batch_admission, print_admission])
+
+# 키오스크 판단: KIOSK_CLIENTS(IP / 대역, 기본은 같은 PC) 또는 X-Kiosk-Key 헤더
+kiosk_matcher = KioskMatcher(os.getenv("KIOSK_CLIENTS", "127.0.0.1,::1"), os.getenv("KIOSK_KEY"))
+
+def is_kiosk(http_request: Request) -> bool:
+    host = http_request.client.host if http_request.client else None
+    return kiosk_matcher.matches(host, http_request.headers.get("x-kiosk-key"))
+
+async def admit(limiter: AdmissionLimiter, http_request: Request) -> Slot:
+    """슬롯을 받습니다. 대기열이 가득 찼거나 오래 기다리면 429 + Retry-After 로 바로 응답합니다."""
+    try:
+        return await limiter.acquire(is_kiosk(http_request))
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def encode_event(event: StatusEvent) -> bytes:
+    """이벤트를 SSE 메시지 바이트로 인코딩합니다."""
+    event_data = {
+        "type": event.event_type,
+        "message": event.message,
+        "progress": event.progress,
+        "data": event.data,
+        "timestamp": event.timestamp
+    }
+    if event.timing is not None:
+        event_data["timing"] = event.timing
+    
+    return b"data: " + orjson.dumps(event_data) + b"\n\n"
+
+async def event_generator(username: str) -> AsyncGenerator[bytes, None]:
+    """SSE 이벤트를 생성하는 제너레이터 (큐에는 인코딩이 끝난 바이트가 들어옵니다)"""
+    # 연결 큐 생성 후 구독
+    queue = event_bus.subscribe(username)
     
     try:
         while True:
             # 큐에서 이벤트 대기
-            event = await queue.get()
-            if event is None:  # 연결 종료 신호
+            message = await queue.get()
+            if message is None:  # 연결 종료 신호
                 break
             
-            # SSE 형식으로 이벤트 전송
-            event_data = {
-                "type": event.event_type,
-                "message": event.message,
-                "progress": event.progress,
-                "data": event.data,
-                "timestamp": event.timestamp
-            }
-            
-            yield f"data: {json.dumps(event_data, ensure_ascii=False)}\n\n"
+            yield message
             
     except asyncio.CancelledError:
         pass
     finally:
         # 연결 정리
-        if username in active_connections:
-            if queue in active_connections[username]:
-                active_connections[username].remove(queue)
-            if not active_connections[username]:
-                del active_connections[username]
+        event_bus.unsubscribe(username, queue)
 
 async def broadcast_event(username: str, event: StatusEvent):
-    """특정 사용자의 모든 연결에 이벤트를 브로드캐스트"""
-    if username in active_connections:
-        for queue in active_connections[username]:
-            try:
-                await queue.put(event)
-            except:
-                # 큐가 닫혔을 경우 무시
-                pass
+    """특정 사용자의 모든 연결에 이벤트를 브로드캐스트 (인코딩은 한 번만 하고 모든 구독자가 공유)
+    
+    멀티 워커 모드에서는 이벤트 버스를 통해 다른 워커의 구독자에게도 전달됩니다.
+    """
+    if not event_bus.may_have_listeners(username):
+        return
+    
+    try:
+        await event_bus.publish(username, encode_event(event))
+    except Exception as e:
+        # 이벤트 전달 실패가 수집 작업을 멈추지 않도록 합니다
+        logger.warning(f"이벤트 발행 실패 ({username}): {e}")
 
 @app.get("/")
 async def root():
     """헬스 체크 엔드포인트"""
     return {"message": "GitHub to Receipt API is running!"}
 
+@app.get("/metrics")
+async def prometheus_metrics():
+    """Prometheus 메트릭 엔드포인트 (멀티 워커에서는 요청을 받은 워커 하나의 값)"""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type, headers={"X-Metrics-Worker": str(os.getpid())})
+
 @app.get("/api/github/stats/stream/{username}")
 async def stream_github_stats(username: str):
     """GitHub 사용자 통계를 SSE로 스트리밍합니다."""
@@ -535,81 +757,292 @@ async def stream_github_stats(username: str):
         }
     )
 
+# 아이디 확인 직후 캘린더 데이터 미리 받기 (낮은 우선순위, 동시에 PREFETCH_CONCURRENCY 개까지, 수집 슬롯이 남을 때만)
+prefetcher = Prefetcher(
+    concurrency=per_worker(int(os.getenv("PREFETCH_CONCURRENCY", "2"))),
+    ttl=float(os.getenv("PREFETCH_TTL", "120")),
+    admission=stats_admission
+)
+
+@app.post("/api/github/validate")
+async def validate_github_user(request: GitHubUserRequest, http_request: Request):
+    """아이디가 존재하는지 기본 정보 조회 한 번으로 확인합니다.
+    
+    확인되면 실제 수집이 시작되기 전에 캘린더 데이터를 백그라운드에서 미리 받기 시작합니다.
+    신선한 캐시가 있으면 미리 받지 않습니다. (prefetch: "cached", 수집 요청도 그 캐시로 바로 응답합니다)
+    수집 슬롯이 모자라면 미리 받지 않습니다. (prefetch: "skipped", 수집 요청이 직접 받습니다)
+    """
+    username = request.username.strip()
+    
+    try:
+        entry = stats_cache.get(username)
+        if entry is not None and stats_cache.is_fresh(entry):
+            user_info = entry.user_data
+            prefetch = "cached"
+        else:
+            slot = await admit(validate_admission, http_request)
+            try:
+                client = get_github_client()
+                user_info = await client.get_user_basic_info(username)
+            finally:
+                slot.release()
+            warmup = prefetcher.start(username, user_info, client.fetch_activity)
+            avatar_cache.prewarm(user_info["avatarUrl"])
+            prefetch = "started" if warmup is not None else "skipped"
+        
+        return {
+            "username": user_info["login"],
+            "name": user_info["name"] or user_info["login"],
+            "avatar_url": user_info["avatarUrl"],
+            "prefetch": prefetch
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"서버 내부 오류: {str(e)}"
+        )
+
 @app.post("/api/github/stats/async")
-async def get_github_stats_async(request: GitHubUserRequest):
-    """GitHub 사용자 통계를 비동기로 가져오고 SSE로 진행상황을 전송합니다."""
+async def get_github_stats_async(request: GitHubUserRequest, http_request: Request, progressive: bool = True):
+    """GitHub 사용자 통계를 비동기로 가져오고 SSE로 진행상황을 전송합니다.
+    
+    수집 중에 profile / recent / window / repositories 이벤트로 부분 결과를 보내므로,
+    마지막 data 이벤트에는 전체 기간 통계 요약만 담습니다.
+    (작업 중이나 끝난 뒤에 연결한 구독자도 이벤트 버스가 보관한 부분 결과 이벤트부터 차례로 받습니다)
+    progressive=false 면 예전처럼 data 이벤트에 전체 결과를 담습니다.
+    """
     username = request.username
+    refresher.record(username)
+    
+    # 신선한 캐시가 있으면 수집하지 않고 전체 결과를 data 이벤트로 바로 보냅니다 (연결하면 다시 받습니다)
+    entry = stats_cache.get(username)
+    if entry is not None and stats_cache.is_fresh(entry):
+        await event_bus.begin(username)
+        try:
+            await broadcast_event(username, StatusEvent("data", "데이터 수집 완료", 100, entry.user_data))
+        finally:
+            event_bus.end(username)
+        return {"message": f"사용자 '{username}'의 캐시된 데이터를 보냈습니다. SSE 스트림을 연결하세요."}
+    
+    # 수집은 응답 이후에 실행되므로 슬롯을 먼저 받아두고, 수집이 끝나면 돌려줍니다
+    slot = await admit(stats_admission, http_request)
     
     # 상태 콜백 함수 정의
     async def status_callback(event: StatusEvent):
         await broadcast_event(username, event)
     
     # 상태 콜백을 가진 GitHub 클라이언트 생성
-    client_with_callback = GitHubClient(status_callback)
+    try:
+        client_with_callback = get_github_client(status_callback)
+        # 키오스크는 이 응답을 받은 뒤에 SSE 를 연결하므로, 그 전에 발행된 이벤트도 보관했다가 연결하면 보냅니다
+        await event_bus.begin(username)
+    except Exception:
+        slot.release()
+        raise
     
     # 백그라운드에서 데이터 수집 시작
     async def collect_data():
+        metrics.BACKGROUND_JOBS.inc()
         try:
-            user_data = await client_with_callback.get_user_stats(username)
+            timer = StageTimer("get_user_stats")
+            user_data = await client_with_callback.get_user_stats(username, timer, prefetcher.claim(username))
+            
+            store_user_stats(username, user_data)
             
-            # 완료 이벤트와 함께 데이터 전송
-            await broadcast_event(username, StatusEvent("data", "데이터 수집 완료", 100, user_data))
+            # 완료 이벤트와 함께 데이터(또는 요약)와 단계별 소요 시간 전송
+            data = stats_summary(user_data) if progressive else user_data
+            await broadcast_event(username, StatusEvent("data", "데이터 수집 완료", 100, data, timing=timer.to_dict()))
             
         except Exception as e:
             # 오류 이벤트 전송
             await broadcast_event(username, StatusEvent("error", f"오류 발생: {str(e)}", 0))
+        finally:
+            event_bus.end(username)
+            slot.release()
+            metrics.BACKGROUND_JOBS.dec()
     
     # 백그라운드 태스크로 실행
     asyncio.create_task(collect_data())
     
     return {"message": f"사용자 '{username}'의 데이터 수집을 시작했습니다. SSE 스트림을 연결하세요."}
 
+def build_stats_response(user_data: Dict[str, Any], since: Optional[str] = None) -> Dict[str, Any]:
+    """get_user_stats 결과를 GitHubStatsResponse 형태의 dict 로 변환합니다.
+    
+    since(YYYY-MM-DD)를 주면 그 날짜 이후의 일별 데이터만 포함합니다.
+    """
+    # 날짜 순으로 정렬 (항목은 이미 {date, count} 형태)
+    daily_commits = sorted(user_data["daily_commits_data"], key=lambda day: day["date"])
+    if since:
+        daily_commits = [day for day in daily_commits if day["date"] > since]
+    
+    return {
+        "username": user_data["login"],
+        "daily_commits": daily_commits,
+        "total_commits": user_data["total_contributions"],
+        "avatar_url": user_data["avatarUrl"],
+        "name": user_data["name"] or user_data["login"],
+        "public_repos": user_data["repositories"]["totalCount"],
+        "active_days": user_data["active_days"],
+        "max_streak": user_data["max_streak"],
+        "best_day": {
+            "date": user_data["best_day"]["date"],
+            "count": user_data["best_day"]["count"]
+        },
+        "top_repositories": user_data["top_repositories"],
+        "followers": user_data["followers"]["totalCount"],
+        "following": user_data["following"]["totalCount"],
+        "created_at": user_data["createdAt"]
+    }
+
+# 통계 캐시 (STATS_FRESH_SECONDS 이내에 수집한 데이터는 GitHub 를 다시 호출하지 않습니다)
+stats_cache = StatsCache(
+    max_entries=int(os.getenv("STATS_CACHE_SIZE", "512")),
+    fresh_seconds=float(os.getenv("STATS_FRESH_SECONDS", "300"))
+)
+
+def store_user_stats(username: str, user_data: Dict[str, Any], prewarm_avatar: bool = True) -> CachedStats:
+    """수집한 통계를 직렬화된 응답 본문과 함께 캐시에 저장합니다. (prewarm_avatar 면 영수증에 쓸 아바타도 미리 받아둡니다)
+    
+    끝난 연도 요약(closed_history)은 응답에 넣지 않고 캐시 항목에만 보관합니다.
+    """
+    closed_history = user_data.pop("closed_history", None)
+    if prewarm_avatar:
+        avatar_cache.prewarm(user_data["avatarUrl"])
+    return stats_cache.put(username, user_data, orjson.dumps(build_stats_response(user_data)), closed_history=closed_history)
+
+# GitHub 한도 추적 (모든 GraphQL 응답 헤더로 갱신)
+rate_budget = RateBudget(share=float(os.getenv("REFRESH_BUDGET_SHARE", "0.1")))
+
+# 단일 사용자 수집의 GraphQL 헤지 요청 (HEDGE_RATIO=0 이면 끔)
+# 남은 한도가 HEDGE_RATE_RESERVE 비율보다 적으면 헤지하지 않습니다
+HEDGE_RATE_RESERVE = float(os.getenv("HEDGE_RATE_RESERVE", "0.2"))
+hedger = Hedger(
+    percentile=float(os.getenv("HEDGE_PERCENTILE", "0.95")),
+    ratio=float(os.getenv("HEDGE_RATIO", "0.05")),
+    min_delay=float(os.getenv("HEDGE_MIN_DELAY", "0.05")),
+    allow=lambda: not rate_budget.limit or rate_budget.remaining is None or rate_budget.remaining > rate_budget.limit * HEDGE_RATE_RESERVE
+)
+
+# 인기 사용자 백그라운드 갱신 (REFRESH_TOP_K=0 이면 끔)
+refresher = Refresher(
+    stats_cache,
+    fetch=lambda entries: refresh_current_year(get_github_client(), entries),
+    store=store_user_stats,
+    budget=rate_budget,
+    # 수집 대기열이 생겼거나 수집 슬롯의 절반 이상이 쓰이고 있으면 미룹니다
+    busy=lambda: stats_admission.queued > 0 or stats_admission.active * 2 >= stats_admission.concurrency,
+    top_k=int(os.getenv("REFRESH_TOP_K", "20")),
+    interval=float(os.getenv("REFRESH_INTERVAL", "30")),
+    half_life=float(os.getenv("REFRESH_HALF_LIFE", "3600"))
+)
+
+@app.get("/api/refresher")
+async def get_refresher():
+    """인기 사용자 점수, 곧 갱신할 사용자, GitHub 한도와 갱신 몫"""
+    return refresher.status()
+
+# 화면용 / 출력용 아바타 캐시 (http_client 는 lifespan 에서 연결)
+avatar_cache = AvatarCache(
+    max_entries=int(os.getenv("AVATAR_CACHE_SIZE", "256"))
+)
+
+# 재시작 간 상태 스냅샷 (SNAPSHOT_PATH 가 있을 때만, SNAPSHOT_INTERVAL 초마다 + 종료 시 저장)
+warm_state = WarmState(
+    os.getenv("SNAPSHOT_PATH"),
+    stats_cache,
+    avatar_cache,
+    rate_budget,
+    refresher.popularity,
+    hedger,
+    interval=float(os.getenv("SNAPSHOT_INTERVAL", "300"))
+) if os.getenv("SNAPSHOT_PATH") else None
+
+@app.get("/api/avatar")
+async def get_avatar(url: str, size: int = DEFAULT_AVATAR_SIZE):
+    """GitHub 아바타를 영수증 캡처 크기(size x size)의 흑백 PNG 로 반환합니다. (출력용 1비트 아바타는 출력할 때 씁니다)"""
+    if not avatar_cache.is_allowed(url):
+        raise HTTPException(status_code=400, detail="GitHub 아바타 주소만 사용할 수 있습니다.")
+    if not 16 <= size <= 576:
+        raise HTTPException(status_code=400, detail="size 는 16~576 사이여야 합니다.")
+    
+    try:
+        png = await avatar_cache.get(url, size)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"아바타를 가져올 수 없습니다: {str(e)}")
+    
+    # 같은 URL 의 아바타는 바뀌지 않으므로(GitHub 가 URL 의 v 파라미터를 바꿈) 브라우저도 오래 캐시합니다
+    return Response(content=png, media_type="image/png", headers={"Cache-Control": "public, max-age=86400"})
+
+async def respond_with_stats(username: str, if_none_match: Optional[str], since: Optional[str], http_request: Request) -> Response:
+    """캐시/ETag 를 고려해서 통계 응답을 만듭니다. (캐시에 없을 때만 수집 슬롯을 받습니다)"""
+    if since:
+        try:
+            date.fromisoformat(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"since 는 YYYY-MM-DD 형식이어야 합니다: {since}")
+    
+    refresher.record(username)
+    entry = stats_cache.get(username)
+    if entry is not None and stats_cache.is_fresh(entry):
+        server_timing = 'cache;desc="hit"'
+    else:
+        slot = await admit(stats_admission, http_request)
+        try:
+            timer = StageTimer("get_user_stats")
+            user_data = await get_github_client().get_user_stats(username, timer, prefetcher.claim(username))
+        finally:
+            slot.release()
+        entry = store_user_stats(username, user_data)
+        server_timing = timer.server_timing()
+    
+    # since 응답은 전체 응답과 본문이 다르므로 ETag 도 다릅니다
+    etag = representation_etag(entry.etag, since)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Server-Timing": server_timing,
+        "Timing-Allow-Origin": "*",
+    }
+    
+    # 클라이언트가 가진 버전과 같으면 본문 없이 응답
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    body = entry.body
+    if since:
+        body = orjson.dumps(build_stats_response(entry.user_data, since))
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @app.post("/api/github/stats", response_model=GitHubStatsResponse)
-async def get_github_stats(request: GitHubUserRequest):
-    """GitHub 사용자의 통계 정보를 가져옵니다. (기존 동기 방식)"""
+async def get_github_stats(request: GitHubUserRequest, http_request: Request, since: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    """GitHub 사용자의 통계 정보를 가져옵니다. (기존 동기 방식)
+    
+    내부에서 만든 데이터라 모델 검증 없이 바로 직렬화합니다. 응답 스키마는 GitHubStatsResponse 입니다.
+    ETag / If-None-Match 와 since(YYYY-MM-DD, 그 이후 일별 데이터만)를 지원합니다.
+    """
     
     try:
-        user_data = await github_client.get_user_stats(request.username)
-        
-        # 6개월 그래프용 일별 커밋 데이터 변환
-        daily_commits = []
-        for day_data in user_data["daily_commits_data"]:
-            daily_commits.append(CommitData(
-                date=day_data["date"],
-                count=day_data["count"]
-            ))
-        
-        # 날짜 순으로 정렬
-        daily_commits.sort(key=lambda x: x.date)
-        
-        # 상위 레포지토리 데이터 변환
-        top_repositories = []
-        for repo_data in user_data["top_repositories"]:
-            top_repositories.append(TopRepository(
-                name=repo_data["name"],
-                stargazers_count=repo_data["stargazers_count"],
-                primary_language=repo_data["primary_language"],
-                updated_at=repo_data["updated_at"]
-            ))
-        
-        return GitHubStatsResponse(
-            username=user_data["login"],
-            daily_commits=daily_commits,
-            total_commits=user_data["total_contributions"],
-            avatar_url=user_data["avatarUrl"],
-            name=user_data["name"] or user_data["login"],
-            public_repos=user_data["repositories"]["totalCount"],
-            active_days=user_data["active_days"],
-            max_streak=user_data["max_streak"],
-            best_day=CommitData(
-                date=user_data["best_day"]["date"],
-                count=user_data["best_day"]["count"]
-            ),
-            top_repositories=top_repositories,
-            followers=user_data["followers"]["totalCount"],
-            following=user_data["following"]["totalCount"],
-            created_at=user_data["createdAt"]
+        return await respond_with_stats(request.username, if_none_match, since, http_request)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"서버 내부 오류: {str(e)}"
         )
+
+@app.get("/api/github/stats/{username}", response_model=GitHubStatsResponse)
+async def get_github_stats_conditional(username: str, http_request: Request, since: Optional[str] = None, if_none_match: Optional[str] = Header(None)):
+    """GitHub 사용자의 통계 정보를 가져옵니다. (조건부 GET 지원)"""
+    
+    try:
+        return await respond_with_stats(username, if_none_match, since, http_request)
         
     except HTTPException:
         raise
@@ -619,30 +1052,134 @@ async def get_github_stats(request: GitHubUserRequest):
             detail=f"서버 내부 오류: {str(e)}"
         )
 
+# 배치 조회 한도 (요청당 사용자 수 / 동시에 보내는 GraphQL 요청 수)
+MAX_BATCH_USERS = int(os.getenv("MAX_BATCH_USERS", "200"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+def encode_batch_record(username: str, body: Optional[bytes] = None, error: Optional[str] = None, cached: bool = False) -> bytes:
+    """배치 응답의 사용자 한 명 결과를 JSON 바이트로 만듭니다. (캐시에 있는 응답 본문을 그대로 넣습니다)"""
+    if error is not None:
+        return orjson.dumps({"type": "user", "username": username, "status": "error", "error": error})
+    prefix = orjson.dumps({"type": "user", "username": username, "status": "ok", "cached": cached})
+    return prefix[:-1] + b',"data":' + body + b"}"
+
+@app.post("/api/github/stats/batch")
+async def get_github_stats_batch(request: GitHubBatchRequest, http_request: Request, format: str = "ndjson", accept: Optional[str] = Header(None)):
+    """여러 사용자의 통계를 별칭 GraphQL 쿼리로 묶어서 가져옵니다.
+    
+    사용자마다 수집이 끝나는 대로 한 줄(NDJSON)씩 보내고, 마지막에 요약을 보냅니다.
+    format=sse 이거나 Accept 가 text/event-stream 이면 SSE 로 보냅니다.
+    실패한 사용자는 status="error" 로 보고하고 나머지 사용자는 계속 수집합니다.
+    """
+    # 대소문자만 다른 중복 아이디는 한 번만 조회
+    usernames: List[str] = []
+    seen = set()
+    for username in request.usernames:
+        username = username.strip()
+        if username and username.lower() not in seen:
+            seen.add(username.lower())
+            usernames.append(username)
+    
+    if not usernames:
+        raise HTTPException(status_code=400, detail="usernames 가 비어 있습니다.")
+    if len(usernames) > MAX_BATCH_USERS:
+        raise HTTPException(status_code=400, detail=f"한 번에 최대 {MAX_BATCH_USERS}명까지 조회할 수 있습니다.")
+    
+    use_sse = format == "sse" or (accept is not None and "text/event-stream" in accept)
+    client = get_github_client()
+    # 스트림이 끝나면(또는 시작 전에 연결이 끊겨도 응답 정리 시) 슬롯을 돌려줍니다
+    slot = await admit(batch_admission, http_request)
+    
+    async def records() -> AsyncGenerator[bytes, None]:
+        started = time.perf_counter()
+        succeeded = 0
+        
+        # 신선한 캐시는 바로 보내고 나머지만 GitHub 에서 수집
+        missing = []
+        for username in usernames:
+            entry = stats_cache.get(username)
+            if entry is not None and stats_cache.is_fresh(entry):
+                succeeded += 1
+                yield encode_batch_record(username, entry.body, cached=True)
+            else:
+                missing.append(username)
+        
+        if missing:
+            collector = BatchCollector(client, concurrency=BATCH_CONCURRENCY)
+            async for result in collector.collect(missing):
+                if result.error is not None:
+                    yield encode_batch_record(result.username, error=result.error)
+                    continue
+                # 최대 MAX_BATCH_USERS 명의 아바타 다운로드가 한꺼번에 시작되지 않도록 미리 받지 않습니다 (출력할 때 받음)
+                entry = store_user_stats(result.username, result.user_data, prewarm_avatar=False)
+                succeeded += 1
+                yield encode_batch_record(result.username, entry.body)
+        
+        logger.info(f"배치 수집 완료: {succeeded}/{len(usernames)}명 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+        yield orjson.dumps({"type": "done", "requested": len(usernames), "succeeded": succeeded, "failed": len(usernames) - succeeded})
+    
+    async def framed() -> AsyncGenerator[bytes, None]:
+        try:
+            async for record in records():
+                yield b"data: " + record + b"\n\n" if use_sse else record + b"\n"
+        finally:
+            slot.release()
+    
+    if use_sse:
+        return StreamingResponse(
+            framed(),
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+            },
+            background=BackgroundTask(slot.release)
+        )
+    return StreamingResponse(framed(), media_type="application/x-ndjson", background=BackgroundTask(slot.release))
+
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# 프린터 설정
-def get_printer():
-    """프린터 연결을 시도합니다. USB -> Serial -> Network 순으로 시도"""
+# 프린터 풀 (PRINTERS 환경변수, 없으면 Serial COM1 한 대)
+printer_pool = create_printer_pool()
+# 래스터 최적화 (GS L / ESC J 를 지원하지 않는 프린터는 RASTER_OPTIMIZE=0 으로 끕니다)
+RASTER_OPTIMIZE = os.getenv("RASTER_OPTIMIZE", "1") != "0"
+
+@app.get("/api/printers")
+async def get_printers():
+    """프린터별 상태 (정상 여부, 대기 작업, 누적 출력/실패 수, 마지막 오류)"""
+    return {"printers": printer_pool.status()}
+
+@app.get("/api/printers/throughput")
+async def get_printers_throughput(window: float = 300.0):
+    """프린터별 최근 window 초 동안의 처리량"""
+    return {"printers": printer_pool.throughput(window)}
+
+@app.get("/api/admission")
+async def get_admission():
+    """엔드포인트 종류별 실행 중 / 대기 중 요청 수와 한도"""
+    return {"endpoints": [limiter.status() for limiter in (stats_admission, validate_admission, batch_admission, print_admission)]}
+
+async def load_print_avatar(avatar: Optional[ReceiptAvatar]) -> Optional[Tuple[bytes, int, int]]:
+    """영수증에 덮어쓸 출력용 1비트 아바타와 위치(도트)를 반환합니다. (쓸 수 없으면 None, 영수증 안의 아바타를 그대로 디더링)"""
+    if avatar is None or not avatar_cache.is_allowed(avatar.url):
+        return None
+    dots = round(avatar.size * PRINT_WIDTH)
+    left, top = round(avatar.left * PRINT_WIDTH), round(avatar.top * PRINT_WIDTH)
+    if not 16 <= dots <= PRINT_WIDTH or left < 0 or top < 0:
+        return None
     try:
-        # Serial 프린터 시도
-        printer = Serial("COM1", baudrate=115200, timeout=1,
-        bytesize=8, parity='N', stopbits=1, dsrdtr=True)
-        # 한글 지원을 위한 인코딩 설정
-        printer._raw(b"\x1b\x52\x0D")
-        printer._raw(b"\x1b\x74\x0D")
-        print("Serial 프린터에 연결되었습니다.")
-        return printer
+        png = await avatar_cache.get(avatar.url, dots, mono=True)
     except Exception as e:
-        print(f"Serial 프린터 연결 실패: {e}")
-    
-    print("사용 가능한 프린터를 찾을 수 없습니다.")
-    return None
+        logger.warning(f"출력용 아바타를 가져올 수 없습니다: {e}")
+        return None
+    return png, left, top
 
-def resize_image(image: Image.Image, target_width: int = 500) -> Image.Image:
+def resize_image(image: "Image.Image", target_width: int = 500) -> "Image.Image":
     """이미지를 지정된 너비로 리사이즈합니다."""
+    from PIL import Image
+    
     # 원본 비율 유지하면서 너비를 target_width로 조정
     original_width, original_height = image.size
     aspect_ratio = original_height / original_width
@@ -657,100 +1194,127 @@ def resize_image(image: Image.Image, target_width: int = 500) -> Image.Image:
     
     return resized_image
 
-def save_image_to_server(image: Image.Image, filename: str = None) -> str:
+def save_image_to_server(image: "Image.Image", filename: str = None) -> str:
     """이미지를 server/images 폴더에 저장하고 경로를 반환합니다."""
     if filename is None:
         filename = f"receipt_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
     
-    # server/images 디렉토리 경로 설정
+    # server/images 디렉토리 경로 설정 (RECEIPT_IMAGES_DIR 로 변경 가능)
     current_dir = os.path.dirname(os.path.abspath(__file__))
-    images_dir = os.path.join(current_dir, "images")
+    images_dir = os.getenv("RECEIPT_IMAGES_DIR", os.path.join(current_dir, "images"))
     
     # images 디렉토리가 없으면 생성
     if not os.path.exists(images_dir):
         os.makedirs(images_dir)
-        print(f"images 디렉토리를 생성했습니다: {images_dir}")
+        logger.info(f"images 디렉토리를 생성했습니다: {images_dir}")
     
     # 파일 경로 설정
     file_path = os.path.join(images_dir, filename)
     
     # 이미지 저장
     image.save(file_path, 'PNG')
-    print(f"이미지가 저장되었습니다: {file_path}")
+    logger.info(f"이미지가 저장되었습니다: {file_path}")
     
     return file_path
 
 @app.post("/api/receipt/print")
-async def print_receipt(request: ImageUploadRequest):
+async def print_receipt(request: ImageUploadRequest, http_request: Request):
     """영수증 이미지를 받아서 리사이즈하고 프린터로 출력합니다."""
+    slot = await admit(print_admission, http_request)
     try:
-        # Base64 이미지 데이터 디코딩
-        if request.image_data.startswith('data:image'):
-            # data:image/png;base64, 부분 제거
-            base64_data = request.image_data.split(',')[1]
-        else:
-            base64_data = request.image_data
-        
-        image_bytes = base64.b64decode(base64_data)
+        # 출력용 아바타 (재출력이나 미리 받아둔 사용자는 캐시에서 바로)
+        print_avatar = await load_print_avatar(request.avatar) if RASTER_OPTIMIZE else None
         
-        # PIL Image로 변환
-        image = Image.open(io.BytesIO(image_bytes))
-        print(f"원본 이미지 크기: {image.size}")
-        
-        # 이미지 리사이즈 (width 500px)
-        resized_image = resize_image(image, target_width=550)
-        print(f"리사이즈된 이미지 크기: {resized_image.size}")
-        
-        # server/images 폴더에 저장
-        file_path = save_image_to_server(resized_image, request.filename)
+        # 디코딩 / 리사이즈 / 저장 / 래스터 변환은 블로킹 작업이라 스레드에서 한 번에 합니다
+        # (큰 영수증은 수백 ms 걸려서 루프에서 하면 그동안 SSE 스트림과 수락 대기가 모두 멈춥니다)
+        def prepare_receipt():
+            # Base64 이미지 데이터 디코딩
+            if request.image_data.startswith('data:image'):
+                # data:image/png;base64, 부분 제거
+                base64_data = request.image_data.split(',')[1]
+            else:
+                base64_data = request.image_data
+            
+            with metrics.IMAGE_DECODE.time():
+                image_bytes = base64.b64decode(base64_data)
+            
+                # PIL Image로 변환
+                from PIL import Image
+                image = Image.open(io.BytesIO(image_bytes))
+                image.load()
+            logger.info(f"원본 이미지 크기: {image.size}")
+            
+            # 이미지 리사이즈 (출력 너비 550 도트)
+            with metrics.IMAGE_RESIZE.time():
+                resized_image = resize_image(image, target_width=PRINT_WIDTH)
+            logger.info(f"리사이즈된 이미지 크기: {resized_image.size}")
+            
+            # server/images 폴더에 저장
+            with metrics.IMAGE_ENCODE.time():
+                file_path = save_image_to_server(resized_image, request.filename)
+            
+            # 흰 줄은 용지 이송으로, 좌우 여백은 잘라서 전송량을 줄입니다
+            # 아바타 자리에는 캐시해 둔 출력용 1비트 아바타를 덮어씁니다 (리사이즈된 캡처 속 아바타를 다시 디더링하지 않도록)
+            raster = None
+            if RASTER_OPTIMIZE:
+                with metrics.IMAGE_RASTER.time():
+                    mono = to_mono(resized_image)
+                    if print_avatar is not None:
+                        stamp_avatar(mono, *print_avatar)
+                    raster = encode_raster(mono)
+                logger.info(f"래스터 최적화: {raster.original_bytes} -> {raster.bytes} bytes ({raster.bands} bands, {raster.fed_rows} rows fed)")
+            
+            return image, resized_image, file_path, raster
         
-        # 프린터로 출력
-        printer = get_printer()
-        if printer is None:
-            print("프린터를 찾을 수 없어 파일만 저장됩니다.")
-            return {
-                "success": True,
-                "message": "이미지가 리사이즈되어 저장되었습니다. (프린터 연결 실패)",
-                "file_path": file_path,
-                "original_size": f"{image.size[0]}x{image.size[1]}",
-                "resized_size": f"{resized_image.size[0]}x{resized_image.size[1]}"
-            }
+        image, resized_image, file_path, raster = await asyncio.to_thread(prepare_receipt)
         
-        try:
-            # 프린터로 이미지 출력
-            printer.image(file_path)
+        # 프린터로 출력 (대기 작업이 가장 적은 정상 프린터, 실패하면 다른 프린터로)
+        def print_job(printer):
+            if raster is not None:
+                raster.send(printer)
+            else:
+                printer.image(file_path)
             printer.text("\n")
             printer.text("\n")
             printer.cut()  # 용지 자르기
-            printer.close()
-            
-            print("영수증이 성공적으로 출력되었습니다.")
-            
-            return {
-                "success": True,
-                "message": "영수증이 성공적으로 출력되었습니다.",
-                "file_path": file_path,
-                "original_size": f"{image.size[0]}x{image.size[1]}",
-                "resized_size": f"{resized_image.size[0]}x{resized_image.size[1]}"
-            }
-            
-        except Exception as print_error:
-            print(f"프린터 출력 중 오류: {print_error}")
+        
+        try:
+            result = await printer_pool.submit(print_job)
+        except PrinterUnavailable as print_error:
+            logger.warning(f"프린터 출력 실패: {print_error}")
             return {
                 "success": False,
-                "message": f"프린터 출력 실패: {str(print_error)}",
+                "message": f"프린터 출력 실패: {print_error}",
                 "file_path": file_path,
                 "original_size": f"{image.size[0]}x{image.size[1]}",
                 "resized_size": f"{resized_image.size[0]}x{resized_image.size[1]}"
             }
         
+        logger.info(f"영수증이 성공적으로 출력되었습니다. ({result.printer}, {result.bytes_sent} bytes, {result.seconds:.2f}s)")
+        bytes_saved = raster.bytes_saved if raster is not None else 0
+        metrics.RASTER_BYTES_SAVED.inc(bytes_saved)
+        
+        return {
+            "success": True,
+            "message": "영수증이 성공적으로 출력되었습니다.",
+            "file_path": file_path,
+            "printer": result.printer,
+            "bytes_sent": result.bytes_sent,
+            "bytes_saved": bytes_saved,
+            "original_size": f"{image.size[0]}x{image.size[1]}",
+            "resized_size": f"{resized_image.size[0]}x{resized_image.size[1]}"
+        }
+        
     except Exception as e:
-        print(f"이미지 처리 중 오류: {e}")
+        logger.exception(f"이미지 처리 중 오류: {e}")
         raise HTTPException(
             status_code=400,
             detail=f"이미지 처리 실패: {str(e)}"
         )
+    finally:
+        slot.release()
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # 패키지 상대 import 를 위해 프로젝트 루트 기준으로 실행합니다
+    uvicorn.run("server.main:app", app_dir=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,177 @@
+"""
+Prometheus 메트릭 정의
+
+핫패스에서는 미리 라벨을 붙여둔 child 를 사용해서 관측 비용을 최소화합니다.
+현재 상태를 나타내는 값(SSE 구독자 수, 큐 길이 등)은 스크레이프 시점에 계산합니다.
+
+메트릭은 워커 프로세스마다 따로 있고 합치지 않습니다. 멀티 워커에서 /metrics 는 요청을 받은 워커 하나의 값입니다.
+(응답의 X-Metrics-Worker 헤더가 그 워커의 프로세스 id) 전체 값이 필요하면 단일 워커로 실행하세요.
+"""
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# GitHub API 응답은 수십 ms ~ 수십 초까지 분포합니다
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+# 이미지 처리 / 프린터 출력
+IMAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+PRINTER_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)
+
+GRAPHQL_REQUEST_SECONDS = Histogram(
+    "github_graphql_request_seconds",
+    "GitHub GraphQL 요청 지연 시간",
+    ["query"],
+    buckets=LATENCY_BUCKETS,
+)
+
+USER_STATS_SECONDS = Histogram(
+    "github_user_stats_seconds",
+    "get_user_stats 전체 소요 시간",
+    buckets=LATENCY_BUCKETS,
+)
+
+USER_STATS_STAGE_SECONDS = Histogram(
+    "github_user_stats_stage_seconds",
+    "get_user_stats 단계별 소요 시간",
+    ["stage"],
+    buckets=LATENCY_BUCKETS,
+)
+
+SSE_SUBSCRIBERS = Gauge("sse_subscribers", "활성 SSE 구독자 수")
+BACKGROUND_JOBS = Gauge("background_jobs", "실행 중인 백그라운드 수집 작업 수")
+BROADCAST_QUEUE_DEPTH_MAX = Gauge("sse_broadcast_queue_depth_max", "SSE 구독자 큐 중 가장 긴 큐의 길이")
+BROADCAST_QUEUE_DEPTH_TOTAL = Gauge("sse_broadcast_queue_depth_total", "모든 SSE 구독자 큐에 쌓인 이벤트 수")
+
+IMAGE_PROCESSING_SECONDS = Histogram(
+    "receipt_image_seconds",
+    "영수증 이미지 처리 단계별 소요 시간",
+    ["step"],
+    buckets=IMAGE_BUCKETS,
+)
+
+PRINTER_WRITE_SECONDS = Histogram(
+    "printer_write_seconds",
+    "프린터로 영수증을 전송하는 데 걸린 시간",
+    buckets=PRINTER_BUCKETS,
+)
+PRINTER_BYTES_SENT = Counter("printer_bytes_sent_total", "프린터로 전송한 바이트 수")
+PRINTER_FAILOVERS = Counter("printer_failovers_total", "출력 실패로 다른 프린터에 작업을 넘긴 횟수")
+RASTER_BYTES_SAVED = Counter("printer_raster_bytes_saved_total", "래스터 최적화(여백 자르기, 흰 줄 이송)로 줄인 전송 바이트 수")
+
+# 요청 수락 제어 (엔드포인트 종류: stats / batch / print)
+ADMISSION_WAIT_SECONDS = Histogram(
+    "admission_wait_seconds",
+    "슬롯을 받기까지 대기열에서 기다린 시간",
+    ["endpoint"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0),
+)
+ADMISSION_REJECTED = Counter("admission_rejected_total", "429 로 거절한 요청 수", ["endpoint", "priority"])
+ADMISSION_ACTIVE = Gauge("admission_active", "실행 중인 작업 수", ["endpoint"])
+ADMISSION_QUEUED = Gauge("admission_queued", "대기열에서 기다리는 요청 수", ["endpoint"])
+
+# GraphQL 헤지 요청 결과 (won: 헤지가 먼저 끝남, lost: 원래 요청이 먼저 끝남, skipped: 예산/한도 부족, failed: 둘 다 실패)
+GRAPHQL_HEDGES = Counter("github_graphql_hedges_total", "느린 GraphQL 요청에 헤지 요청을 보낸 결과", ["query", "result"])
+
+# 인기 사용자 백그라운드 갱신
+REFRESH_USERS = Counter("refresh_users_total", "백그라운드 갱신으로 캐시를 새로 채운 사용자 수")
+REFRESH_SKIPPED = Counter("refresh_skipped_total", "백그라운드 갱신을 미룬 횟수", ["reason"])
+GITHUB_RATE_REMAINING = Gauge("github_rate_limit_remaining", "마지막 GitHub 응답의 X-RateLimit-Remaining")
+
+# 이벤트 루프 스케줄링 지연 (하트비트가 예정보다 늦게 깨어난 시간)
+EVENT_LOOP_LAG_SECONDS = Histogram(
+    "event_loop_lag_seconds",
+    "이벤트 루프 스케줄링 지연",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+EVENT_LOOP_LAG = Gauge("event_loop_lag_last_seconds", "마지막 하트비트의 스케줄링 지연")
+EVENT_LOOP_STALLS = Counter("event_loop_stalls_total", "임계값 이상 루프가 멈춰서 스택을 기록한 횟수")
+
+# 재시작 간 상태 스냅샷 (op: save, restore)
+SNAPSHOT_SECONDS = Histogram(
+    "warm_snapshot_seconds",
+    "상태 스냅샷 저장 / 복원 시간",
+    ["op"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+SNAPSHOT_BYTES = Gauge("warm_snapshot_bytes", "마지막으로 저장한 스냅샷 크기")
+
+# 적중률은 rate(cache_requests_total{result="hit"}) / rate(cache_requests_total) 로 계산합니다
+CACHE_REQUESTS = Counter("cache_requests_total", "캐시 조회 수", ["cache", "result"])
+
+# 실제 수집이 미리 받기 작업을 가져갔을 때의 상태 (ready / running / queued / failed / miss)
+PREFETCH_CLAIMS = Counter("prefetch_claims_total", "실제 수집이 가져간 미리 받기 작업 수", ["state"])
+PREFETCH_SKIPPED = Counter("prefetch_skipped_total", "동시 실행 수나 수집 슬롯이 가득 차서 건너뛴 미리 받기 수")
+
+# 자주 쓰는 라벨 조합은 미리 만들어 둡니다
+GRAPHQL_BASIC_INFO = GRAPHQL_REQUEST_SECONDS.labels("basic_info")
+GRAPHQL_RECENT_CALENDAR = GRAPHQL_REQUEST_SECONDS.labels("recent_calendar")
+GRAPHQL_CALENDAR_WINDOW = GRAPHQL_REQUEST_SECONDS.labels("calendar_window")
+GRAPHQL_WINDOW_TOTALS = GRAPHQL_REQUEST_SECONDS.labels("window_totals")
+GRAPHQL_TOP_REPOS = GRAPHQL_REQUEST_SECONDS.labels("top_repos")
+GRAPHQL_BATCH_PROFILE = GRAPHQL_REQUEST_SECONDS.labels("batch_profile")
+GRAPHQL_BATCH_CALENDAR = GRAPHQL_REQUEST_SECONDS.labels("batch_calendar")
+GRAPHQL_REFRESH = GRAPHQL_REQUEST_SECONDS.labels("refresh")
+
+STAGE_BASIC_INFO = USER_STATS_STAGE_SECONDS.labels("basic_info")
+STAGE_RECENT_CALENDAR = USER_STATS_STAGE_SECONDS.labels("recent_calendar")
+STAGE_HISTORY = USER_STATS_STAGE_SECONDS.labels("history")
+STAGE_TOP_REPOS = USER_STATS_STAGE_SECONDS.labels("top_repos")
+STAGE_COMPUTE = USER_STATS_STAGE_SECONDS.labels("compute")
+
+STATS_CACHE_HIT = CACHE_REQUESTS.labels("stats", "hit")
+STATS_CACHE_MISS = CACHE_REQUESTS.labels("stats", "miss")
+AVATAR_CACHE_HIT = CACHE_REQUESTS.labels("avatar", "hit")
+AVATAR_CACHE_MISS = CACHE_REQUESTS.labels("avatar", "miss")
+
+PREFETCH_READY = PREFETCH_CLAIMS.labels("ready")
+PREFETCH_RUNNING = PREFETCH_CLAIMS.labels("running")
+PREFETCH_QUEUED = PREFETCH_CLAIMS.labels("queued")
+PREFETCH_FAILED = PREFETCH_CLAIMS.labels("failed")
+PREFETCH_MISS = PREFETCH_CLAIMS.labels("miss")
+
+SNAPSHOT_SAVE = SNAPSHOT_SECONDS.labels("save")
+SNAPSHOT_RESTORE = SNAPSHOT_SECONDS.labels("restore")
+
+REFRESH_BUSY = REFRESH_SKIPPED.labels("busy")
+REFRESH_BUDGET = REFRESH_SKIPPED.labels("budget")
+REFRESH_FAILED = REFRESH_SKIPPED.labels("error")
+
+IMAGE_DECODE = IMAGE_PROCESSING_SECONDS.labels("decode")
+IMAGE_RESIZE = IMAGE_PROCESSING_SECONDS.labels("resize")
+IMAGE_ENCODE = IMAGE_PROCESSING_SECONDS.labels("encode")
+IMAGE_AVATAR = IMAGE_PROCESSING_SECONDS.labels("avatar")
+IMAGE_RASTER = IMAGE_PROCESSING_SECONDS.labels("raster")
+
+
+def track_connections(subscribers):
+    """채널별 SSE 구독자 큐 딕셔너리를 스크레이프 시점에 읽어서 게이지 값으로 사용합니다."""
+    SSE_SUBSCRIBERS.set_function(lambda: sum(len(queues) for queues in subscribers.values()))
+    BROADCAST_QUEUE_DEPTH_MAX.set_function(
+        lambda: max((queue.qsize() for queues in subscribers.values() for queue in queues), default=0)
+    )
+    BROADCAST_QUEUE_DEPTH_TOTAL.set_function(
+        lambda: sum(queue.qsize() for queues in subscribers.values() for queue in queues)
+    )
+
+
+def track_admission(limiters):
+    """엔드포인트 종류별 실행 중 / 대기 중 요청 수를 스크레이프 시점에 읽습니다."""
+    for limiter in limiters:
+        ADMISSION_ACTIVE.labels(limiter.name).set_function(lambda limiter=limiter: limiter.active)
+        ADMISSION_QUEUED.labels(limiter.name).set_function(lambda limiter=limiter: limiter.queued)
+
+
+def count_printer_bytes(printer):
+    """프린터의 _raw 를 감싸서 전송 바이트 수를 집계합니다."""
+    raw = printer._raw
+
+    def counted_raw(msg):
+        raw(msg)
+        PRINTER_BYTES_SENT.inc(len(msg))
+
+    printer._raw = counted_raw
+    return printer
+
+
+def render_latest():
+    """/metrics 응답 본문과 Content-Type 을 반환합니다."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,152 @@
+"""
+아이디 확인 직후 캘린더 데이터 미리 받기(warm-up)
+
+키오스크에서 아이디를 확인(/api/github/validate)한 뒤 실제 수집(/api/github/stats/async)이 시작되기까지
+방문자가 화면을 넘기는 동안의 빈 시간에, 최근 6개월 / 전체 기간 캘린더와 상위 레포지토리를 미리 받아둡니다.
+
+- 미리 받기는 낮은 우선순위 작업입니다. 동시에 PREFETCH_CONCURRENCY 개까지만, 그리고 수집 슬롯(stats 수락 제어)이
+  남고 기다리는 요청이 없을 때만 그 슬롯을 받아서 실행하고, 아니면 건너뜁니다. (start() 가 None)
+- 실제 수집은 claim() 으로 같은 사용자의 미리 받기 작업을 가져와서
+  끝났으면 결과를 그대로 쓰고, 실행 중이면 기다리고, 아직 시작하지 않았으면 취소하고 직접 수집합니다.
+- 아무도 가져가지 않은 결과는 ttl 이 지나면 버립니다.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from . import metrics
+from .admission import AdmissionLimiter
+from .stats import DayCounts
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PrefetchedStats:
+    """미리 받은 데이터 (get_user_basic_info 이후 단계의 결과)"""
+    user_info: Dict[str, Any]
+    daily_commits_data: List[Dict[str, Any]]
+    all_daily_data: List[DayCounts]
+    top_repositories: List[Dict[str, Any]]
+
+
+def _failed(task: asyncio.Task) -> bool:
+    return task.done() and (task.cancelled() or task.exception() is not None)
+
+
+class Warmup:
+    """사용자 한 명의 미리 받기 작업"""
+
+    def __init__(self, username: str, user_info: Dict[str, Any]):
+        self.username = username
+        self.user_info = user_info
+        self.created = time.time()
+        self.running = False
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def state(self) -> str:
+        if self.task is not None and self.task.done():
+            return "ready"
+        return "running" if self.running else "queued"
+
+    async def result(self) -> Optional[PrefetchedStats]:
+        """미리 받은 결과를 반환합니다. 쓸 수 없으면 None (호출한 쪽에서 직접 수집)"""
+        state = self.state
+        if state == "queued":
+            # 아직 시작하지 않았으면 기다릴 이유가 없습니다
+            self.task.cancel()
+            metrics.PREFETCH_QUEUED.inc()
+            return None
+
+        try:
+            # 실행 중인 작업을 기다리다 요청이 취소되어도 미리 받기 작업은 취소하지 않습니다
+            result = await asyncio.shield(self.task)
+        except asyncio.CancelledError:
+            if self.task.cancelled():
+                return None
+            raise
+        except Exception as e:
+            logger.warning(f"미리 받기 실패 ({self.username}): {e}")
+            metrics.PREFETCH_FAILED.inc()
+            return None
+
+        (metrics.PREFETCH_READY if state == "ready" else metrics.PREFETCH_RUNNING).inc()
+        return result
+
+
+class Prefetcher:
+    """사용자 이름(대소문자 무시)별 미리 받기 작업 목록"""
+
+    def __init__(self, concurrency: int = 2, ttl: float = 120.0, max_entries: int = 64, admission: Optional[AdmissionLimiter] = None):
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.admission = admission
+        self._warmups: Dict[str, Warmup] = {}
+
+    def __len__(self) -> int:
+        return len(self._warmups)
+
+    @property
+    def running(self) -> int:
+        return sum(1 for warmup in self._warmups.values() if not warmup.task.done())
+
+    def start(self, username: str, user_info: Dict[str, Any], fetch: Callable[[Dict[str, Any]], Awaitable[PrefetchedStats]]) -> Optional[Warmup]:
+        """fetch(user_info) 를 낮은 우선순위로 실행합니다. 이미 진행 중이면 그 작업을 그대로 둡니다.
+
+        동시 실행 수가 가득 찼거나 수집 슬롯을 바로 받을 수 없으면 건너뛰고 None 을 반환합니다.
+        """
+        self._expire()
+
+        key = username.lower()
+        warmup = self._warmups.get(key)
+        if warmup is not None and not _failed(warmup.task):
+            return warmup
+
+        slot = None
+        if self.running >= self.concurrency or (self.admission is not None and (slot := self.admission.try_acquire()) is None):
+            metrics.PREFETCH_SKIPPED.inc()
+            return None
+
+        warmup = Warmup(username, user_info)
+        warmup.task = asyncio.create_task(self._run(warmup, fetch))
+        if slot is not None:
+            # 시작하기 전에 취소되어도 슬롯을 돌려줍니다
+            warmup.task.add_done_callback(lambda _: slot.release())
+        self._warmups[key] = warmup
+
+        # 너무 많이 쌓이면 오래된 것부터 버립니다
+        while len(self._warmups) > self.max_entries:
+            oldest = next(iter(self._warmups))
+            self._warmups.pop(oldest).task.cancel()
+        return warmup
+
+    def claim(self, username: str) -> Optional[Warmup]:
+        """실제 수집이 시작될 때 미리 받기 작업을 가져갑니다. (한 번만 가져갈 수 있습니다)"""
+        self._expire()
+        warmup = self._warmups.pop(username.lower(), None)
+        if warmup is None:
+            metrics.PREFETCH_MISS.inc()
+        return warmup
+
+    async def stop(self):
+        for warmup in self._warmups.values():
+            warmup.task.cancel()
+        await asyncio.gather(*(warmup.task for warmup in self._warmups.values()), return_exceptions=True)
+        self._warmups.clear()
+
+    async def _run(self, warmup: Warmup, fetch) -> PrefetchedStats:
+        warmup.running = True
+        try:
+            return await fetch(warmup.user_info)
+        finally:
+            warmup.running = False
+
+    def _expire(self):
+        now = time.time()
+        for key in [key for key, warmup in self._warmups.items() if now - warmup.created > self.ttl]:
+            self._warmups.pop(key).task.cancel()
@@ -0,0 +1,334 @@
+"""
+영수증 프린터 풀
+
+부스마다 여러 대의 프린터(Serial / USB / Network)를 PRINTERS 환경변수로 설정하고,
+출력 작업을 대기 작업이 가장 적은 정상 프린터에 보냅니다. 출력에 실패한 프린터는
+cooldown 동안 제외하고 같은 작업을 다른 프린터로 넘깁니다(failover).
+
+    PRINTERS="counter=serial:COM1@115200,side=network:192.168.1.100:9100,back=usb:0x0416:0x5011"
+
+설정이 없으면 예전처럼 Serial COM1(115200) 한 대를 사용합니다.
+출력은 블로킹 I/O 라서 스레드에서 실행하고, 프린터마다 한 번에 한 작업만 보냅니다.
+
+다른 프린터로 넘기는 것은 프린터를 열지 못했거나 전송 중 연결 오류(소켓 / 시리얼 / USB)가 났을 때뿐이고,
+이미 바이트를 보낸 뒤라면 같은 영수증이 두 번 나오지 않도록 넘기지 않습니다. (PrintInterrupted)
+작업 자체의 오류(이미지 변환 등)는 프린터 상태를 바꾸지 않고 그대로 올립니다.
+
+멀티 워커에서는 워커마다 풀이 따로 있으므로(대기 작업 수 / 상태도 워커별), 같은 프린터(COM1 등)를 두 워커가
+동시에 열지 않도록 장치마다 잠금 파일(PRINTER_LOCK_DIR)을 잡은 워커만 프린터를 열고 보냅니다.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+# 한글 출력을 위한 코드 페이지 설정 (기존 get_printer 와 동일)
+KOREAN_INIT = (b"\x1b\x52\x0D", b"\x1b\x74\x0D")
+
+
+class PrinterUnavailable(Exception):
+    """출력할 수 있는 프린터가 하나도 없을 때"""
+
+
+class PrintInterrupted(PrinterUnavailable):
+    """전송을 시작한 뒤 연결이 끊긴 작업 (일부가 출력되었을 수 있어서 다른 프린터로 넘기지 않습니다)"""
+
+
+class _TransportError(Exception):
+    """(풀 내부) 프린터 연결 오류와 그때까지 보낸 바이트 수"""
+
+    def __init__(self, error: Exception, sent: int):
+        super().__init__(str(error))
+        self.error = error
+        self.sent = sent
+
+
+def is_transport_error(error: Exception) -> bool:
+    """프린터 연결 / 전송 오류인지 (serial.SerialException, usb.core.USBError, 소켓 오류는 모두 OSError 입니다)"""
+    if isinstance(error, OSError):
+        return True
+    from escpos.exceptions import DeviceNotFoundError, USBNotFoundError
+
+    return isinstance(error, (DeviceNotFoundError, USBNotFoundError))
+
+
+@dataclass
+class PrinterConfig:
+    name: str
+    kind: str  # serial | usb | network
+    target: str
+
+    @classmethod
+    def parse(cls, spec: str) -> "PrinterConfig":
+        """'이름=종류:대상' 한 항목을 해석합니다. (이름은 생략 가능)"""
+        name, _, rest = spec.strip().rpartition("=")
+        kind, _, target = rest.partition(":")
+        kind = kind.lower()
+        if kind not in ("serial", "usb", "network") or not target:
+            raise ValueError(f"프린터 설정을 해석할 수 없습니다: {spec} (예: serial:COM1@115200, network:192.168.1.100:9100, usb:0x0416:0x5011)")
+        return cls(name or f"{kind}:{target}", kind, target)
+
+
+def parse_printers(value: Optional[str]) -> List[PrinterConfig]:
+    """PRINTERS 환경변수 값을 해석합니다."""
+    if not value:
+        return [PrinterConfig("serial:COM1", "serial", "COM1@115200")]
+    return [PrinterConfig.parse(spec) for spec in value.split(",") if spec.strip()]
+
+
+def open_printer(config: PrinterConfig):
+    """설정에 맞는 python-escpos 프린터를 열어서 반환합니다. (실패하면 예외)"""
+    if config.kind == "serial":
+        from escpos.printer import Serial
+
+        port, _, baudrate = config.target.partition("@")
+        printer = Serial(port, baudrate=int(baudrate or 115200), timeout=1,
+                         bytesize=8, parity='N', stopbits=1, dsrdtr=True)
+    elif config.kind == "network":
+        from escpos.printer import Network
+
+        host, _, port = config.target.partition(":")
+        printer = Network(host, port=int(port or 9100), timeout=10)
+    else:
+        from escpos.printer import Usb
+
+        vendor, _, product = config.target.partition(":")
+        printer = Usb(int(vendor, 16), int(product, 16))
+
+    printer.open()
+    return printer
+
+
+@contextmanager
+def device_lock(path: str):
+    """(스레드에서 사용) 다른 프로세스가 같은 프린터를 쓰는 동안 기다렸다가 잠급니다."""
+    with open(path, "a+b") as file:
+        if os.name == "nt":
+            import msvcrt
+
+            while True:
+                try:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    # LK_LOCK 은 10초 동안 잠그지 못하면 OSError 이므로 계속 기다립니다
+                    continue
+            try:
+                yield
+            finally:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+
+@dataclass
+class PrinterDevice:
+    """풀에 속한 프린터 한 대의 상태와 누적 통계"""
+    config: PrinterConfig
+    healthy: bool = True
+    pending: int = 0
+    jobs_done: int = 0
+    jobs_failed: int = 0
+    bytes_sent: int = 0
+    busy_seconds: float = 0.0
+    last_error: Optional[str] = None
+    failed_at: Optional[float] = None
+    # 최근 작업 (끝난 시각, 바이트, 소요 시간) - 처리량 계산용
+    recent: Deque[Tuple[float, int, float]] = field(default_factory=lambda: deque(maxlen=200))
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def name(self) -> str:
+        return self.config.name
+
+    def available(self, cooldown: float) -> bool:
+        """정상이거나, 실패 후 cooldown 이 지나서 다시 시도해볼 수 있는지"""
+        return self.healthy or (self.failed_at is not None and time.time() - self.failed_at >= cooldown)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "kind": self.config.kind,
+            "target": self.config.target,
+            "healthy": self.healthy,
+            "pending": self.pending,
+            "jobs_done": self.jobs_done,
+            "jobs_failed": self.jobs_failed,
+            "last_error": self.last_error,
+        }
+
+    def throughput(self, window: float) -> Dict[str, Any]:
+        """최근 window 초 동안의 처리량"""
+        since = time.time() - window
+        jobs = [job for job in self.recent if job[0] >= since]
+        busy = sum(seconds for _, _, seconds in jobs)
+        sent = sum(size for _, size, _ in jobs)
+        return {
+            "name": self.name,
+            "window_seconds": window,
+            "jobs": len(jobs),
+            "jobs_per_minute": round(len(jobs) * 60 / window, 2),
+            "bytes": sent,
+            "bytes_per_second": round(sent / busy) if busy else 0,
+            "avg_job_seconds": round(busy / len(jobs), 3) if jobs else 0,
+            "total_jobs": self.jobs_done,
+            "total_bytes": self.bytes_sent,
+            "utilization": round(min(busy / window, 1.0), 3),
+        }
+
+
+@dataclass
+class PrintResult:
+    printer: str
+    bytes_sent: int
+    seconds: float
+    attempts: int
+
+
+class PrinterPool:
+    """대기 작업이 가장 적은 정상 프린터로 출력 작업을 보내는 풀"""
+
+    def __init__(self, configs: List[PrinterConfig], opener: Callable[[PrinterConfig], Any] = open_printer, cooldown: float = 30.0, lock_dir: Optional[str] = None):
+        self.devices = [PrinterDevice(config) for config in configs]
+        self.opener = opener
+        self.cooldown = cooldown
+        # 프로세스 간 장치 잠금 파일 위치 (None 이면 잠그지 않음 - 단일 프로세스 / 테스트)
+        self.lock_dir = lock_dir
+
+    def get(self, name: str) -> Optional[PrinterDevice]:
+        return next((device for device in self.devices if device.name == name), None)
+
+    def _candidates(self, exclude: List[PrinterDevice]) -> List[PrinterDevice]:
+        devices = [device for device in self.devices if device not in exclude and device.available(self.cooldown)]
+        # 대기 작업이 적은 순, 같으면 지금까지 적게 출력한 순
+        return sorted(devices, key=lambda device: (not device.healthy, device.pending, device.jobs_done))
+
+    async def submit(self, job: Callable[[Any], None]) -> PrintResult:
+        """job(printer) 을 실행합니다.
+
+        프린터를 열지 못했거나 아무것도 보내기 전에 연결 오류가 나면 다른 프린터로 다시 시도하고,
+        모두 실패하면 PrinterUnavailable. 보내는 도중 연결이 끊기면 PrintInterrupted,
+        작업 자체의 오류는 그대로 올립니다.
+        """
+        tried: List[PrinterDevice] = []
+        errors: List[str] = []
+        while True:
+            candidates = self._candidates(tried)
+            if not candidates:
+                raise PrinterUnavailable("; ".join(errors) or "사용 가능한 프린터가 없습니다.")
+
+            device = candidates[0]
+            tried.append(device)
+            device.pending += 1
+            try:
+                async with device.lock:
+                    sent, seconds = await asyncio.to_thread(self._run, device, job)
+            except _TransportError as e:
+                self._mark_failed(device, e.error)
+                errors.append(f"{device.name}: {e}")
+                if e.sent:
+                    raise PrintInterrupted("; ".join(errors)) from e.error
+                continue
+            finally:
+                device.pending -= 1
+
+            self._mark_done(device, sent, seconds)
+            return PrintResult(device.name, sent, seconds, len(tried))
+
+    def _lock_path(self, device: PrinterDevice) -> str:
+        name = re.sub(r"[^A-Za-z0-9_.-]", "_", f"{device.config.kind}-{device.config.target}")
+        return os.path.join(self.lock_dir, f"github-to-receipt-printer-{name}.lock")
+
+    def _run(self, device: PrinterDevice, job: Callable[[Any], None]) -> Tuple[int, float]:
+        """(스레드에서 실행) 다른 워커가 같은 프린터를 쓰고 있으면 기다린 뒤 _send() 합니다."""
+        if self.lock_dir is None:
+            return self._send(device, job)
+        with device_lock(self._lock_path(device)):
+            return self._send(device, job)
+
+    def _send(self, device: PrinterDevice, job: Callable[[Any], None]) -> Tuple[int, float]:
+        """프린터를 열고 작업을 보낸 뒤 닫습니다. (전송 바이트, 소요 시간) 반환
+
+        열기 실패와 전송 중 연결 오류는 _TransportError 로 감싸서 올립니다.
+        """
+        started = time.perf_counter()
+        try:
+            printer = self.opener(device.config)
+        except Exception as e:
+            raise _TransportError(e, 0) from e
+        sent = 0
+        raw = metrics.count_printer_bytes(printer)._raw
+
+        def counted_raw(msg):
+            nonlocal sent
+            raw(msg)
+            sent += len(msg)
+
+        printer._raw = counted_raw
+        try:
+            with metrics.PRINTER_WRITE_SECONDS.time():
+                for command in KOREAN_INIT:
+                    printer._raw(command)
+                job(printer)
+        except Exception as e:
+            if is_transport_error(e):
+                raise _TransportError(e, sent) from e
+            raise
+        finally:
+            try:
+                printer.close()
+            except Exception:
+                pass
+        return sent, time.perf_counter() - started
+
+    def _mark_done(self, device: PrinterDevice, sent: int, seconds: float):
+        if not device.healthy:
+            logger.info(f"프린터 {device.name} 복구됨")
+        device.healthy = True
+        device.failed_at = None
+        device.jobs_done += 1
+        device.bytes_sent += sent
+        device.busy_seconds += seconds
+        device.recent.append((time.time(), sent, seconds))
+
+    def _mark_failed(self, device: PrinterDevice, error: Exception):
+        logger.warning(f"프린터 {device.name} 연결 실패: {error}")
+        device.healthy = False
+        device.failed_at = time.time()
+        device.jobs_failed += 1
+        device.last_error = str(error)
+        metrics.PRINTER_FAILOVERS.inc()
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [device.status() for device in self.devices]
+
+    def throughput(self, window: float = 300.0) -> List[Dict[str, Any]]:
+        return [device.throughput(window) for device in self.devices]
+
+
+def create_printer_pool() -> PrinterPool:
+    """PRINTERS / PRINTER_COOLDOWN / PRINTER_LOCK_DIR 환경변수로 프린터 풀을 만듭니다."""
+    return PrinterPool(
+        parse_printers(os.getenv("PRINTERS")),
+        cooldown=float(os.getenv("PRINTER_COOLDOWN", "30")),
+        lock_dir=os.getenv("PRINTER_LOCK_DIR", tempfile.gettempdir()),
+    )
@@ -0,0 +1,168 @@
+"""
+영수증 래스터 최적화
+
+printer.image() 는 550 도트 너비 비트맵의 모든 줄을 GS v 0 으로 보내서, 대부분 흰 여백인 영수증도
+줄마다 69 바이트를 전송합니다. 115200 baud 시리얼에서는 전송량이 곧 출력 시간이라서,
+이미지를 프린터 명령으로 바꾸기 전에 다음을 적용합니다.
+
+- 흰 줄이 이어지는 구간은 래스터 대신 ESC J(n 도트 용지 이송)로 보냅니다.
+- 나머지 인쇄 구간(band)은 좌우 흰 여백을 내용 영역까지 잘라내고,
+  잘라낸 왼쪽 여백만큼 GS L(왼쪽 여백)을 설정해서 원래 위치에 찍히게 합니다.
+
+이진화는 python-escpos 의 printer.image() 와 같은 방식(FRAGMENT_HEIGHT 줄 조각마다 따로 반전 후 Floyd-Steinberg 1비트)이라
+출력되는 점은 printer.image() 와 같습니다. GS L / ESC J 의 단위는 203dpi 프린터의 기본값(1 단위 = 1 도트)을 가정합니다.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, List, Tuple
+
+# 영수증 출력 너비 (도트)
+PRINT_WIDTH = 550
+
+GS_V0 = b"\x1dv0\x00"  # GS v 0 (보통 밀도)
+GS_L = b"\x1dL"        # 왼쪽 여백
+ESC_J = b"\x1bJ"       # n 도트 용지 이송
+
+# python-escpos 의 image() 와 같은 band 최대 높이
+FRAGMENT_HEIGHT = 960
+MAX_FEED = 255
+
+# 인쇄 구간을 나누면 추가되는 바이트 (GS v 0 헤더 8 + GS L 4)
+_BAND_OVERHEAD = 8 + 4
+
+
+def _int_low_high(value: int) -> bytes:
+    return bytes((value & 0xFF, (value >> 8) & 0xFF))
+
+
+def dither(image: "Any") -> "Any":
+    """EscposImage 와 같은 방식으로 1비트(1 = 검은 점) 이미지로 변환합니다."""
+    from PIL import Image, ImageOps
+
+    if image.mode != "L":
+        rgba = image.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.split()[3])
+        image = background.convert("L")
+    return ImageOps.invert(image).convert("1")
+
+
+def to_mono(image: "Any") -> "Any":
+    """printer.image() 와 같은 1비트 이미지로 변환합니다.
+
+    printer.image() 는 FRAGMENT_HEIGHT 줄보다 긴 이미지를 조각으로 나눠서 조각마다 따로 디더링하므로
+    (조각 경계에서 오차 확산이 끊김) 여기서도 같은 조각 단위로 디더링합니다.
+    """
+    if image.height <= FRAGMENT_HEIGHT:
+        return dither(image)
+
+    from PIL import Image
+
+    mono = Image.new("1", image.size)
+    for top in range(0, image.height, FRAGMENT_HEIGHT):
+        bottom = min(top + FRAGMENT_HEIGHT, image.height)
+        mono.paste(dither(image.crop((0, top, image.width, bottom))), (0, top))
+    return mono
+
+
+def unoptimized_size(width: int, height: int) -> int:
+    """printer.image() 가 같은 이미지에 보내는 바이트 수 (FRAGMENT_HEIGHT 줄마다 헤더 8 바이트)"""
+    fragments = -(-height // FRAGMENT_HEIGHT)
+    return (width + 7) // 8 * height + 8 * fragments
+
+
+@dataclass
+class RasterJob:
+    """최적화된 프린터 명령과 전송량 통계"""
+    commands: List[bytes] = field(default_factory=list)
+    original_bytes: int = 0
+    bands: int = 0
+    fed_rows: int = 0
+
+    @property
+    def bytes(self) -> int:
+        return sum(len(command) for command in self.commands)
+
+    @property
+    def bytes_saved(self) -> int:
+        return max(self.original_bytes - self.bytes, 0)
+
+    def send(self, printer):
+        """python-escpos 프린터로 명령을 보냅니다. (printer.image() 대신)"""
+        for command in self.commands:
+            printer._raw(command)
+
+
+def _feed(job: RasterJob, rows: int):
+    job.fed_rows += rows
+    while rows > 0:
+        step = min(rows, MAX_FEED)
+        job.commands.append(ESC_J + bytes((step,)))
+        rows -= step
+
+
+def _band(job: RasterJob, mono: "Any", top: int, bottom: int):
+    """top ~ bottom 줄을 좌우 여백을 잘라서 GS v 0 으로 보냅니다."""
+    band = mono.crop((0, top, mono.width, bottom))
+    bbox = band.getbbox()
+    if bbox is None:
+        _feed(job, bottom - top)
+        return
+    left, _, right, _ = bbox
+    left_byte, right_byte = left // 8, (right + 7) // 8
+    band = band.crop((left_byte * 8, 0, right_byte * 8, bottom - top))
+
+    job.commands.append(GS_L + _int_low_high(left_byte * 8))
+    job.commands.append(GS_V0 + _int_low_high(right_byte - left_byte) + _int_low_high(bottom - top) + band.tobytes())
+    job.bands += 1
+
+
+def _segments(mono: "Any", split_rows: int) -> List[Tuple[bool, int, int]]:
+    """(인쇄 여부, 시작 줄, 끝 줄) 구간 목록. split_rows 줄 이상 이어지는 흰 줄만 이송 구간으로 뺍니다."""
+    row_bytes = (mono.width + 7) // 8
+    data = mono.tobytes()
+    blank = bytes(row_bytes)
+    blank_rows = [data[row * row_bytes:(row + 1) * row_bytes] == blank for row in range(mono.height)]
+
+    segments: List[Tuple[bool, int, int]] = []
+    row = 0
+    while row < mono.height:
+        end = row
+        while end < mono.height and blank_rows[end] == blank_rows[row]:
+            end += 1
+        printed = not blank_rows[row]
+        # 짧은 흰 구간은 band 를 나누는 비용이 더 크므로 앞뒤 인쇄 구간에 포함합니다
+        edge = row == 0 or end == mono.height
+        if not printed and not edge and end - row < split_rows:
+            printed = True
+        if segments and segments[-1][0] == printed:
+            segments[-1] = (printed, segments[-1][1], end)
+        else:
+            segments.append((printed, row, end))
+        row = end
+    return segments
+
+
+def optimize_raster(image: "Any") -> RasterJob:
+    """이미지를 흰 줄 이송 + 여백을 잘라낸 band 명령으로 변환합니다."""
+    return encode_raster(to_mono(image))
+
+
+def encode_raster(mono: "Any") -> RasterJob:
+    """1비트 이미지(to_mono 결과)를 흰 줄 이송 + 여백을 잘라낸 band 명령으로 변환합니다."""
+    job = RasterJob(original_bytes=unoptimized_size(mono.width, mono.height))
+
+    # 잘라낸 뒤 한 줄의 바이트 수를 모르므로 잘라내기 전 기준으로 나눌지 판단합니다
+    row_bytes = (mono.width + 7) // 8
+    split_rows = _BAND_OVERHEAD // row_bytes + 1
+
+    for printed, top, bottom in _segments(mono, split_rows):
+        if not printed:
+            _feed(job, bottom - top)
+            continue
+        for start in range(top, bottom, FRAGMENT_HEIGHT):
+            _band(job, mono, start, min(start + FRAGMENT_HEIGHT, bottom))
+
+    # 이후 text() 출력이 영향을 받지 않도록 왼쪽 여백을 되돌립니다
+    job.commands.append(GS_L + _int_low_high(0))
+    return job
@@ -0,0 +1,309 @@
+"""
+인기 사용자 백그라운드 갱신
+
+조회는 대부분 한 번 보고 마는 사용자지만, 운영진 / 발표자 / 다시 찾아온 방문자처럼 자주 조회되는 사용자가 있습니다.
+사용자별 조회 빈도와 최근성을 반감기(half_life)로 감쇠하는 점수로 추적하고, 점수가 높은 상위 top_k 명의 캐시가
+만료되기 전에(fresh_seconds 의 lead 비율만큼 남았을 때) 프로필과 올해 캘린더만 다시 받아서 갱신합니다.
+
+- 끝난 연도의 통계는 캐시 항목의 closed_history 에 있으므로 사용자 10명을 GraphQL 요청 하나로 갱신합니다.
+- GitHub 응답의 X-RateLimit-* 헤더로 남은 한도를 추적하고, 한도 창마다 창 시작 시점에 남아 있던 한도의
+  share 비율까지만 씁니다. (요청 하나는 1 포인트: 노드 100개 미만인 쿼리의 비용)
+- 수집 요청이 몰려 있거나(busy) 한도 몫을 다 쓰면 갱신 간격을 두 배씩 늘립니다. (최대 max_backoff 배)
+"""
+
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from . import metrics
+from .batch import PROFILE_GROUP_SIZE, TOP_REPOSITORY_LIMIT, build_profile_query
+from .cache import CachedStats, StatsCache
+from .stats import calendar_counts, format_top_repositories, history_merge_stats
+
+logger = logging.getLogger(__name__)
+
+
+class Popularity:
+    """사용자별 조회 점수 (조회할 때마다 1 을 더하고 half_life 초마다 절반으로 줄어듭니다)"""
+
+    def __init__(self, half_life: float = 3600.0, max_entries: int = 1024):
+        self.half_life = half_life
+        self.max_entries = max_entries
+        self._scores: Dict[str, Tuple[float, float]] = {}  # 사용자 -> (점수, 기록 시각)
+
+    def __len__(self) -> int:
+        return len(self._scores)
+
+    def _decayed(self, score: float, updated: float, now: float) -> float:
+        return score * 0.5 ** ((now - updated) / self.half_life)
+
+    def record(self, username: str, now: Optional[float] = None):
+        now = time.time() if now is None else now
+        key = username.lower()
+        score, updated = self._scores.get(key, (0.0, now))
+        self._scores[key] = (self._decayed(score, updated, now) + 1.0, now)
+
+        # 너무 많이 쌓이면 점수가 낮은 절반을 버립니다
+        if len(self._scores) > self.max_entries:
+            for key, _ in self.top(len(self._scores), now)[self.max_entries // 2:]:
+                del self._scores[key]
+
+    def score(self, username: str, now: Optional[float] = None) -> float:
+        now = time.time() if now is None else now
+        score, updated = self._scores.get(username.lower(), (0.0, now))
+        return self._decayed(score, updated, now)
+
+    def snapshot(self) -> List[Tuple[str, float, float]]:
+        return [(key, score, updated) for key, (score, updated) in self._scores.items()]
+
+    def restore(self, scores: List[Tuple[str, float, float]]):
+        for key, score, updated in scores:
+            self._scores.setdefault(key, (score, updated))
+
+    def top(self, count: int, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """점수가 높은 순으로 (사용자, 점수) 목록"""
+        now = time.time() if now is None else now
+        scores = [(key, self._decayed(score, updated, now)) for key, (score, updated) in self._scores.items()]
+        return sorted(scores, key=lambda item: item[1], reverse=True)[:count]
+
+
+class RateBudget:
+    """GitHub 한도 추적과 백그라운드 갱신이 쓸 수 있는 몫 계산"""
+
+    def __init__(self, share: float = 0.1):
+        self.share = share
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at: Optional[float] = None
+        self.spent = 0
+        self._window_remaining = 0
+
+    def update(self, headers: Mapping[str, str]):
+        """GraphQL 응답 헤더(X-RateLimit-Limit / Remaining / Reset)를 반영합니다."""
+        remaining = headers.get("x-ratelimit-remaining")
+        if remaining is None:
+            return
+        reset = headers.get("x-ratelimit-reset")
+        reset_at = float(reset) if reset else None
+        if reset_at != self.reset_at:
+            # 새 한도 창: 이번 창에서 쓸 수 있는 몫을 다시 계산합니다
+            self.reset_at = reset_at
+            self.spent = 0
+            self._window_remaining = int(remaining)
+        self.remaining = int(remaining)
+        if headers.get("x-ratelimit-limit"):
+            self.limit = int(headers["x-ratelimit-limit"])
+        metrics.GITHUB_RATE_REMAINING.set(self.remaining)
+
+    def available(self) -> int:
+        """지금 쓸 수 있는 포인트 (한도를 아직 모르면 0)"""
+        if self.remaining is None:
+            return 0
+        if self.reset_at is not None and time.time() >= self.reset_at:
+            # 창이 끝나면 한도가 다시 채워집니다 (다음 응답 헤더로 새 창을 확인)
+            self.reset_at = None
+            self.spent = 0
+            self._window_remaining = self.remaining = self.limit or self._window_remaining
+        allowance = int(self._window_remaining * self.share) - self.spent
+        return max(min(allowance, int(self.remaining * self.share)), 0)
+
+    def spend(self, cost: int = 1):
+        self.spent += cost
+        if self.remaining is not None:
+            self.remaining = max(self.remaining - cost, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_at": self.reset_at,
+            "spent": self.spent,
+            "window_remaining": self._window_remaining,
+        }
+
+    def restore(self, state: Dict[str, Any]):
+        """저장한 한도 창이 아직 끝나지 않았고 그 뒤로 받은 응답이 없을 때만 되살립니다."""
+        if self.remaining is not None or not state.get("reset_at") or state["reset_at"] <= time.time():
+            return
+        self.limit = state["limit"]
+        self.remaining = state["remaining"]
+        self.reset_at = state["reset_at"]
+        self.spent = state["spent"]
+        self._window_remaining = state["window_remaining"]
+        metrics.GITHUB_RATE_REMAINING.set(self.remaining)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "reset_at": self.reset_at,
+            "share": self.share,
+            "spent": self.spent,
+            "available": self.available(),
+        }
+
+
+async def refresh_current_year(client, entries: Dict[str, CachedStats]) -> Dict[str, Dict[str, Any]]:
+    """사용자들(최대 PROFILE_GROUP_SIZE 명)의 프로필 / 최근 6개월 / 올해 캘린더 / 상위 레포지토리를 한 요청으로 받아서
+    closed_history 와 합친 새 user_data 를 반환합니다. (찾을 수 없는 사용자는 빠집니다)"""
+    now = datetime.now()
+    usernames = list(entries)
+    variables: Dict[str, Any] = {f"l{index}": username for index, username in enumerate(usernames)}
+    variables.update({
+        "from": (now - timedelta(days=180)).isoformat(),
+        "to": now.isoformat(),
+        "first": TOP_REPOSITORY_LIMIT,
+        "yearFrom": datetime(now.year, 1, 1).isoformat(),
+    })
+
+    response = await client._post_graphql(build_profile_query(len(usernames), current_year=True), variables, metrics.GRAPHQL_REFRESH)
+    if response.status_code != 200:
+        raise RuntimeError(f"GitHub API 요청 실패: {response.status_code}")
+    data = response.json().get("data") or {}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for index, username in enumerate(usernames):
+        user = data.get(f"u{index}")
+        if not user:
+            continue
+        closed = entries[username].closed_history
+        recent = calendar_counts(user.pop("contributionsCollection")["contributionCalendar"], (now - timedelta(days=180)).date()).to_days()
+        current = calendar_counts(user.pop("currentYear")["contributionCalendar"], date(now.year, 1, 1))
+        top_repositories = format_top_repositories(user.pop("topRepositories")["nodes"])
+        user["contributionYears"] = user.pop("years")["contributionYears"]
+
+        summary = history_merge_stats(closed, current)
+        results[username] = {
+            **user,
+            "total_contributions": summary["total_contributions"],
+            "daily_commits_data": recent,
+            "active_days": summary["active_days"],
+            "max_streak": summary["max_streak"],
+            "best_day": summary["best_day"],
+            "top_repositories": top_repositories,
+            "closed_history": closed,
+        }
+    return results
+
+
+class Refresher:
+    """인기 사용자 캐시를 만료 전에 갱신하는 백그라운드 작업"""
+
+    def __init__(
+        self,
+        cache: StatsCache,
+        fetch: Callable[[Dict[str, CachedStats]], Awaitable[Dict[str, Dict[str, Any]]]],
+        store: Callable[[str, Dict[str, Any]], Any],
+        budget: RateBudget,
+        busy: Callable[[], bool] = lambda: False,
+        top_k: int = 20,
+        interval: float = 30.0,
+        lead: float = 0.25,
+        min_score: float = 2.0,
+        half_life: float = 3600.0,
+        max_backoff: int = 16,
+    ):
+        self.cache = cache
+        self.fetch = fetch
+        self.store = store
+        self.budget = budget
+        self.busy = busy
+        self.top_k = top_k
+        self.interval = interval
+        self.lead = lead
+        self.min_score = min_score
+        self.max_backoff = max_backoff
+        self.popularity = Popularity(half_life)
+        self.backoff = 1
+        self.refreshed = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def record(self, username: str):
+        """사용자 조회를 기록합니다."""
+        if self.top_k > 0:
+            self.popularity.record(username)
+
+    def due(self) -> List[str]:
+        """곧 만료되는 인기 사용자 (점수 높은 순)"""
+        year = datetime.now().year
+        refresh_age = self.cache.fresh_seconds * (1 - self.lead)
+        usernames = []
+        for username, score in self.popularity.top(self.top_k):
+            if score < self.min_score:
+                break
+            entry = self.cache.peek(username)
+            # 캐시에 없거나 연도가 바뀌어 끝난 연도 요약을 쓸 수 없으면 다음 조회 때 전체 수집합니다
+            if entry is None or entry.closed_history is None or entry.closed_history["year"] != year:
+                continue
+            if entry.age >= refresh_age:
+                usernames.append(username)
+        return usernames
+
+    async def run_once(self) -> int:
+        """갱신할 사용자를 한도 안에서 갱신하고, 갱신한 사용자 수를 반환합니다."""
+        if self.busy():
+            metrics.REFRESH_BUSY.inc()
+            self.backoff = min(self.backoff * 2, self.max_backoff)
+            return 0
+
+        usernames = self.due()
+        refreshed = 0
+        for index in range(0, len(usernames), PROFILE_GROUP_SIZE):
+            if self.budget.available() < 1:
+                metrics.REFRESH_BUDGET.inc()
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+                return refreshed
+            if self.busy():
+                metrics.REFRESH_BUSY.inc()
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+                return refreshed
+
+            group = usernames[index:index + PROFILE_GROUP_SIZE]
+            self.budget.spend(1)
+            results = await self.fetch({username: self.cache.peek(username) for username in group})
+            for username, user_data in results.items():
+                self.store(username, user_data)
+            refreshed += len(results)
+            metrics.REFRESH_USERS.inc(len(results))
+
+        self.backoff = 1
+        self.refreshed += refreshed
+        return refreshed
+
+    def start(self):
+        if self.top_k > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval * self.backoff)
+            try:
+                refreshed = await self.run_once()
+                if refreshed:
+                    logger.info(f"인기 사용자 {refreshed}명 갱신 (남은 한도 {self.budget.remaining})")
+            except Exception as e:
+                metrics.REFRESH_FAILED.inc()
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+                logger.warning(f"인기 사용자 갱신 실패: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "top_k": self.top_k,
+            "interval": self.interval,
+            "backoff": self.backoff,
+            "refreshed": self.refreshed,
+            "popular": [
+                {"username": username, "score": round(score, 2)}
+                for username, score in self.popularity.top(self.top_k)
+            ],
+            "due": self.due(),
+            "rate_limit": self.budget.status(),
+        }
@@ -0,0 +1,227 @@
+"""
+재시작 간 메모리 상태 스냅샷 (warm state)
+
+밤사이 재부팅이나 배포, 장애로 서버가 다시 시작되면 메모리에만 있던 상태가 모두 사라져서
+재시작 직후 방문자는 항상 가장 느린 경로(GitHub 전체 수집, 아바타 다운로드/변환)를 탑니다.
+다음 상태를 interval 초마다, 그리고 종료할 때 파일 하나에 저장하고 시작할 때 되살립니다.
+
+- 통계 캐시: user_data, 직렬화된 응답 본문, ETag, 수집 시각, 끝난 연도 요약 (신선도는 수집 시각 기준 그대로)
+- 아바타 PNG (화면용 흑백, 출력용 1비트)
+- GitHub 한도 창 (아직 끝나지 않은 창만)
+- 인기 사용자 점수, 헤지 요청용 쿼리 종류별 최근 지연 시간
+
+파일 형식 (리틀 엔디언):
+
+    MAGIC(8) | 버전(u32) | 본문 길이(u64) | 본문의 blake2b-16 체크섬 | 본문
+    본문 = zlib(메타데이터 길이(u32) | 메타데이터(JSON) | 블롭(응답 본문, PNG)을 이어 붙인 바이트)
+
+바이트 데이터는 JSON 에 넣지 않고 (위치, 길이)로 가리키므로 되살릴 때 압축 해제와 JSON 파싱 한 번, 슬라이스만 합니다.
+상태는 이벤트 루프에서 모으고(참조만 복사), 직렬화 / 압축 / 파일 쓰기는 스레드에서 합니다.
+임시 파일에 쓰고 fsync 한 뒤 os.replace 로 바꾸므로 저장 중에 꺼져도 이전 스냅샷이 남습니다.
+버전이나 체크섬이 맞지 않는 스냅샷은 무시하고 빈 상태로 시작합니다.
+"""
+
+import asyncio
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from . import metrics
+from .avatar import AvatarCache
+from .cache import CachedStats, StatsCache
+from .hedge import Hedger
+from .refresh import Popularity, RateBudget
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"GTRSNAP\x00"
+VERSION = 1
+_HEADER = struct.Struct("<8sIQ16s")
+_META_LENGTH = struct.Struct("<I")
+
+
+class SnapshotError(Exception):
+    """읽을 수 없는 스냅샷 (형식 / 버전 / 체크섬 불일치)"""
+
+
+def _checksum(body: bytes) -> bytes:
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+def encode(meta: Dict[str, Any], blobs: List[bytes]) -> bytes:
+    meta_bytes = orjson.dumps(meta)
+    # 응답 본문과 user_data 가 같은 내용을 담고 있어서 가장 빠른 압축으로도 크게 줄어듭니다
+    body = zlib.compress(b"".join([_META_LENGTH.pack(len(meta_bytes)), meta_bytes, *blobs]), 1)
+    return _HEADER.pack(MAGIC, VERSION, len(body), _checksum(body)) + body
+
+
+def decode(data: bytes) -> Tuple[Dict[str, Any], memoryview]:
+    """(메타데이터, 블롭 영역) 을 반환합니다. 블롭은 메타데이터의 (위치, 길이)로 잘라 씁니다."""
+    if len(data) < _HEADER.size:
+        raise SnapshotError("스냅샷이 너무 짧습니다.")
+    magic, version, length, checksum = _HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("스냅샷 파일이 아닙니다.")
+    if version != VERSION:
+        raise SnapshotError(f"지원하지 않는 스냅샷 버전입니다: {version} (현재 {VERSION})")
+    compressed = memoryview(data)[_HEADER.size:]
+    if len(compressed) != length or _checksum(compressed) != checksum:
+        raise SnapshotError("스냅샷 체크섬이 맞지 않습니다. (잘렸거나 손상됨)")
+    body = memoryview(zlib.decompress(compressed))
+    (meta_length,) = _META_LENGTH.unpack_from(body)
+    meta_end = _META_LENGTH.size + meta_length
+    return orjson.loads(body[_META_LENGTH.size:meta_end]), body[meta_end:]
+
+
+def write_atomic(path: str, data: bytes):
+    """같은 디렉터리의 임시 파일에 쓰고 fsync 한 뒤 path 로 바꿉니다."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=".snapshot-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+
+
+class WarmState:
+    """서버 상태를 스냅샷으로 저장하고 되살립니다."""
+
+    def __init__(
+        self,
+        path: str,
+        stats_cache: StatsCache,
+        avatar_cache: AvatarCache,
+        rate_budget: RateBudget,
+        popularity: Popularity,
+        hedger: Hedger,
+        interval: float = 300.0,
+    ):
+        self.path = path
+        self.stats_cache = stats_cache
+        self.avatar_cache = avatar_cache
+        self.rate_budget = rate_budget
+        self.popularity = popularity
+        self.hedger = hedger
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def collect(self) -> Tuple[Dict[str, Any], List[bytes]]:
+        """지금 상태의 (메타데이터, 블롭) 을 모읍니다. (이벤트 루프에서 호출해서 다른 작업과 섞이지 않게 합니다)
+
+        캐시 항목은 바뀔 때 통째로 교체되므로 모은 뒤에는 다른 스레드에서 직렬화해도 됩니다.
+        """
+        blobs: List[bytes] = []
+        offset = 0
+
+        def blob(data: bytes) -> Tuple[int, int]:
+            nonlocal offset
+            blobs.append(data)
+            offset += len(data)
+            return offset - len(data), len(data)
+
+        stats = [
+            {
+                "key": key,
+                "user_data": entry.user_data,
+                "body": blob(entry.body),
+                "etag": entry.etag,
+                "fetched_at": entry.fetched_at,
+                "closed_history": entry.closed_history,
+            }
+            for key, entry in self.stats_cache.items()
+        ]
+        avatars = [{"url": url, "size": size, "mono": mono, "png": blob(png)} for (url, size, mono), png in self.avatar_cache.items()]
+        meta = {
+            "saved_at": time.time(),
+            "stats": stats,
+            "avatars": avatars,
+            "rate_budget": self.rate_budget.snapshot(),
+            "popularity": self.popularity.snapshot(),
+            "latencies": self.hedger.snapshot(),
+        }
+        return meta, blobs
+
+    def load(self, data: bytes) -> Dict[str, int]:
+        """스냅샷 바이트로 상태를 되살리고 되살린 항목 수를 반환합니다. 읽을 수 없으면 SnapshotError."""
+        meta, blobs = decode(data)
+
+        def blob(span: List[int]) -> bytes:
+            start, length = span
+            return bytes(blobs[start:start + length])
+
+        self.stats_cache.restore(
+            (item["key"], CachedStats(item["user_data"], blob(item["body"]), item["etag"], item["fetched_at"], item["closed_history"]))
+            for item in meta["stats"]
+        )
+        self.avatar_cache.restore(((item["url"], item["size"], item.get("mono", False)), blob(item["png"])) for item in meta["avatars"])
+        self.rate_budget.restore(meta["rate_budget"])
+        self.popularity.restore(meta["popularity"])
+        self.hedger.restore(meta["latencies"])
+        return {"stats": len(meta["stats"]), "avatars": len(meta["avatars"]), "age_seconds": int(time.time() - meta["saved_at"])}
+
+    def restore(self) -> Optional[Dict[str, int]]:
+        """시작할 때 스냅샷 파일을 읽습니다. 없거나 읽을 수 없으면 빈 상태로 시작합니다."""
+        try:
+            with metrics.SNAPSHOT_RESTORE.time():
+                with open(self.path, "rb") as file:
+                    data = file.read()
+                restored = self.load(data)
+        except FileNotFoundError:
+            return None
+        except (SnapshotError, OSError, struct.error, zlib.error, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"스냅샷을 읽을 수 없어 빈 상태로 시작합니다 ({self.path}): {e}")
+            return None
+        logger.info(f"스냅샷 복원: 통계 {restored['stats']}명, 아바타 {restored['avatars']}개 ({restored['age_seconds']}초 전 저장, {len(data)} bytes)")
+        return restored
+
+    async def save(self) -> int:
+        """스냅샷을 저장하고 크기(바이트)를 반환합니다."""
+        with metrics.SNAPSHOT_SAVE.time():
+            size = await asyncio.to_thread(self._write, *self.collect())
+        metrics.SNAPSHOT_BYTES.set(size)
+        return size
+
+    def _write(self, meta: Dict[str, Any], blobs: List[bytes]) -> int:
+        data = encode(meta, blobs)
+        write_atomic(self.path, data)
+        return len(data)
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """주기 저장을 멈추고 마지막 스냅샷을 저장합니다."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        try:
+            size = await self.save()
+            logger.info(f"스냅샷 저장: {self.path} ({size} bytes)")
+        except Exception as e:
+            logger.warning(f"종료 시 스냅샷 저장 실패: {e}")
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.save()
+            except Exception as e:
+                logger.warning(f"스냅샷 저장 실패: {e}")
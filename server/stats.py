@@ -0,0 +1,220 @@
+"""
+GitHub 응답을 통계로 가공하는 함수들
+
+단일 사용자 수집(GitHubClient.get_user_stats)과 배치 수집이 같은 계산을 사용합니다.
+"""
+
+from array import array
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def parse_github_datetime(value: str) -> datetime:
+    """GitHub 의 ISO 8601 시각(...Z)을 naive UTC datetime 으로 변환합니다."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+class DayCounts:
+    """연속된 날짜들의 기여 수 (첫 날짜와 정수 배열만 보관합니다)
+
+    전체 기간 캘린더는 윈도우(연도)마다 하나씩 만들고, 날짜별 {date, count} dict 는 응답에 필요할 때만 만듭니다.
+    """
+
+    __slots__ = ("start", "counts")
+
+    def __init__(self, start: date, counts: Optional[array] = None):
+        self.start = start
+        self.counts = counts if counts is not None else array("I")
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=len(self.counts) - 1)
+
+    def date_at(self, index: int) -> str:
+        return (self.start + timedelta(days=index)).isoformat()
+
+    def before(self, boundary: date) -> "DayCounts":
+        """boundary 전날까지만 남긴 윈도우"""
+        return DayCounts(self.start, self.counts[:max((boundary - self.start).days, 0)])
+
+    def to_days(self) -> List[Dict[str, Any]]:
+        return [{"date": self.date_at(index), "count": count} for index, count in enumerate(self.counts)]
+
+
+def calendar_counts(contribution_calendar: Dict[str, Any], start: date) -> DayCounts:
+    """이미 파싱한 contributionCalendar.weeks 를 DayCounts 로 펼칩니다. (별칭으로 여러 사용자를 묶은 배치 / 갱신 응답용)
+
+    캘린더가 비어 있으면 start 부터의 빈 윈도우를 반환합니다. 날짜가 연속되지 않으면 ValueError.
+    """
+    counts = array("I")
+    first_date = last_date = None
+    for week in contribution_calendar["weeks"]:
+        for day in week["contributionDays"]:
+            if first_date is None:
+                first_date = day["date"]
+            last_date = day["date"]
+            counts.append(day["contributionCount"])
+    if first_date is None:
+        return DayCounts(start)
+
+    days = DayCounts(date.fromisoformat(first_date), counts)
+    if days.end != date.fromisoformat(last_date):
+        raise ValueError(f"캘린더 날짜가 연속되지 않습니다: {first_date} ~ {last_date} ({len(counts)}일)")
+    return days
+
+
+def format_top_repositories(repositories: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """스타 수로 정렬하고, 동일한 경우 최신 업데이트 순으로 정렬해서 응답 형태로 변환합니다."""
+    sorted_repos = sorted(repositories, key=lambda x: (-x["stargazerCount"], x["updatedAt"]), reverse=True)
+
+    result = []
+    for repo in sorted_repos:
+        result.append({
+            "name": repo["name"],
+            "stargazers_count": repo["stargazerCount"],
+            "primary_language": repo["primaryLanguage"]["name"] if repo["primaryLanguage"] else None,
+            "updated_at": repo["updatedAt"]
+        })
+    return result
+
+
+def plan_history_windows(from_date: datetime, to_date: datetime, contribution_years: Optional[Iterable[int]] = None) -> List[Tuple[datetime, datetime]]:
+    """전체 기간을 달력 연도 단위 조회 구간으로 나눕니다.
+
+    contribution_years(GitHub contributionsCollection.contributionYears)가 있으면 기여가 있는 연도만 포함합니다.
+    구간은 겹치지 않으므로 연도 경계의 날짜가 두 번 세어지지 않습니다.
+    """
+    years: Iterable[int] = range(from_date.year, to_date.year + 1)
+    if contribution_years is not None:
+        years = sorted(year for year in set(contribution_years) if from_date.year <= year <= to_date.year)
+
+    windows = []
+    for year in years:
+        start = max(datetime(year, 1, 1), from_date)
+        end = min(datetime(year, 12, 31, 23, 59, 59), to_date)
+        if start < end:
+            windows.append((start, end))
+    return windows
+
+
+def history_window_summary(windows: List[DayCounts], from_date: datetime, to_date: datetime) -> Dict[str, Any]:
+    """캘린더 윈도우들의 기간, 기여 수, 활동일 (SSE window 이벤트용)"""
+    return {
+        "from": from_date.strftime("%Y-%m-%d"),
+        "to": to_date.strftime("%Y-%m-%d"),
+        "contributions": sum(sum(window.counts) for window in windows),
+        "active_days": sum(len(window.counts) - window.counts.count(0) for window in windows),
+    }
+
+
+def stats_summary(user_data: Dict[str, Any]) -> Dict[str, Any]:
+    """부분 결과 이벤트로 보내지 않은 전체 기간 통계만 추립니다. (SSE data 이벤트용)"""
+    return {
+        "login": user_data["login"],
+        "total_contributions": user_data["total_contributions"],
+        "active_days": user_data["active_days"],
+        "max_streak": user_data["max_streak"],
+        "best_day": user_data["best_day"],
+    }
+
+
+def history_stats(windows: List[DayCounts]) -> Dict[str, Any]:
+    """날짜 순서로 겹치지 않는 DayCounts 윈도우 목록으로 총 기여 수, 활동일, 최대 연속일, 최고 기록 날을 계산합니다."""
+    total_contributions = 0
+    active_days = 0
+    max_streak = 0
+    current_streak = 0
+    previous_end: Optional[date] = None
+    best_day = {"date": "", "count": 0}
+    best_count = -1
+
+    for window in windows:
+        counts = window.counts
+        if not counts:
+            continue
+        # 건너뛴 연도처럼 날짜가 비어 있으면 연속이 끊긴 것으로 봅니다
+        if previous_end is None or window.start - previous_end != timedelta(days=1):
+            current_streak = 0
+        previous_end = window.end
+
+        total_contributions += sum(counts)
+        active_days += len(counts) - counts.count(0)
+
+        # 기여가 있는 날의 연속 구간 길이 (첫 구간은 이전 윈도우의 연속에 이어집니다)
+        runs = [len(run) for run in bytes(map(bool, counts)).split(b"\0")]
+        if len(runs) == 1:
+            current_streak += runs[0]
+            max_streak = max(max_streak, current_streak)
+        else:
+            max_streak = max(max_streak, current_streak + runs[0], max(runs))
+            current_streak = runs[-1]
+
+        # 같은 기록이면 먼저 나온 날을 유지합니다
+        peak = max(counts)
+        if peak > best_count:
+            best_count = peak
+            best_day = {"date": window.date_at(counts.index(peak)), "count": peak}
+
+    return {
+        "total_contributions": total_contributions,
+        "active_days": active_days,
+        "max_streak": max_streak,
+        "best_day": best_day,
+    }
+
+
+def history_closed_summary(windows: List[DayCounts], year: int) -> Dict[str, Any]:
+    """year 이전(이미 끝난 연도)의 윈도우를 요약합니다.
+
+    올해 캘린더만 다시 받아서 전체 기간 통계를 갱신할 때(history_merge_stats) 사용하며,
+    연도 경계를 넘는 연속 기록을 잇기 위해 마지막 날짜와 그날까지의 연속일을 함께 보관합니다.
+    """
+    boundary = date(year, 1, 1)
+    closed = [window.before(boundary) for window in windows if window.start < boundary]
+    closed = [window for window in closed if window.counts]
+    summary = history_stats(closed)
+
+    trailing_streak = 0
+    next_start: Optional[date] = None
+    for window in reversed(closed):
+        if next_start is not None and next_start - window.end != timedelta(days=1):
+            break
+        run = len(bytes(map(bool, window.counts)).rsplit(b"\0", 1)[-1])
+        trailing_streak += run
+        if run < len(window.counts):
+            break
+        next_start = window.start
+
+    last_date = closed[-1].end.isoformat() if closed else ""
+    return {**summary, "year": year, "last_date": last_date, "trailing_streak": trailing_streak}
+
+
+def history_merge_stats(closed: Dict[str, Any], current: DayCounts) -> Dict[str, Any]:
+    """끝난 연도 요약(history_closed_summary)과 올해 윈도우로 전체 기간 통계를 계산합니다. (history_stats 와 같은 결과)"""
+    summary = history_stats([current])
+
+    # 올해 1월 1일부터 이어지는 연속일
+    leading_streak = 0
+    offset = (date(closed["year"], 1, 1) - current.start).days
+    if 0 <= offset < len(current.counts):
+        leading_streak = len(bytes(map(bool, current.counts[offset:])).split(b"\0", 1)[0])
+
+    max_streak = max(closed["max_streak"], summary["max_streak"])
+    if closed["last_date"] == f"{closed['year'] - 1}-12-31":
+        max_streak = max(max_streak, closed["trailing_streak"] + leading_streak)
+
+    # 같은 기록이면 먼저 나온(이전 연도) 날을 유지합니다
+    if not closed["last_date"] or summary["best_day"]["count"] > closed["best_day"]["count"]:
+        best_day = summary["best_day"]
+    else:
+        best_day = closed["best_day"]
+
+    return {
+        "total_contributions": closed["total_contributions"] + summary["total_contributions"],
+        "active_days": closed["active_days"] + summary["active_days"],
+        "max_streak": max_streak,
+        "best_day": best_day,
+    }
@@ -0,0 +1,110 @@
+"""
+요청 단위 단계별 소요 시간(span 트리) 기록
+
+get_user_stats 한 번의 실행을 루트 span 으로 두고, 기본 정보 / 캘린더 윈도우 / 상위 레포지토리 /
+통계 계산 단계를 자식 span 으로 기록합니다. 같은 GitHubClient 를 여러 요청이 동시에 쓰기 때문에
+현재 타이머는 contextvar 로 전달합니다.
+
+결과는 Server-Timing 헤더, SSE data 이벤트의 timing 필드, JSON 로그 한 줄로 내보냅니다.
+"""
+
+import json
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_current_timer: ContextVar[Optional["StageTimer"]] = ContextVar("stage_timer", default=None)
+
+
+class Span:
+    __slots__ = ("name", "detail", "start", "end", "children")
+
+    def __init__(self, name: str, detail: Optional[str] = None):
+        self.name = name
+        self.detail = detail
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List["Span"] = []
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end if self.end is not None else time.perf_counter()
+        return (end - self.start) * 1000
+
+    def to_dict(self, origin: float) -> Dict[str, Any]:
+        result: Dict[str, Any] = {
+            "name": self.name,
+            "start_ms": round((self.start - origin) * 1000, 1),
+            "duration_ms": round(self.duration_ms, 1),
+        }
+        if self.detail:
+            result["detail"] = self.detail
+        if self.children:
+            result["children"] = [child.to_dict(origin) for child in self.children]
+        return result
+
+
+class StageTimer:
+    """span 트리를 기록하는 타이머"""
+
+    def __init__(self, name: str):
+        self.root = Span(name)
+        self._stack: List[Span] = [self.root]
+
+    @contextmanager
+    def activate(self):
+        """이 타이머를 현재 컨텍스트의 타이머로 지정합니다."""
+        token = _current_timer.set(self)
+        try:
+            yield self
+        finally:
+            _current_timer.reset(token)
+
+    @contextmanager
+    def span(self, name: str, detail: Optional[str] = None):
+        span = Span(name, detail)
+        self._stack[-1].children.append(span)
+        self._stack.append(span)
+        try:
+            yield span
+        finally:
+            span.end = time.perf_counter()
+            self._stack.pop()
+
+    def finish(self):
+        if self.root.end is None:
+            self.root.end = time.perf_counter()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self.root.to_dict(self.root.start)
+
+    def server_timing(self) -> str:
+        """Server-Timing 헤더 값 (최상위 단계 + 전체 시간)"""
+        entries = [f"{span.name};dur={span.duration_ms:.1f}" for span in self.root.children]
+        entries.append(f"total;dur={self.root.duration_ms:.1f}")
+        return ", ".join(entries)
+
+    def log(self, **fields):
+        """단계별 소요 시간을 JSON 한 줄로 로그에 남깁니다."""
+        record = {"event": "timing", **fields, **self.to_dict()}
+        logger.info(json.dumps(record, ensure_ascii=False))
+
+
+@contextmanager
+def span(name: str, metric=None, detail: Optional[str] = None):
+    """현재 타이머에 span 을 기록하고, metric 이 있으면 소요 시간을 함께 관측합니다."""
+    timer = _current_timer.get()
+    started = time.perf_counter()
+    try:
+        if timer is None:
+            yield None
+        else:
+            with timer.span(name, detail) as current:
+                yield current
+    finally:
+        if metric is not None:
+            metric.observe(time.perf_counter() - started)
@@ -17,6 +17,7 @@ function App() {
   const [error, setError] = useState<string>('');
   const [currentUsername, setCurrentUsername] = useState<string>('');
   const [currentStatus, setCurrentStatus] = useState<StatusEvent | null>(null);
+  const [partialStats, setPartialStats] = useState<Partial<GitHubStats> | null>(null);
 
   const handleSplashTouch = () => {
     setCurrentScreen('github-input');
@@ -27,6 +28,7 @@ function App() {
     setError('');
     setCurrentUsername(username);
     setCurrentStatus(null);
+    setPartialStats(null);
     
     try {
       // SSE를 사용하여 실시간 상태 업데이트와 함께 데이터 수집
@@ -34,6 +36,9 @@ function App() {
         onStatusUpdate: (event: StatusEvent) => {
           setCurrentStatus(event);
         },
+        onPartial: (partial: Partial<GitHubStats>) => {
+          setPartialStats(partial);
+        },
         onComplete: (data: GitHubStats) => {
           setGithubStats(data);
           setCurrentScreen('receipt');
@@ -62,6 +67,7 @@ function App() {
     setError('');
     setCurrentUsername('');
     setCurrentStatus(null);
+    setPartialStats(null);
   };
 
   const handleRetry = () => {
@@ -111,6 +117,7 @@ function App() {
             key="loading"
             username={currentUsername}
             currentStatus={currentStatus}
+            partialStats={partialStats}
             onCancel={handleCancelLoading}
           />
         )}
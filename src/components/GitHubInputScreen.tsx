@@ -1,6 +1,7 @@
 import { motion } from 'framer-motion';
 import { useState, useRef, useEffect } from 'react';
 import { VirtualKeyboard } from './VirtualKeyboard';
+import { githubApi, GitHubApiError } from '../services/githubApi';
 
 interface GitHubInputScreenProps {
   onSubmit: (username: string) => void;
@@ -10,6 +11,7 @@ export const GitHubInputScreen: React.FC<GitHubInputScreenProps> = ({ onSubmit }
   const [username, setUsername] = useState('');
   const [isKeyboardVisible, setIsKeyboardVisible] = useState(false);
   const [isLoading, setIsLoading] = useState(false);
+  const [validationError, setValidationError] = useState('');
   const inputRef = useRef<HTMLInputElement>(null);
 
   useEffect(() => {
@@ -26,20 +28,33 @@ export const GitHubInputScreen: React.FC<GitHubInputScreenProps> = ({ onSubmit }
 
   const handleKeyPress = (key: string) => {
     setUsername(prev => prev + key);
+    setValidationError('');
   };
 
   const handleBackspace = () => {
     setUsername(prev => prev.slice(0, -1));
+    setValidationError('');
   };
 
   const handleSubmit = async () => {
     if (!username.trim()) return;
     
     setIsLoading(true);
-    // 여기서 실제 GitHub API 호출이나 다른 로직을 수행할 수 있습니다
-    await new Promise(resolve => setTimeout(resolve, 1000)); // 시뮬레이션
-    setIsLoading(false);
-    onSubmit(username.trim());
+    setValidationError('');
+    try {
+      // 아이디를 먼저 확인하면 서버가 그동안 통계 데이터를 미리 받아둡니다
+      const user = await githubApi.validateUser(username.trim());
+      setIsLoading(false);
+      onSubmit(user.username);
+    } catch (error) {
+      setIsLoading(false);
+      if (error instanceof GitHubApiError && error.status === 404) {
+        setValidationError('존재하지 않는 GitHub 아이디입니다.');
+        return;
+      }
+      // 확인에 실패해도 실제 조회 단계에서 다시 오류를 보여줍니다
+      onSubmit(username.trim());
+    }
   };
 
   const handleEnter = () => {
@@ -86,7 +101,10 @@ export const GitHubInputScreen: React.FC<GitHubInputScreenProps> = ({ onSubmit }
               ref={inputRef}
               type="text"
               value={username}
-              onChange={(e) => setUsername(e.target.value)}
+              onChange={(e) => {
+                setUsername(e.target.value);
+                setValidationError('');
+              }}
               onKeyDown={(e) => {
                 if (e.key === 'Enter') {
                   handleSubmit();
@@ -102,7 +120,10 @@ export const GitHubInputScreen: React.FC<GitHubInputScreenProps> = ({ onSubmit }
               <motion.button
                 initial={{ scale: 0 }}
                 animate={{ scale: 1 }}
-                onClick={() => setUsername('')}
+                onClick={() => {
+                  setUsername('');
+                  setValidationError('');
+                }}
                 style={{ transform: 'translateY(-50%)' }}
                 className="absolute right-4 top-[25%] w-8 h-8 bg-gray-300 rounded-full flex items-center justify-center text-gray-600 hover:bg-gray-400 "
               >
@@ -113,6 +134,10 @@ export const GitHubInputScreen: React.FC<GitHubInputScreenProps> = ({ onSubmit }
             )}
           </div>
           
+          {validationError && (
+            <p className="mt-3 text-base text-red-500">{validationError}</p>
+          )}
+          
           {/* GitHub 사용자명 힌트 */}
           {/* <div className="mt-4 text-sm text-gray-500 space-y-1">
             <p>• 영문자, 숫자, 하이픈(-), 언더스코어(_)만 사용 가능</p>
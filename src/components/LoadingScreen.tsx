@@ -1,16 +1,19 @@
 import { motion } from 'framer-motion';
 import { useState, useEffect } from 'react';
 import type { StatusEvent } from '../services/githubApi';
+import type { GitHubStats } from '../types/github';
 
 interface LoadingScreenProps {
     username: string;
     currentStatus: StatusEvent | null;
+    partialStats?: Partial<GitHubStats> | null;
     onCancel?: () => void;
 }
 
 export const LoadingScreen: React.FC<LoadingScreenProps> = ({
     username,
     currentStatus,
+    partialStats,
     onCancel
 }) => {
     const [dots, setDots] = useState('');
@@ -35,6 +38,13 @@ export const LoadingScreen: React.FC<LoadingScreenProps> = ({
                 return '📡';
             case 'processing':
                 return '⚙️';
+            case 'profile':
+                return '👤';
+            case 'recent':
+            case 'window':
+                return '📅';
+            case 'repositories':
+                return '📦';
             case 'complete':
                 return '✅';
             case 'error':
@@ -67,8 +77,20 @@ export const LoadingScreen: React.FC<LoadingScreenProps> = ({
                         GitHub 데이터 수집 중{dots}
                     </h2>
                     <p className="text-gray-600 text-sm">
-                        사용자: <span className="font-bold">{username}</span>
+                        사용자: <span className="font-bold">{partialStats?.name || username}</span>
                     </p>
+                    {partialStats?.avatar_url && (
+                        <img
+                            src={partialStats.avatar_url}
+                            alt={username}
+                            className="w-16 h-16 mx-auto mt-4 rounded-full"
+                        />
+                    )}
+                    {partialStats?.total_commits !== undefined && (
+                        <p className="text-gray-600 text-sm mt-2">
+                            지금까지 <span className="font-bold">{partialStats.total_commits.toLocaleString()}</span>개의 기여
+                        </p>
+                    )}
                 </div>
 
                 {/* 진행 상황 */}
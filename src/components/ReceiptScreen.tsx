@@ -4,6 +4,7 @@ import { useMemo, useState, useEffect } from 'react';
 import QRCode from 'qrcode';
 import { toPng } from 'html-to-image';
 import { toast } from 'react-toastify';
+import { githubApi } from '../services/githubApi';
 
 interface ReceiptScreenProps {
   githubStats: GitHubStats;
@@ -166,6 +167,16 @@ export const ReceiptScreen: React.FC<ReceiptScreenProps> = ({ githubStats, onRes
         cacheBust: true // 캐시 방지
       });
 
+      // 아바타 위치 (테두리 안쪽, 영수증 너비에 대한 비율) - 서버가 이 자리에 미리 디더링한 출력용 아바타를 덮어씁니다
+      const avatarElement = element.querySelector<HTMLImageElement>('img[data-receipt-avatar]');
+      const avatarRect = avatarElement?.getBoundingClientRect();
+      const avatar = avatarElement && avatarRect ? {
+        url: githubStats.avatar_url,
+        left: (avatarRect.left + avatarElement.clientLeft - rect.left) / rect.width,
+        top: (avatarRect.top + avatarElement.clientTop - rect.top) / rect.width,
+        size: avatarElement.clientWidth / rect.width
+      } : undefined;
+
       // 서버로 이미지 전송
       const filename = `github-receipt-${githubStats.username}-${new Date().toISOString().split('T')[0]}.png`;
       
@@ -176,7 +187,8 @@ export const ReceiptScreen: React.FC<ReceiptScreenProps> = ({ githubStats, onRes
         },
         body: JSON.stringify({
           image_data: dataUrl,
-          filename: filename
+          filename: filename,
+          avatar: avatar
         })
       });
 
@@ -191,8 +203,8 @@ export const ReceiptScreen: React.FC<ReceiptScreenProps> = ({ githubStats, onRes
           }
         );
       } else {
-        // 프린터 연결 실패인 경우에도 성공으로 처리 (파일은 저장됨)
-        if (result.message && result.message.includes('프린터 연결 실패')) {
+        // 프린터 출력 실패는 경고로 보여줍니다 (파일은 서버에 저장됨)
+        if (result.message && result.message.includes('프린터 출력 실패')) {
           toast.warning(
             `⚠️ ${result.message}\n파일은 서버에 저장되었습니다.\n원본: ${result.original_size} → 리사이즈: ${result.resized_size}`,
             { 
@@ -263,10 +275,10 @@ export const ReceiptScreen: React.FC<ReceiptScreenProps> = ({ githubStats, onRes
                 initial={{ scale: 0.8, opacity: 0 }}
                 animate={{ scale: 1, opacity: 1 }}
                 transition={{ delay: 0.4 }}
-                src={githubStats.avatar_url}
+                src={githubApi.avatarImageUrl(githubStats.avatar_url)}
                 alt={`${githubStats.username} 프로필`}
+                data-receipt-avatar
                 className="w-16 h-16 rounded-full border-2 border-gray-300"
-                style={{ filter: 'grayscale(1)' }}
               />
 
               {/* 기본 정보 */}
@@ -1,4 +1,4 @@
-import type { GitHubStats, GitHubUserRequest } from '../types/github';
+import type { GitHubStats, GitHubUserRequest, GitHubUserValidation } from '../types/github';
 
 const API_BASE_URL = 'http://localhost:8000';
 
@@ -13,21 +13,98 @@ export class GitHubApiError extends Error {
   }
 }
 
+export interface StageTiming {
+  name: string;
+  start_ms: number;
+  duration_ms: number;
+  detail?: string;
+  children?: StageTiming[];
+}
+
 export interface StatusEvent {
-  type: 'start' | 'api_call' | 'processing' | 'complete' | 'data' | 'error';
+  // profile / recent / window / repositories 는 data 에 부분 결과를 담은 이벤트
+  type: 'start' | 'api_call' | 'processing' | 'profile' | 'recent' | 'window' | 'repositories' | 'complete' | 'data' | 'error';
   message: string;
   progress: number;
   data?: any;
+  timing?: StageTiming; // 마지막 data 이벤트에만 포함
   timestamp: string;
 }
 
 export interface SSECallbacks {
   onStatusUpdate?: (event: StatusEvent) => void;
+  onPartial?: (partial: Partial<GitHubStats>) => void; // 부분 결과가 도착할 때마다 지금까지 모인 데이터
   onComplete?: (data: GitHubStats) => void;
   onError?: (error: string) => void;
 }
 
+// 부분 결과 이벤트를 GitHubStats 의 일부로 변환합니다
+function partialFromEvent(statusEvent: StatusEvent): Partial<GitHubStats> | null {
+  const data = statusEvent.data;
+  switch (statusEvent.type) {
+    case 'profile':
+      return {
+        username: data.login,
+        avatar_url: data.avatarUrl,
+        name: data.name || data.login,
+        public_repos: data.repositories.totalCount,
+        followers: data.followers.totalCount,
+        following: data.following.totalCount,
+        created_at: data.createdAt
+      };
+    case 'recent':
+      return { daily_commits: data.daily_commits };
+    case 'window':
+      // 마지막 data 이벤트 전까지는 누적 합계를 보여줍니다
+      return { total_commits: data.running_total, active_days: data.running_active_days };
+    case 'repositories':
+      return { top_repositories: data.top_repositories };
+    default:
+      return null;
+  }
+}
+
 export const githubApi = {
+  // 서버에서 영수증 캡처 크기의 흑백 PNG 로 바꿔서 캐시해 둔 아바타 주소
+  avatarImageUrl(avatarUrl: string): string {
+    return `${API_BASE_URL}/api/avatar?url=${encodeURIComponent(avatarUrl)}`;
+  },
+
+  // 아이디만 확인합니다. 확인되면 서버가 통계 데이터를 미리 받기 시작합니다.
+  async validateUser(username: string): Promise<GitHubUserValidation> {
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/github/validate`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({ username } as GitHubUserRequest),
+      });
+
+      if (!response.ok) {
+        const errorData = await response.json().catch(() => ({}));
+        throw new GitHubApiError(
+          errorData.detail || `HTTP ${response.status}`,
+          response.status,
+          errorData.detail
+        );
+      }
+
+      return await response.json();
+    } catch (error) {
+      if (error instanceof GitHubApiError) {
+        throw error;
+      }
+      
+      // 네트워크 오류 또는 기타 오류
+      throw new GitHubApiError(
+        '서버에 연결할 수 없습니다. 서버가 실행 중인지 확인해주세요.',
+        0,
+        error instanceof Error ? error.message : String(error)
+      );
+    }
+  },
+
   async getStats(username: string): Promise<GitHubStats> {
     try {
       const response = await fetch(`${API_BASE_URL}/api/github/stats`, {
@@ -86,6 +163,9 @@ export const githubApi = {
       // 2. SSE 연결 시작
       const eventSource = new EventSource(`${API_BASE_URL}/api/github/stats/stream/${encodeURIComponent(username)}`);
 
+      // 부분 결과 이벤트로 모은 데이터
+      let partial: Partial<GitHubStats> = {};
+
       eventSource.onmessage = (event) => {
         try {
           const statusEvent: StatusEvent = JSON.parse(event.data);
@@ -95,8 +175,35 @@ export const githubApi = {
             callbacks.onStatusUpdate(statusEvent);
           }
 
-          // 데이터 완료 시 처리
-          if (statusEvent.type === 'data' && statusEvent.data) {
+          // 부분 결과 모으기
+          const update = partialFromEvent(statusEvent);
+          if (update) {
+            partial = { ...partial, ...update };
+            if (callbacks.onPartial) {
+              callbacks.onPartial(partial);
+            }
+          }
+
+          // 데이터 완료 시 처리 (data 에는 전체 기간 통계 요약만 옵니다)
+          if (statusEvent.type === 'data' && statusEvent.data && !statusEvent.data.daily_commits_data) {
+            const summary = statusEvent.data;
+            const githubStats = {
+              ...partial,
+              total_commits: summary.total_contributions,
+              active_days: summary.active_days,
+              max_streak: summary.max_streak,
+              best_day: {
+                date: summary.best_day.date,
+                count: summary.best_day.count
+              },
+            } as GitHubStats;
+
+            if (callbacks.onComplete) {
+              callbacks.onComplete(githubStats);
+            }
+            eventSource.close();
+          } else if (statusEvent.type === 'data' && statusEvent.data) {
+            // 예전 서버: data 이벤트에 전체 결과가 옵니다
             const data = statusEvent.data;
             
             // 데이터 변환 (서버에서 받은 raw 데이터를 GitHubStats 형식으로)
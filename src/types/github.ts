@@ -29,3 +29,10 @@ export interface GitHubStats {
 export interface GitHubUserRequest {
   username: string;
 }
+
+export interface GitHubUserValidation {
+  username: string;
+  name: string;
+  avatar_url: string;
+  prefetch: 'started' | 'cached' | 'skipped';
+}